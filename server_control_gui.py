@@ -0,0 +1,1530 @@
+import tkinter as tk
+from tkinter import ttk, scrolledtext, messagebox, filedialog, simpledialog
+import asyncio
+import os
+import queue
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple, Callable, Set
+
+from server_core import (
+    ANSI_ESCAPE_RE, ControlServer, ErrorExporter, ErrorLogger, LoadBalancer, LogBuffer, ResourceSampler,
+    RestartPolicy, ServiceController, ServiceOrchestrator, StartupBenchmark,
+)
+
+# Console tags indexed by the flag stored in the console history
+CONSOLE_TAGS = (None, "error", "success", "warning")
+
+class ServerControlPanel:
+    @property
+    def backend_port(self) -> int:
+        return self.controller.backend_port
+    
+    @backend_port.setter
+    def backend_port(self, port: int):
+        self.controller.backend_port = port
+    
+    @property
+    def frontend_port(self) -> int:
+        return self.controller.frontend_port
+    
+    @frontend_port.setter
+    def frontend_port(self, port: int):
+        self.controller.frontend_port = port
+    
+    def __init__(self, root):
+        # Initialize components
+        self.root = root
+        self.root.title("Re-Chat.to Server Control Panel")
+        self.root.geometry("900x650")  # Slightly larger window size
+        self.root.minsize(800, 600)  # Set minimum size
+        self.root.resizable(True, True)
+        
+        # Set modern theme colors
+        self.bg_color = "#1E1E2E"  # Dark background
+        self.text_color = "#FFFFFF"  # White text
+        self.accent_color = "#6272A4"  # Dracula purple-blue
+        self.button_bg = "#44475A"  # Medium dark background
+        self.bg_dark = "#282A36"  # Dracula background
+        self.entry_bg = "#2D2D3A"  # Entry background
+        self.success_color = "#50FA7B"  # Dracula green
+        self.error_color = "#FF5555"  # Dracula red
+        self.warning_color = "#FFB86C"  # Dracula orange
+        self.highlight_color = "#8BE9FD"  # Dracula cyan
+        
+        # Service control shared with the headless mode
+        self.controller = ServiceController()
+        self.error_logger = self.controller.error_logger
+        self.process_manager = self.controller.process_manager
+        self.process_manager.output_callback = self._write_to_console
+        self.process_manager.exit_callback = self._on_process_exit
+        self.process_manager.restart_callback = self._on_process_restart
+        self.process_manager.ready_callback = self._on_process_ready
+        self._orchestrating = False
+        self.init_db_on_start = tk.BooleanVar(value=False)
+        self._benchmark: Optional[StartupBenchmark] = None
+        
+        # Per-service resource usage, sampled off the Tk thread
+        self.resource_sampler = self.controller.resource_sampler
+        self.resource_sampler.sample_callback = self._on_resource_sample
+        self._resources_dirty = False
+        
+        # Restart policies picked in the Server menu
+        self.restart_modes = {name: tk.StringVar(value=self.process_manager.restart_policies[name].mode)
+                              for name in ServiceController.SERVICES}
+        
+        # Backend cluster settings; the balancer's counters are fetched on the sampler thread
+        self.balancer_strategy = tk.StringVar(value=self.controller.balancer_strategy)
+        self.response_cache = tk.BooleanVar(value=self.controller.response_cache)
+        self._balancer_stats: Optional[Dict[str, Any]] = None
+        
+        # Control API served from the supervisor loop when the panel is started with --control-api
+        self.control_server: Optional[ControlServer] = None
+        
+        # Service state shown in the status widgets; exits are pushed from the supervisor
+        # thread and picked up by the next console frame, the slow poll is only a fallback
+        self.status_poll_ms = 15000
+        self._service_states: Dict[str, str] = {}
+        self._status_dirty = False
+        self._stopping: Set[str] = set()
+        
+        # Console render pipeline: any thread enqueues, the Tk thread drains once per frame
+        self.console_queue: "queue.SimpleQueue[Tuple[float, str, Optional[str]]]" = queue.SimpleQueue()
+        self.render_interval_ms = 50
+        self.render_max_lines_per_frame = 2000
+        self.render_last_frame_lines = 0
+        self.render_max_frame_lines = 0
+        self.render_max_latency = 0.0
+        self._render_stats_updated = 0.0
+        self._pending_status: Optional[str] = None
+        
+        # Console scrollback: every rendered line is kept in console_history. The Text
+        # widget only holds history lines _view_start.._view_end-1, either a virtual
+        # window paged in as the user scrolls or a hard tail limit.
+        self.console_history = LogBuffer('console', max_lines=200000, max_bytes=32 * 1024 * 1024)
+        self.console_window_lines = 1000
+        self.console_page_lines = 250
+        self.console_max_lines = 5000
+        self.console_virtual = tk.BooleanVar(value=True)
+        self._view_start = 0
+        self._view_end = 0
+        self._console_paging = False
+        
+        # Default ports come from the controller; the free frontend port is looked up in the background
+        self._scanned_frontend_port: Optional[int] = None
+        self._port_scan = threading.Thread(target=self._scan_frontend_port, daemon=True)
+        self._port_scan.start()
+        
+        # Initialize UI state variables
+        self.console_autoscroll = tk.BooleanVar(value=True)
+        self.backend_port_var = tk.StringVar(value=str(self.backend_port))
+        self.frontend_port_var = tk.StringVar(value=str(self.frontend_port))
+        
+        # Configure root window
+        self.root.configure(bg=self.bg_color)
+        
+        # Apply dark theme to all widgets
+        self.root.tk_setPalette(
+            background=self.bg_color,
+            foreground=self.text_color,
+            activeBackground=self.button_bg,
+            activeForeground=self.text_color
+        )
+        
+        # Build the UI
+        self._create_styles()
+        self._create_menu()
+        self._create_main_frame()
+        self._create_header()
+        self._create_server_controls()
+        self._create_console()
+        self._create_status_bar()
+        
+        # Set up the fallback status check
+        self._refresh_process_status()
+        self.root.after(self.status_poll_ms, self._check_processes)
+        self.resource_sampler.start()
+        
+        # Start draining the console queue
+        self.root.after(self.render_interval_ms, self._drain_console)
+        
+        # Display welcome message
+        self._write_to_console("Server Control Panel Initialized. Welcome!\n", "success")
+        self._write_to_console(f"Backend port set to: {self.backend_port}\n")
+        self.root.after(20, self._apply_frontend_port)
+        
+        # Log startup
+        self.error_logger.log_error("INFO", "Server Control Panel Started", None)
+        
+        # Warm up the error search index in the background
+        threading.Thread(target=self.error_logger.search_index.load, daemon=True).start()
+    
+    def _scan_frontend_port(self):
+        """Worker thread: find and reserve a free frontend port without holding up the window"""
+        self._scanned_frontend_port = self.process_manager.ports.reserve('frontend', self.frontend_port)
+    
+    def _apply_frontend_port(self, wait: bool = False):
+        """Adopt the scanned frontend port once the background lookup has finished"""
+        if self._port_scan is None:
+            return
+        if wait:
+            self._port_scan.join(timeout=2.0)
+        if self._port_scan.is_alive():
+            if not wait:
+                self.root.after(20, self._apply_frontend_port)
+            return
+        
+        self._port_scan = None
+        if self._scanned_frontend_port is None:
+            self._write_to_console(f"No free frontend port found from {self.frontend_port}; "
+                                   f"free one or pick another under Server > Configure Ports\n", "error")
+            return
+        self.frontend_port = self._scanned_frontend_port
+        self.frontend_port_var.set(str(self.frontend_port))
+        self._write_to_console(f"Frontend port set to: {self.frontend_port}\n")
+    
+    def _create_styles(self):
+        """Configure ttk styles for a modern look"""
+        self.style = ttk.Style()
+        
+        # Try to use a modern theme
+        try:
+            self.style.theme_use('clam')
+        except tk.TclError:
+            pass
+        
+        # Configure base styles
+        self.style.configure('.', 
+                          background=self.bg_color, 
+                          foreground=self.text_color, 
+                          fieldbackground=self.entry_bg)
+        
+        # Configure widget-specific styles
+        self.style.configure("TFrame", background=self.bg_color)
+        self.style.configure("TLabel", background=self.bg_color, foreground=self.text_color, font=("Segoe UI", 10))
+        self.style.configure("Header.TLabel", background=self.bg_color, foreground=self.text_color, font=("Segoe UI", 14, "bold"))
+        self.style.configure("Status.TLabel", background=self.bg_dark, foreground=self.text_color, font=("Segoe UI", 9))
+        self.style.configure("Metrics.TLabel", background=self.bg_color, foreground=self.text_color, font=("Segoe UI", 8))
+        
+        # Button styles
+        self.style.configure("TButton", 
+                          background=self.button_bg, 
+                          foreground=self.text_color,
+                          padding=6,
+                          font=("Segoe UI", 10))
+        
+        # Primary action button
+        self.style.configure("Primary.TButton", 
+                          background=self.accent_color,
+                          foreground=self.text_color)
+        
+        # Status labels
+        self.style.configure("Active.TLabel", foreground=self.success_color)
+        self.style.configure("Inactive.TLabel", foreground=self.error_color)
+        self.style.configure("Pending.TLabel", foreground=self.warning_color)
+        
+        # Entries
+        self.style.configure("TEntry", 
+                          fieldbackground=self.entry_bg,
+                          foreground=self.text_color,
+                          insertcolor=self.text_color,
+                          borderwidth=1)
+    
+    def _create_menu(self):
+        """Create application menu"""
+        self.menu = tk.Menu(self.root, bg=self.bg_dark, fg=self.text_color, borderwidth=0)
+        self.root.config(menu=self.menu)
+        
+        # File menu
+        file_menu = tk.Menu(self.menu, tearoff=0, bg=self.bg_dark, fg=self.text_color)
+        file_menu.add_command(label="Export Error Logs", command=self.export_error_logs)
+        file_menu.add_command(label="View Recent Errors", command=self.view_recent_errors)
+        file_menu.add_command(label="Search Errors", command=self.search_errors)
+        file_menu.add_separator()
+        file_menu.add_command(label="Exit", command=self.on_closing)
+        self.menu.add_cascade(label="File", menu=file_menu)
+        
+        # Server menu
+        server_menu = tk.Menu(self.menu, tearoff=0, bg=self.bg_dark, fg=self.text_color)
+        server_menu.add_command(label="Start All Services", command=self.start_all)
+        server_menu.add_command(label="Stop All Services", command=self.stop_all)
+        server_menu.add_checkbutton(label="Initialize Database on Start All", variable=self.init_db_on_start)
+        server_menu.add_separator()
+        server_menu.add_command(label="Run Startup Benchmark...", command=self.run_startup_benchmark)
+        server_menu.add_separator()
+        server_menu.add_command(label="Configure Ports", command=self.configure_ports)
+        
+        # Restart policy submenu per service
+        for name in ('backend', 'frontend'):
+            policy_menu = tk.Menu(server_menu, tearoff=0, bg=self.bg_dark, fg=self.text_color)
+            for mode in RestartPolicy.MODES:
+                policy_menu.add_radiobutton(label=mode.capitalize(), value=mode,
+                                            variable=self.restart_modes[name],
+                                            command=lambda name=name: self.set_restart_mode(name))
+            server_menu.add_cascade(label=f"{name.capitalize()} Restart Policy", menu=policy_menu)
+        server_menu.add_separator()
+        server_menu.add_command(label="Backend Workers...", command=self.configure_backend_workers)
+        strategy_menu = tk.Menu(server_menu, tearoff=0, bg=self.bg_dark, fg=self.text_color)
+        for strategy in LoadBalancer.STRATEGIES:
+            strategy_menu.add_radiobutton(label=strategy.replace('-', ' ').capitalize(), value=strategy,
+                                          variable=self.balancer_strategy, command=self.set_balancer_strategy)
+        server_menu.add_cascade(label="Balancing Strategy", menu=strategy_menu)
+        server_menu.add_checkbutton(label="Cache API Responses", variable=self.response_cache,
+                                    command=self.toggle_response_cache)
+        self.menu.add_cascade(label="Server", menu=server_menu)
+        
+        # Help menu
+        help_menu = tk.Menu(self.menu, tearoff=0, bg=self.bg_dark, fg=self.text_color)
+        help_menu.add_command(label="About", command=self.show_about)
+        self.menu.add_cascade(label="Help", menu=help_menu)
+    
+    def _create_main_frame(self):
+        """Create the main application frame"""
+        self.main_frame = ttk.Frame(self.root)
+        self.main_frame.pack(fill=tk.BOTH, expand=True, padx=15, pady=15)
+        
+    def _create_header(self):
+        """Create the application header"""
+        header_frame = ttk.Frame(self.main_frame)
+        header_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        # Title
+        title_label = ttk.Label(header_frame, text="Re-Chat.to Server Control", style="Header.TLabel")
+        title_label.pack(side=tk.LEFT)
+        
+    def _create_server_controls(self):
+        """Create the server control buttons"""
+        controls_frame = ttk.Frame(self.main_frame)
+        controls_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        # Create button frame with 3 columns
+        btn_frame = ttk.Frame(controls_frame)
+        btn_frame.pack(fill=tk.X)
+        
+        # Backend button
+        self.backend_btn = ttk.Button(btn_frame, text="Start Backend", 
+                                  command=self.start_backend, style="Primary.TButton")
+        self.backend_btn.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
+        
+        # Frontend button
+        self.frontend_btn = ttk.Button(btn_frame, text="Start Frontend", 
+                                    command=self.start_frontend)
+        self.frontend_btn.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        
+        # Database button
+        self.db_btn = ttk.Button(btn_frame, text="Initialize Database", 
+                                 command=self.initialize_database)
+        self.db_btn.grid(row=0, column=2, padx=5, pady=5, sticky="ew")
+        
+        # Configure grid columns to be equal width
+        btn_frame.columnconfigure(0, weight=1)
+        btn_frame.columnconfigure(1, weight=1)
+        btn_frame.columnconfigure(2, weight=1)
+        
+        # Status indicators
+        status_frame = ttk.Frame(controls_frame)
+        status_frame.pack(fill=tk.X, pady=(5, 0))
+        
+        # Backend status
+        backend_status_frame = ttk.Frame(status_frame)
+        backend_status_frame.grid(row=0, column=0, sticky="ew")
+        ttk.Label(backend_status_frame, text="Backend: ").pack(side=tk.LEFT)
+        self.backend_status = ttk.Label(backend_status_frame, text="Stopped", style="Inactive.TLabel")
+        self.backend_status.pack(side=tk.LEFT)
+        self.backend_restarts = ttk.Label(backend_status_frame, text="")
+        self.backend_restarts.pack(side=tk.LEFT, padx=(8, 0))
+        
+        # Frontend status
+        frontend_status_frame = ttk.Frame(status_frame)
+        frontend_status_frame.grid(row=0, column=1, sticky="ew")
+        ttk.Label(frontend_status_frame, text="Frontend: ").pack(side=tk.LEFT)
+        self.frontend_status = ttk.Label(frontend_status_frame, text="Stopped", style="Inactive.TLabel")
+        self.frontend_status.pack(side=tk.LEFT)
+        self.frontend_restarts = ttk.Label(frontend_status_frame, text="")
+        self.frontend_restarts.pack(side=tk.LEFT, padx=(8, 0))
+        
+        # Database status
+        db_status_frame = ttk.Frame(status_frame)
+        db_status_frame.grid(row=0, column=2, sticky="ew")
+        ttk.Label(db_status_frame, text="Database: ").pack(side=tk.LEFT)
+        self.db_status = ttk.Label(db_status_frame, text="Not Initialized", style="Inactive.TLabel")
+        self.db_status.pack(side=tk.LEFT)
+        
+        # Resource usage of each service's process tree
+        self.backend_resources = ttk.Label(status_frame, text="", style="Metrics.TLabel")
+        self.backend_resources.grid(row=1, column=0, sticky="w")
+        self.frontend_resources = ttk.Label(status_frame, text="", style="Metrics.TLabel")
+        self.frontend_resources.grid(row=1, column=1, sticky="w")
+        
+        # Configure grid columns to be equal width
+        status_frame.columnconfigure(0, weight=1)
+        status_frame.columnconfigure(1, weight=1)
+        status_frame.columnconfigure(2, weight=1)
+        
+        # Action buttons
+        action_frame = ttk.Frame(controls_frame)
+        action_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        # Start all button
+        start_all_btn = ttk.Button(action_frame, text="Start All", command=self.start_all)
+        start_all_btn.pack(side=tk.LEFT, padx=(0, 5), fill=tk.X, expand=True)
+        
+        # Stop all button
+        stop_all_btn = ttk.Button(action_frame, text="Stop All", command=self.stop_all)
+        stop_all_btn.pack(side=tk.LEFT, padx=5, fill=tk.X, expand=True)
+        
+        # Check database button
+        check_db_btn = ttk.Button(action_frame, text="Check Database", command=self.check_database_connection)
+        check_db_btn.pack(side=tk.LEFT, padx=(5, 0), fill=tk.X, expand=True)
+    
+    def _create_console(self):
+        """Create the console output area"""
+        console_frame = ttk.Frame(self.main_frame)
+        console_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Console header with options
+        console_header = ttk.Frame(console_frame)
+        console_header.pack(fill=tk.X, pady=(0, 5))
+        
+        ttk.Label(console_header, text="Console Output").pack(side=tk.LEFT)
+        
+        # Autoscroll option
+        autoscroll_check = ttk.Checkbutton(console_header, text="Auto-scroll", 
+                                        variable=self.console_autoscroll)
+        autoscroll_check.pack(side=tk.RIGHT)
+        
+        # Scrollback mode: virtual window over the history, or a hard line limit
+        virtual_check = ttk.Checkbutton(console_header, text="Virtual scrollback",
+                                        variable=self.console_virtual,
+                                        command=self._on_console_mode_changed)
+        virtual_check.pack(side=tk.RIGHT, padx=(0, 10))
+        
+        # Console text widget
+        self.console = scrolledtext.ScrolledText(console_frame, wrap=tk.WORD, 
+                                             bg=self.bg_dark, 
+                                             fg=self.text_color,
+                                             insertbackground=self.text_color,
+                                             selectbackground=self.button_bg,
+                                             selectforeground=self.text_color,
+                                             font=("Consolas", 10),
+                                             height=15)
+        self.console.pack(fill=tk.BOTH, expand=True)
+        self.console.config(state=tk.DISABLED, yscrollcommand=self._on_console_scroll)
+        
+        # Configure tags for different message types
+        self.console.tag_configure("error", foreground=self.error_color)
+        self.console.tag_configure("success", foreground=self.success_color)
+        self.console.tag_configure("warning", foreground=self.warning_color)
+        
+        # Command input
+        cmd_frame = ttk.Frame(self.main_frame)
+        cmd_frame.pack(fill=tk.X, pady=(10, 0))
+        
+        ttk.Label(cmd_frame, text="Custom Command:").pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.cmd_entry = ttk.Entry(cmd_frame)
+        self.cmd_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.cmd_entry.bind("<Return>", lambda event: self.run_custom_command())
+        
+        cmd_btn = ttk.Button(cmd_frame, text="Run", command=self.run_custom_command)
+        cmd_btn.pack(side=tk.RIGHT, padx=(5, 0))
+    
+    def _create_status_bar(self):
+        """Create the status bar at the bottom of the window"""
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        
+        self.status_bar = ttk.Label(status_frame, text="Ready", relief=tk.SUNKEN, anchor=tk.W)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Console render counters
+        self.render_stats_label = ttk.Label(status_frame, text="", relief=tk.SUNKEN, anchor=tk.E)
+        self.render_stats_label.pack(side=tk.RIGHT)
+    
+    def _write_to_console(self, text, tag=None):
+        """Queue text for the console with optional tag; safe to call from any thread"""
+        if tag == "error":
+            text = f"[ERROR] {text}"
+        elif tag == "success":
+            text = f"[SUCCESS] {text}"
+        elif tag == "warning":
+            text = f"[WARNING] {text}"
+        
+        self.console_queue.put((time.monotonic(), text, tag))
+    
+    def _drain_console(self):
+        """Render queued console text with one batched insert per frame"""
+        try:
+            self._render_console_batch()
+            
+            if self._pending_status is not None:
+                self.status_bar.config(text=self._pending_status)
+                self._pending_status = None
+            
+            if self._status_dirty:
+                self._status_dirty = False
+                self._refresh_process_status()
+            
+            if self._resources_dirty:
+                self._resources_dirty = False
+                self._refresh_resource_labels()
+        except Exception as e:
+            self.error_logger.log_error("Console Render Error", str(e), traceback.format_exc())
+        
+        self.root.after(self.render_interval_ms, self._drain_console)
+    
+    def _render_console_batch(self):
+        """Insert up to render_max_lines_per_frame queued items, merging runs of the same tag"""
+        # Collect (text, tag) runs so consecutive items with one tag become one chunk
+        chunks: List[str] = []
+        tags: List[Optional[str]] = []
+        oldest = None
+        count = 0
+        while count < self.render_max_lines_per_frame:
+            try:
+                queued_at, text, tag = self.console_queue.get_nowait()
+            except queue.Empty:
+                break
+            if oldest is None:
+                oldest = queued_at
+            if tags and tags[-1] == tag:
+                chunks[-1] += text
+            else:
+                chunks.append(text)
+                tags.append(tag)
+            count += 1
+        
+        self.render_last_frame_lines = count
+        if count:
+            self._append_console(chunks, tags)
+            
+            self.render_max_frame_lines = max(self.render_max_frame_lines, count)
+            self.render_max_latency = max(self.render_max_latency, time.monotonic() - oldest)
+        
+        # Refresh the counters at most twice per second
+        now = time.monotonic()
+        if now - self._render_stats_updated >= 0.5:
+            self._render_stats_updated = now
+            ingest = sum(self.process_manager.get_ingest_rates().values())
+            self.render_stats_label.config(
+                text=f"Ingest: {ingest:.0f} lines/s | Frame: {self.render_last_frame_lines} lines "
+                     f"(max {self.render_max_frame_lines}) | Max latency: {self.render_max_latency * 1000:.0f} ms"
+            )
+    
+    def _append_console(self, chunks: List[str], tags: List[Optional[str]]):
+        """Record rendered text in the console history and show it if the view is at the tail"""
+        at_tail = self._view_end == self.console_history.appended
+        
+        for text, tag in zip(chunks, tags):
+            flag = CONSOLE_TAGS.index(tag) if tag in CONSOLE_TAGS else 0
+            for line in text.splitlines():
+                self.console_history.append(line, flag)
+        
+        if not at_tail:
+            # The user is paging through older lines; only jump back when auto-scroll asks for it
+            if self.console_autoscroll.get():
+                self._show_console_tail()
+            return
+        
+        start = self._view_end
+        self._view_end = self.console_history.appended
+        self.console.config(state=tk.NORMAL)
+        self._insert_console_lines(tk.END, self.console_history.get_range(start, self._view_end))
+        self._trim_console_top()
+        
+        # Auto-scroll if enabled
+        if self.console_autoscroll.get():
+            self.console.see(tk.END)
+        
+        self.console.config(state=tk.DISABLED)
+    
+    def _insert_console_lines(self, index, records: List[Tuple[str, int]]):
+        """Insert history records at index with one multi-segment insert"""
+        if not records:
+            return
+        insert_args = []
+        run_text: List[str] = []
+        run_flag = records[0][1]
+        for line, flag in records:
+            if flag != run_flag:
+                insert_args.extend(("".join(run_text), CONSOLE_TAGS[run_flag] or ()))
+                run_text = []
+                run_flag = flag
+            run_text.append(line + "\n")
+        insert_args.extend(("".join(run_text), CONSOLE_TAGS[run_flag] or ()))
+        self.console.insert(index, *insert_args)
+    
+    def _console_window_size(self) -> int:
+        """Number of history lines the widget may hold in the current mode"""
+        return self.console_window_lines if self.console_virtual.get() else self.console_max_lines
+    
+    def _trim_console_top(self):
+        """Drop lines from the top of the widget beyond the window size"""
+        excess = (self._view_end - self._view_start) - self._console_window_size()
+        if excess > 0:
+            top_line = int(self.console.index("@0,0").split('.')[0])
+            self.console.delete("1.0", f"{excess + 1}.0")
+            self._view_start += excess
+            if not self.console_autoscroll.get():
+                # Keep the lines the user is reading in place
+                self.console.yview(f"{max(1, top_line - excess)}.0")
+    
+    def _show_console_tail(self):
+        """Reload the widget with the newest lines of the history"""
+        self._view_end = self.console_history.appended
+        self._view_start = max(self.console_history.first_index, self._view_end - self._console_window_size())
+        
+        self.console.config(state=tk.NORMAL)
+        self.console.delete("1.0", tk.END)
+        self._insert_console_lines(tk.END, self.console_history.get_range(self._view_start, self._view_end))
+        self.console.see(tk.END)
+        self.console.config(state=tk.DISABLED)
+    
+    def _on_console_mode_changed(self):
+        """Rebuild the console when switching between virtual and hard-limit scrollback"""
+        self._show_console_tail()
+    
+    def _on_console_scroll(self, first, last):
+        """Scrollbar callback that pages history in and out of the virtual window"""
+        self.console.vbar.set(first, last)
+        if not self.console_virtual.get() or self._console_paging:
+            return
+        
+        if float(first) <= 0.02 and self._view_start > self.console_history.first_index:
+            self._console_paging = True
+            self.root.after_idle(self._page_console_up)
+        elif float(last) >= 0.98 and self._view_end < self.console_history.appended:
+            self._console_paging = True
+            self.root.after_idle(self._page_console_down)
+    
+    def _page_console_up(self):
+        """Load an older page of history above the window and drop lines from the bottom"""
+        try:
+            start = max(self.console_history.first_index, self._view_start - self.console_page_lines)
+            records = self.console_history.get_range(start, self._view_start)
+            if not records:
+                return
+            
+            top_line = int(self.console.index("@0,0").split('.')[0])
+            self.console.config(state=tk.NORMAL)
+            self._insert_console_lines("1.0", records)
+            self._view_start = start
+            
+            window = self._console_window_size()
+            if self._view_end - self._view_start > window:
+                self.console.delete(f"{window + 1}.0", tk.END)
+                self._view_end = self._view_start + window
+            self.console.config(state=tk.DISABLED)
+            
+            self.console.yview(f"{top_line + len(records)}.0")
+        finally:
+            self._console_paging = False
+    
+    def _page_console_down(self):
+        """Load a newer page of history below the window and drop lines from the top"""
+        try:
+            end = min(self.console_history.appended, self._view_end + self.console_page_lines)
+            records = self.console_history.get_range(self._view_end, end)
+            if not records:
+                return
+            
+            self.console.config(state=tk.NORMAL)
+            self._insert_console_lines(tk.END, records)
+            self._view_end = end
+            
+            window = self._console_window_size()
+            excess = (self._view_end - self._view_start) - window
+            if excess > 0:
+                top_line = int(self.console.index("@0,0").split('.')[0])
+                self.console.delete("1.0", f"{excess + 1}.0")
+                self._view_start += excess
+                self.console.yview(f"{max(1, top_line - excess)}.0")
+            self.console.config(state=tk.DISABLED)
+        finally:
+            self._console_paging = False
+    
+    def _update_status_bar(self, text):
+        """Update the status bar text; off the Tk thread it is applied on the next frame"""
+        if threading.current_thread() is threading.main_thread():
+            self.status_bar.config(text=text)
+        else:
+            self._pending_status = text
+    
+    def _on_process_exit(self, name: str, returncode: Optional[int], expected: bool):
+        """Called from the supervisor thread when a managed process ends"""
+        if not expected:
+            tag = "success" if returncode == 0 else "error"
+            self._write_to_console(f"Process '{name}' exited with code {returncode}\n", tag)
+        self._status_dirty = True
+        if name == ServiceController.COMMAND:
+            self._update_status_bar("Ready")
+    
+    def _on_process_ready(self, name: str, ready: bool, seconds: float):
+        """Called from the supervisor thread when a readiness probe passes or gives up"""
+        if ready and name in ('backend', 'frontend'):
+            self._write_to_console(f"{name.capitalize()} ready in {seconds:.1f}s\n", "success")
+        self._status_dirty = True
+    
+    def _on_process_restart(self, name: str):
+        """Called from the restart supervisor when it schedules, performs or gives up a restart"""
+        self._status_dirty = True
+    
+    def _on_resource_sample(self):
+        """Called from the sampler thread after each round of samples"""
+        self._balancer_stats = self.controller.balancer_stats()
+        self._resources_dirty = True
+    
+    def _refresh_resource_labels(self):
+        """Show the latest resource sample next to each running service"""
+        for name, label in (('backend', self.backend_resources), ('frontend', self.frontend_resources)):
+            sample = self.resource_sampler.latest(name) if self.process_manager.is_process_running(name) else None
+            text = ResourceSampler.format_sample(sample)
+            if name == 'backend' and self.controller.proxy_running():
+                # Usage of the whole cluster, then the balancer's view of it
+                workers = [n for n in self.controller.worker_names() if self.process_manager.is_process_running(n)]
+                text = ResourceSampler.format_sample(self.resource_sampler.latest_total(['backend'] + workers))
+                balancer = LoadBalancer.format_stats(self._balancer_stats)
+                text = f"{text} | {balancer}" if text and balancer else text or balancer
+            if self._service_states.get(name + '_resources') != text:
+                self._service_states[name + '_resources'] = text
+                label.config(text=text)
+    
+    def configure_backend_workers(self):
+        """Ask how many backend workers to run; more than one puts a load balancer in front"""
+        workers = simpledialog.askinteger(
+            "Backend Workers", "Backend worker processes (1 runs a single server):",
+            parent=self.root, initialvalue=self.controller.backend_workers,
+            minvalue=1, maxvalue=max(2, 2 * (os.cpu_count() or 1)))
+        if not workers or workers == self.controller.backend_workers:
+            return
+        self.controller.backend_workers = workers
+        mode = f"{workers} workers behind a load balancer" if workers > 1 else "a single server"
+        if self.process_manager.is_process_running('backend'):
+            self._write_to_console(f"Backend set to run as {mode}; restart the backend to apply it\n", "warning")
+        else:
+            self._write_to_console(f"Backend set to run as {mode}\n", "success")
+    
+    def set_balancer_strategy(self):
+        """Apply the balancing strategy picked in the Server menu"""
+        self.controller.balancer_strategy = self.balancer_strategy.get()
+        suffix = " (applies on the next backend start)" if self.controller.proxy_running() else ""
+        self._write_to_console(f"Balancing strategy set to: {self.controller.balancer_strategy}{suffix}\n")
+    
+    def toggle_response_cache(self):
+        """Run the backend behind the caching proxy, or stop doing so, from the next backend start"""
+        self.controller.response_cache = self.response_cache.get()
+        state = "on" if self.controller.response_cache else "off"
+        if self.process_manager.is_process_running('backend'):
+            self._write_to_console(f"API response cache turned {state}; restart the backend to apply it\n", "warning")
+        else:
+            self._write_to_console(f"API response cache turned {state}\n", "success")
+    
+    def set_restart_mode(self, name: str):
+        """Apply the restart mode picked in the Server menu"""
+        mode = self.restart_modes[name].get()
+        self.process_manager.set_restart_policy(name, RestartPolicy(mode))
+        self._write_to_console(f"{name.capitalize()} restart policy set to: {mode}\n")
+        self._refresh_process_status()
+    
+    @staticmethod
+    def _format_service_stats(restarts: Optional[Dict[str, Any]], readiness: Optional[Dict[str, Any]]) -> str:
+        """Short readiness and restart summary shown next to a service status"""
+        parts = []
+        if readiness and readiness['last'] is not None:
+            parts.append(f"Ready in {readiness['last']:.1f}s")
+        if restarts and (restarts['restarts'] or restarts['failures']):
+            parts.append(f"Restarts: {restarts['restarts']}")
+            if restarts['mtbf'] is not None:
+                parts.append(f"MTBF: {restarts['mtbf']:.0f}s")
+        return " | ".join(parts)
+    
+    def _refresh_process_status(self):
+        """Reconfigure the status widgets of services whose state changed"""
+        try:
+            running = {name: self.process_manager.is_process_running(name)
+                       for name in ('backend', 'frontend', 'db_init')}
+            readiness = self.process_manager.get_readiness_stats()
+            ready = {name: running[name] and (readiness.get(name) or {}).get('state') == 'ready'
+                     for name in ('backend', 'frontend')}
+            
+            # The backend probe queries the users table, so a ready backend means a live database
+            if running['db_init']:
+                db_state = "Initializing"
+            elif ready['backend']:
+                db_state = "Connected"
+            elif running['backend']:
+                db_state = "Connecting"
+            else:
+                db_state = "Not Connected"
+            restart_stats = self.process_manager.get_restart_stats()
+            states = {'db': db_state}
+            for name in ('backend', 'frontend'):
+                stats = restart_stats.get(name) or {}
+                if ready[name]:
+                    states[name] = "Ready"
+                elif running[name]:
+                    not_ready = (readiness.get(name) or {}).get('state') == 'not-ready'
+                    states[name] = "Not Ready" if not_ready else "Starting"
+                elif stats.get('restart_pending'):
+                    states[name] = "Restarting"
+                elif stats.get('crash_loop'):
+                    states[name] = "Crash Loop"
+                else:
+                    states[name] = "Stopped"
+                
+                label = self.backend_restarts if name == 'backend' else self.frontend_restarts
+                text = self._format_service_stats(stats, readiness.get(name))
+                if self._service_states.get(name + '_restarts') != text:
+                    self._service_states[name + '_restarts'] = text
+                    label.config(text=text)
+            
+            for name, state in states.items():
+                if self._service_states.get(name) == state:
+                    continue
+                self._service_states[name] = state
+                if state in ("Ready", "Initializing", "Connected"):
+                    style = "Active.TLabel"
+                elif state in ("Starting", "Restarting", "Connecting"):
+                    style = "Pending.TLabel"
+                else:
+                    style = "Inactive.TLabel"
+                
+                if name == 'backend':
+                    self.backend_status.config(text=state, style=style)
+                    if running['backend']:
+                        self.backend_btn.config(text="Stop Backend", command=self.stop_backend)
+                    else:
+                        self.backend_btn.config(text="Start Backend", command=self.start_backend)
+                elif name == 'frontend':
+                    self.frontend_status.config(text=state, style=style)
+                    if running['frontend']:
+                        self.frontend_btn.config(text="Stop Frontend", command=self.stop_frontend)
+                    else:
+                        self.frontend_btn.config(text="Start Frontend", command=self.start_frontend)
+                else:
+                    self.db_status.config(text=state, style=style)
+        except Exception as e:
+            # Log any errors that occur during status checking
+            self.error_logger.log_error("Status Check Error", str(e), traceback.format_exc())
+    
+    def _check_processes(self):
+        """Fallback poll in case an exit notification was missed"""
+        self._refresh_process_status()
+        self.root.after(self.status_poll_ms, self._check_processes)
+    
+    # Server control methods
+    def _reserve_frontend_port(self) -> bool:
+        """Hold the frontend port until npm starts, moving on if it was taken meanwhile"""
+        requested = self.frontend_port
+        port = self.controller.reserve_frontend_port()
+        if port is None:
+            self._write_to_console(f"No free frontend port found from {requested}.\n", "error")
+            return False
+        if port != requested:
+            self._write_to_console(f"Port {requested} is taken, using {port} instead.\n", "warning")
+            self.frontend_port_var.set(str(port))
+        return True
+    
+    def run_startup_benchmark(self):
+        """Start and stop each service repeatedly and report startup phase percentiles"""
+        if self._benchmark is not None:
+            self._write_to_console("A startup benchmark is already running.\n", "warning")
+            return
+        if any(self.process_manager.is_process_running(name) for name in ('backend', 'frontend')):
+            messagebox.showwarning("Startup Benchmark", "Stop the backend and frontend before benchmarking.")
+            return
+        runs = simpledialog.askinteger("Startup Benchmark", "Cold starts per service:",
+                                       parent=self.root, initialvalue=5, minvalue=1, maxvalue=50)
+        if not runs:
+            return
+        
+        self._apply_frontend_port(wait=True)
+        try:
+            services = self.controller.benchmark_specs()
+        except ValueError as e:
+            self._write_to_console(f"Startup benchmark not started: {e}\n", "error")
+            return
+        
+        benchmark = self._benchmark = StartupBenchmark(self.process_manager, runs=runs)
+        baseline = (benchmark.history() or [None])[-1]
+        self._write_to_console(f"Running startup benchmark ({runs} runs per service)...\n")
+        
+        def worker():
+            try:
+                result = benchmark.run(services, progress=self._write_to_console)
+                self._write_to_console(StartupBenchmark.format_result(result), "success")
+                if baseline is not None:
+                    for regression in StartupBenchmark.compare(result, baseline):
+                        self._write_to_console(f"Startup regression: {regression}\n", "warning")
+                self._write_to_console(f"Results saved to {benchmark.history_path}\n")
+            except Exception as e:
+                self._write_to_console(f"Startup benchmark failed: {e}\n", "error")
+                self.error_logger.log_error("Benchmark Error", str(e), traceback.format_exc())
+            finally:
+                self._benchmark = None
+                self._status_dirty = True
+        
+        threading.Thread(target=worker, name="StartupBenchmark", daemon=True).start()
+    
+    def start_backend(self):
+        """Start the backend server"""
+        if self.process_manager.is_process_running('backend'):
+            self._write_to_console("Backend is already running.\n", "warning")
+            return
+        
+        # Start the backend process
+        success, message = self.controller.start_service('backend')
+        
+        if success:
+            if self.controller.proxy_mode:
+                self._write_to_console(f"{message}, waiting until it is ready\n", "success")
+            else:
+                self._write_to_console(f"Started backend server on port {self.backend_port}, waiting until it is ready\n", "success")
+        else:
+            self._write_to_console(f"Failed to start backend: {message}\n", "error")
+        
+        # Update status
+        self._update_status_bar(message)
+        self._refresh_process_status()
+    
+    def stop_backend(self):
+        """Stop the backend server"""
+        self._stop_service('backend', "Backend server")
+    
+    def start_frontend(self):
+        """Start the frontend development server"""
+        if self.process_manager.is_process_running('frontend'):
+            self._write_to_console("Frontend is already running.\n", "warning")
+            return
+        
+        # Make sure the startup port lookup has landed
+        self._apply_frontend_port(wait=True)
+        
+        # Find npm executable
+        npm_path = self.controller.npm_path()
+        if npm_path is None:
+            self._write_to_console("npm executable not found. Please make sure Node.js is installed.\n", "error")
+            return
+        
+        if not self._reserve_frontend_port():
+            return
+        
+        # Start the frontend process
+        success, message = self.controller.start_service('frontend')
+        
+        # If there's an error, try again with the command as a single string for the shell
+        if not success and sys.platform == 'win32':
+            self._write_to_console("Retrying with alternative method...\n")
+            spec = self.controller.service_spec('frontend')
+            success, message = self.process_manager.start_process(
+                'frontend',
+                f"{npm_path} start",
+                cwd=spec['cwd'],
+                env=spec['env'],
+                port=spec['port']
+            )
+        
+        if success:
+            self._write_to_console(f"Started frontend server on port {self.frontend_port}, waiting until it is ready\n", "success")
+        else:
+            self._write_to_console(f"Failed to start frontend: {message}\n", "error")
+        
+        # Update status
+        self._update_status_bar(message)
+        self._refresh_process_status()
+    
+    def stop_frontend(self):
+        """Stop the frontend server"""
+        self._stop_service('frontend', "Frontend server")
+    
+    def _stop_service(self, name: str, label: str):
+        """Stop one service off the Tk thread; teardown can wait out the grace period and port release"""
+        if name in self._stopping:
+            self._write_to_console(f"{label} is already being stopped.\n", "warning")
+            return
+        self._stopping.add(name)
+        self._write_to_console(f"Stopping {label.lower()}...\n")
+        
+        def worker():
+            try:
+                success, message = self.controller.stop_service(name)
+                
+                if success:
+                    self._write_to_console(f"{label} stopped.\n", "success")
+                    if "still in use" in message:
+                        self._write_to_console(f"{message}\n", "warning")
+                else:
+                    self._write_to_console(f"Failed to stop {name}: {message}\n", "error")
+                
+                self._update_status_bar(message)
+            except Exception as e:
+                self._write_to_console(f"Failed to stop {name}: {e}\n", "error")
+                self.error_logger.log_error(f"Stop {label} Error", str(e), traceback.format_exc())
+            finally:
+                self._stopping.discard(name)
+                self._status_dirty = True
+        
+        threading.Thread(target=worker, name=f"Stop-{name}", daemon=True).start()
+    
+    def initialize_database(self):
+        """Initialize the database"""
+        self._write_to_console("Initializing database...\n")
+        
+        # The controller picks package.json's init-db script or server/init-db.js
+        if self.controller.db_init_spec() is None:
+            self._write_to_console("No database init script found: add an 'init-db' script to package.json "
+                                   "or create server/init-db.js.\n", "error")
+            return
+        success, message = self.controller.start_service('db_init')
+        
+        if success:
+            self._write_to_console("Database initialization started.\n", "success")
+            self.db_status.config(text="Initializing", style="Active.TLabel")
+        else:
+            self._write_to_console(f"Failed to initialize database: {message}\n", "error")
+        
+        # Update status
+        self._update_status_bar(message)
+        self._refresh_process_status()
+    
+    def check_database_connection(self):
+        """Check database connection"""
+        self._write_to_console("Checking database connection...\n")
+        # Implementation would depend on your specific database setup
+        self._write_to_console("Database connection check not implemented yet.\n", "warning")
+    
+    def start_all(self):
+        """Start all services in dependency order: database init, backend ready, then frontend"""
+        if self._orchestrating:
+            self._write_to_console("Services are already being started or stopped.\n", "warning")
+            return
+        if self.controller.npm_path() is None:
+            self._write_to_console("npm executable not found. Please make sure Node.js is installed.\n", "error")
+            return
+        
+        self._apply_frontend_port(wait=True)
+        if not self.process_manager.is_process_running('frontend') and not self._reserve_frontend_port():
+            return
+        include_db_init = self.init_db_on_start.get()
+        services = (['db_init'] if include_db_init else []) + list(ServiceController.SERVICES)
+        
+        self._orchestrating = True
+        self._write_to_console(f"Starting {', '.join(ServiceOrchestrator.order(services))}...\n")
+        
+        def worker():
+            try:
+                results, elapsed = self.controller.start_all(include_db_init, progress=self._write_to_console)
+                failed = [name for name, (ok, message) in results.items() if not ok]
+                if failed:
+                    self._write_to_console(f"Started with problems in {elapsed:.1f}s: {', '.join(failed)} not ready.\n", "error")
+                    self._update_status_bar(f"Start all: {', '.join(failed)} not ready")
+                else:
+                    self._write_to_console(f"All services ready in {elapsed:.1f}s.\n", "success")
+                    self._update_status_bar(f"All services ready in {elapsed:.1f}s")
+            except Exception as e:
+                self._write_to_console(f"Failed to start services: {e}\n", "error")
+                self.error_logger.log_error("Start All Error", str(e), traceback.format_exc())
+            finally:
+                self._orchestrating = False
+                self._status_dirty = True
+        
+        threading.Thread(target=worker, name="StartAll", daemon=True).start()
+        self._refresh_process_status()
+    
+    def stop_all(self):
+        """Stop all services in parallel"""
+        if self._orchestrating:
+            self._write_to_console("Services are already being started or stopped.\n", "warning")
+            return
+        self._orchestrating = True
+        self._write_to_console("Stopping all services...\n")
+        
+        def worker():
+            try:
+                # Stop all processes
+                results, elapsed = self.controller.stop_all()
+                
+                # Log results
+                for name, message in results.items():
+                    self._write_to_console(f"{name}: {message}\n")
+                
+                self._write_to_console(f"All services stopped in {elapsed:.1f}s.\n", "success")
+                self._update_status_bar(f"All services stopped in {elapsed:.1f}s")
+            finally:
+                self._orchestrating = False
+                self._status_dirty = True
+        
+        threading.Thread(target=worker, name="StopAll", daemon=True).start()
+    
+    def configure_ports(self):
+        """Configure the ports for backend and frontend"""
+        # Create a simple dialog to configure ports
+        config_window = tk.Toplevel(self.root)
+        config_window.title("Configure Ports")
+        config_window.geometry("300x150")
+        config_window.resizable(False, False)
+        config_window.configure(bg=self.bg_color)
+        config_window.transient(self.root)
+        config_window.grab_set()
+        
+        # Center on parent
+        x = self.root.winfo_x() + (self.root.winfo_width() - 300) // 2
+        y = self.root.winfo_y() + (self.root.winfo_height() - 150) // 2
+        config_window.geometry(f"+{x}+{y}")
+        
+        # Create form
+        form_frame = ttk.Frame(config_window)
+        form_frame.pack(padx=20, pady=20, fill=tk.BOTH, expand=True)
+        
+        # Backend port
+        ttk.Label(form_frame, text="Backend Port:").grid(row=0, column=0, sticky=tk.W, pady=5)
+        backend_entry = ttk.Entry(form_frame, width=10, textvariable=self.backend_port_var)
+        backend_entry.grid(row=0, column=1, sticky=tk.W, pady=5)
+        
+        # Frontend port
+        ttk.Label(form_frame, text="Frontend Port:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        frontend_entry = ttk.Entry(form_frame, width=10, textvariable=self.frontend_port_var)
+        frontend_entry.grid(row=1, column=1, sticky=tk.W, pady=5)
+        
+        # Buttons
+        btn_frame = ttk.Frame(form_frame)
+        btn_frame.grid(row=2, column=0, columnspan=2, pady=(10, 0))
+        
+        def save_ports():
+            try:
+                self.backend_port = int(self.backend_port_var.get())
+                self.frontend_port = int(self.frontend_port_var.get())
+                # An explicit choice wins over the startup lookup and its reservation
+                self._scanned_frontend_port = None
+                if not self.process_manager.is_process_running('frontend'):
+                    self.process_manager.ports.release('frontend')
+                self._write_to_console(f"Ports updated - Backend: {self.backend_port}, Frontend: {self.frontend_port}\n", "success")
+                config_window.destroy()
+            except ValueError:
+                messagebox.showerror("Invalid Input", "Please enter valid port numbers.")
+        
+        def cancel():
+            # Reset to current values
+            self.backend_port_var.set(str(self.backend_port))
+            self.frontend_port_var.set(str(self.frontend_port))
+            config_window.destroy()
+        
+        ttk.Button(btn_frame, text="Save", command=save_ports).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(btn_frame, text="Cancel", command=cancel).pack(side=tk.LEFT)
+    
+    def export_error_logs(self):
+        """Export error logs to a user-specified location on a background thread"""
+        # Create the export dialog
+        export_window = tk.Toplevel(self.root)
+        export_window.title("Export Error Logs")
+        export_window.geometry("420x260")
+        export_window.resizable(False, False)
+        export_window.configure(bg=self.bg_color)
+        export_window.transient(self.root)
+        
+        # Center on parent
+        x = self.root.winfo_x() + (self.root.winfo_width() - 420) // 2
+        y = self.root.winfo_y() + (self.root.winfo_height() - 260) // 2
+        export_window.geometry(f"+{x}+{y}")
+        
+        # Create form
+        form_frame = ttk.Frame(export_window)
+        form_frame.pack(padx=20, pady=20, fill=tk.BOTH, expand=True)
+        
+        format_var = tk.StringVar(value="txt")
+        start_var = tk.StringVar()
+        end_var = tk.StringVar()
+        types_var = tk.StringVar()
+        
+        ttk.Label(form_frame, text="Format:").grid(row=0, column=0, sticky=tk.W, pady=3)
+        ttk.Combobox(form_frame, textvariable=format_var, values=ErrorExporter.FORMATS,
+                     state="readonly", width=10).grid(row=0, column=1, sticky=tk.W, pady=3)
+        ttk.Label(form_frame, text="From (YYYY-MM-DD [HH:MM]):").grid(row=1, column=0, sticky=tk.W, pady=3)
+        ttk.Entry(form_frame, textvariable=start_var, width=18).grid(row=1, column=1, sticky=tk.W, pady=3)
+        ttk.Label(form_frame, text="To (YYYY-MM-DD [HH:MM]):").grid(row=2, column=0, sticky=tk.W, pady=3)
+        ttk.Entry(form_frame, textvariable=end_var, width=18).grid(row=2, column=1, sticky=tk.W, pady=3)
+        ttk.Label(form_frame, text="Types (comma-separated):").grid(row=3, column=0, sticky=tk.W, pady=3)
+        ttk.Entry(form_frame, textvariable=types_var, width=18).grid(row=3, column=1, sticky=tk.W, pady=3)
+        
+        # Progress indicator
+        progress = ttk.Progressbar(form_frame, mode="determinate", maximum=100)
+        progress.grid(row=4, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+        progress_label = ttk.Label(form_frame, text="")
+        progress_label.grid(row=5, column=0, columnspan=2, sticky=tk.W)
+        
+        # Buttons
+        btn_frame = ttk.Frame(form_frame)
+        btn_frame.grid(row=6, column=0, columnspan=2, pady=(10, 0))
+        
+        exporter: List[ErrorExporter] = []
+        
+        def parse_time(text, end_of_day=False):
+            text = text.strip()
+            if not text:
+                return None
+            for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+                try:
+                    value = datetime.strptime(text, fmt)
+                except ValueError:
+                    continue
+                if fmt == "%Y-%m-%d" and end_of_day:
+                    value = value.replace(hour=23, minute=59, second=59)
+                return value.timestamp()
+            raise ValueError(f"Invalid date: {text}")
+        
+        def poll():
+            if not export_window.winfo_exists():
+                return
+            current = exporter[0]
+            progress['value'] = current.progress * 100
+            progress_label.config(text=f"{current.records_written} records, {current.progress * 100:.0f}%")
+            if not current.finished.is_set():
+                export_window.after(100, poll)
+                return
+            
+            export_btn.config(state=tk.NORMAL)
+            cancel_btn.config(text="Close", command=close)
+            if current.error:
+                self._write_to_console(f"Failed to export error logs: {current.error}\n", "error")
+                messagebox.showerror("Export Failed", f"Failed to export error logs: {current.error}")
+                self.error_logger.log_error("Export Error", current.error)
+            elif current.cancelled.is_set():
+                progress_label.config(text="Export cancelled")
+                self._write_to_console("Error log export cancelled.\n", "warning")
+            else:
+                self._write_to_console(f"Error logs exported to: {current.output_path}\n", "success")
+                messagebox.showinfo("Export Complete", f"Error logs successfully exported to:\n{current.output_path}")
+        
+        def start_export():
+            try:
+                start_ts = parse_time(start_var.get())
+                end_ts = parse_time(end_var.get(), end_of_day=True)
+            except ValueError as e:
+                messagebox.showerror("Invalid Input", str(e))
+                return
+            types = [t.strip() for t in types_var.get().split(',') if t.strip()] or None
+            
+            store = self.error_logger.store
+            if not store.segments() and not store.legacy_files():
+                messagebox.showinfo("No Logs", "No error logs found to export.")
+                return
+            
+            # Get export directory from user
+            export_dir = filedialog.askdirectory(title="Select Export Directory")
+            if not export_dir:
+                return  # User cancelled
+            
+            # Create timestamp for export filename
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            fmt = format_var.get()
+            suffix = {'txt': '.txt', 'gz': '.txt.gz', 'tar.gz': '.tar.gz'}[fmt]
+            export_path = os.path.join(export_dir, f"re-chat_error_logs_{timestamp}{suffix}")
+            
+            # Make sure queued records are on disk, then stream off the Tk thread
+            self.error_logger.flush()
+            exporter[:] = [ErrorExporter(self.error_logger.store)]
+            exporter[0].start(export_path, fmt, start_ts, end_ts, types)
+            export_btn.config(state=tk.DISABLED)
+            cancel_btn.config(text="Cancel", command=exporter[0].cancel)
+            poll()
+        
+        def close():
+            # Closing the dialog also stops a running export
+            if exporter:
+                exporter[0].cancel()
+            export_window.destroy()
+        
+        export_btn = ttk.Button(btn_frame, text="Export", command=start_export)
+        export_btn.pack(side=tk.LEFT, padx=(0, 5))
+        cancel_btn = ttk.Button(btn_frame, text="Close", command=close)
+        cancel_btn.pack(side=tk.LEFT)
+        export_window.protocol("WM_DELETE_WINDOW", close)
+    
+    def view_recent_errors(self):
+        """View recent error logs in a dialog"""
+        # Get recent distinct errors
+        self.error_logger.flush()
+        recent_errors = self.error_logger.get_error_summary(max_count=10)
+        
+        if not recent_errors:
+            messagebox.showinfo("No Errors", "No recent error logs found.")
+            return
+        
+        # Create a dialog to display errors
+        error_window = tk.Toplevel(self.root)
+        error_window.title("Recent Errors")
+        error_window.geometry("800x600")
+        error_window.configure(bg=self.bg_color)
+        error_window.transient(self.root)
+        
+        # Center on parent
+        x = self.root.winfo_x() + (self.root.winfo_width() - 800) // 2
+        y = self.root.winfo_y() + (self.root.winfo_height() - 600) // 2
+        error_window.geometry(f"+{x}+{y}")
+        
+        # Create main frame
+        main_frame = ttk.Frame(error_window)
+        main_frame.pack(padx=20, pady=20, fill=tk.BOTH, expand=True)
+        
+        # Create notebook for tabbed interface
+        notebook = ttk.Notebook(main_frame)
+        notebook.pack(fill=tk.BOTH, expand=True)
+        
+        # Add a tab for each distinct error
+        for i, error_data in enumerate(recent_errors):
+            first_seen = datetime.fromtimestamp(error_data['first_seen']).strftime("%Y-%m-%d %H:%M:%S")
+            last_seen = datetime.fromtimestamp(error_data['last_seen']).strftime("%Y-%m-%d %H:%M:%S")
+            
+            # Create tab frame
+            tab_frame = ttk.Frame(notebook)
+            notebook.add(tab_frame, text=f"Error {i+1} (x{error_data['count']})")
+            
+            # Add occurrence info
+            info_frame = ttk.Frame(tab_frame)
+            info_frame.pack(fill=tk.X, padx=10, pady=5)
+            ttk.Label(info_frame, text=f"{error_data.get('type', '')}  |  Seen {error_data['count']} times  |  "
+                                       f"First: {first_seen}  |  Last: {last_seen}").pack(anchor=tk.W)
+            
+            # Add error content
+            error_text = scrolledtext.ScrolledText(tab_frame, wrap=tk.WORD, 
+                                               bg=self.bg_dark, 
+                                               fg=self.text_color,
+                                               font=("Consolas", 10),
+                                               height=20)
+            error_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+            error_text.insert(tk.END, error_data['content'])
+            error_text.config(state=tk.DISABLED)
+        
+        # Add close button
+        ttk.Button(main_frame, text="Close", command=error_window.destroy).pack(pady=(10, 0))
+    
+    def search_errors(self):
+        """Search the whole error history in a dialog"""
+        search_window = tk.Toplevel(self.root)
+        search_window.title("Search Errors")
+        search_window.geometry("800x600")
+        search_window.configure(bg=self.bg_color)
+        search_window.transient(self.root)
+        
+        # Center on parent
+        x = self.root.winfo_x() + (self.root.winfo_width() - 800) // 2
+        y = self.root.winfo_y() + (self.root.winfo_height() - 600) // 2
+        search_window.geometry(f"+{x}+{y}")
+        
+        # Create main frame
+        main_frame = ttk.Frame(search_window)
+        main_frame.pack(padx=20, pady=20, fill=tk.BOTH, expand=True)
+        
+        # Query input
+        query_frame = ttk.Frame(main_frame)
+        query_frame.pack(fill=tk.X)
+        query_entry = ttk.Entry(query_frame)
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        search_btn = ttk.Button(query_frame, text="Search")
+        search_btn.pack(side=tk.RIGHT, padx=(5, 0))
+        
+        result_label = ttk.Label(main_frame, text="Enter a term such as ECONNREFUSED or Admin.js")
+        result_label.pack(anchor=tk.W, pady=5)
+        
+        # Matching records and the selected record's details
+        results_list = tk.Listbox(main_frame, bg=self.bg_dark, fg=self.text_color,
+                                  selectbackground=self.button_bg, font=("Consolas", 10), height=10)
+        results_list.pack(fill=tk.X)
+        detail_text = scrolledtext.ScrolledText(main_frame, wrap=tk.WORD,
+                                                bg=self.bg_dark,
+                                                fg=self.text_color,
+                                                font=("Consolas", 10),
+                                                height=15)
+        detail_text.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        detail_text.config(state=tk.DISABLED)
+        
+        results: List[Dict[str, Any]] = []
+        # Bumped per search, so a slow search that finishes after a newer one is dropped
+        searches = [0]
+        
+        def show_results(search_id: int, found: List[Dict[str, Any]], elapsed: float, error: Optional[str]):
+            if search_id != searches[0] or not search_window.winfo_exists():
+                return
+            search_btn.config(state=tk.NORMAL)
+            if error is not None:
+                result_label.config(text=f"Search failed: {error}")
+                return
+            results[:] = found
+            results_list.delete(0, tk.END)
+            for record in results:
+                message = ANSI_ESCAPE_RE.sub('', str(record.get('message', '')))
+                results_list.insert(tk.END, f"{record.get('timestamp', '')}  {record.get('type', '')}  {message[:80]}")
+            result_label.config(text=f"{len(results)} results in {elapsed:.1f} ms")
+        
+        def run_search(event=None):
+            query = query_entry.get().strip()
+            if not query:
+                return
+            searches[0] += 1
+            search_id = searches[0]
+            search_btn.config(state=tk.DISABLED)
+            result_label.config(text="Searching...")
+            
+            # Loading the index and reading segments can take seconds on a large store
+            def worker():
+                found, error = [], None
+                started = time.perf_counter()
+                try:
+                    self.error_logger.flush()
+                    found = self.error_logger.search_index.search(query, limit=500)
+                except Exception as e:
+                    error = str(e)
+                elapsed = (time.perf_counter() - started) * 1000
+                try:
+                    search_window.after(0, show_results, search_id, found, elapsed, error)
+                except (tk.TclError, RuntimeError):
+                    pass  # the dialog or the panel was closed meanwhile
+            
+            threading.Thread(target=worker, name="ErrorSearch", daemon=True).start()
+        
+        def show_selected(event=None):
+            selection = results_list.curselection()
+            if not selection:
+                return
+            record = results[selection[0]]
+            detail_text.config(state=tk.NORMAL)
+            detail_text.delete("1.0", tk.END)
+            detail_text.insert(tk.END, f"File: {os.path.basename(record.get('path', ''))}\n")
+            detail_text.insert(tk.END, ANSI_ESCAPE_RE.sub('', self.error_logger.store.format_record(record)))
+            detail_text.config(state=tk.DISABLED)
+        
+        search_btn.config(command=run_search)
+        query_entry.bind("<Return>", run_search)
+        results_list.bind("<<ListboxSelect>>", show_selected)
+        query_entry.focus_set()
+        
+        # Add close button
+        ttk.Button(main_frame, text="Close", command=search_window.destroy).pack(pady=(10, 0))
+    
+    def show_about(self):
+        """Show the about dialog"""
+        messagebox.showinfo(
+            "About Re-Chat.to Server Control",
+            "Re-Chat.to Server Control Panel\n\n" +
+            "A modern control panel for managing the Re-Chat.to application servers.\n\n" +
+            "Features:\n" +
+            "- Start/stop backend and frontend servers\n" +
+            "- Database initialization and checking\n" +
+            "- Error logging with export capability\n" +
+            "- Custom command execution\n\n" +
+            " 2025 Re-Chat.to"
+        )
+    
+    def on_closing(self):
+        """Handle window closing"""
+        # Ask user confirmation if processes are running
+        if (self.process_manager.is_process_running('backend') or 
+            self.process_manager.is_process_running('frontend')):
+            if not messagebox.askyesno("Confirm Exit", "There are running servers. Are you sure you want to exit?"):
+                return
+        
+        self._close()
+    
+    def _close(self):
+        if self._benchmark is not None:
+            self._benchmark.cancel()
+        self.stop_control_api()
+        
+        # Stop all processes and flush the error log
+        self.controller.close()
+        self.root.destroy()
+    
+    def start_control_api(self, host: str, port: int, unix_path: Optional[str] = None,
+                          allow_remote: bool = False) -> Optional[ControlServer]:
+        """Serve the control API for this panel's services from the supervisor loop"""
+        supervisor = self.process_manager.supervisor
+        supervisor.start()
+        try:
+            server = ControlServer(self.controller, host, port, unix_path, allow_remote)
+            asyncio.run_coroutine_threadsafe(server.start(), supervisor.loop).result(timeout=5)
+        except (OSError, ValueError) as e:
+            self._write_to_console(f"Control API not started: {e}\n", "error")
+            return None
+        self.control_server = server
+        asyncio.run_coroutine_threadsafe(self._await_api_shutdown(server), supervisor.loop)
+        self._write_to_console(f"Control API listening on {server.address()}\n", "success")
+        return server
+    
+    async def _await_api_shutdown(self, server: ControlServer):
+        """POST /shutdown closes the panel the way the window's close button does, without asking"""
+        await server.shutdown_requested.wait()
+        if self.control_server is server:
+            self._write_to_console("Shutdown requested through the control API\n", "warning")
+            self.root.after(0, self._close)
+    
+    def stop_control_api(self):
+        server, self.control_server = self.control_server, None
+        loop = self.process_manager.supervisor.loop
+        if server is None or loop is None or loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(server.close(), loop).result(timeout=5)
+        except Exception:
+            pass
+        # Wakes the shutdown watcher so its task ends
+        loop.call_soon_threadsafe(server.request_shutdown)
+
+    def run_custom_command(self):
+        cmd = self.cmd_entry.get().strip()
+        if not cmd:
+            return
+        
+        self._write_to_console(f"Running custom command: npm {cmd}\n")
+        
+        # Started through the controller, so it is tracked, stopped by Stop All and
+        # its output reaches the console like a service's
+        success, message = self.controller.run_command(cmd)
+        if success:
+            self.cmd_entry.delete(0, tk.END)
+            self._update_status_bar(f"Running: npm {cmd}")
+        else:
+            self._write_to_console(f"Error running command: {message}\n", "error")
+            self._update_status_bar(f"Error: {message}")
+        self._refresh_process_status()
+
+
+def run_gui(on_ready: Optional[Callable[[], None]] = None,
+            on_panel: Optional[Callable[[ServerControlPanel], None]] = None):
+    """Create the Tk root, install the error dialog hook and run the panel.
+    
+    on_panel is called with the panel as soon as it exists, on_ready once the window has
+    been built and the event loop is idle.
+    """
+    app = None
+    
+    # Set up exception handling
+    def show_error(exctype, value, tb):
+        # Log error to file, through the running panel's writer when there is one
+        error_logger = app.error_logger if app is not None else ErrorLogger()
+        error_logger.log_error(f"{exctype.__name__}", str(value), ''.join(traceback.format_exception(exctype, value, tb)))
+        error_logger.flush()
+        
+        # Show error dialog
+        messagebox.showerror("Error", f"An unexpected error occurred:\n{exctype.__name__}: {value}\n\nThe error has been logged to the 'errors' folder.")
+        
+        # Call original exception hook
+        sys.__excepthook__(exctype, value, tb)
+    
+    sys.excepthook = show_error
+    
+    # Start the application
+    root = tk.Tk()
+    app = ServerControlPanel(root)
+    root.protocol("WM_DELETE_WINDOW", app.on_closing)
+    if on_panel is not None:
+        on_panel(app)
+    if on_ready is not None:
+        root.after_idle(on_ready)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    run_gui()
@@ -8,6 +8,7 @@ import sys
 import time
 import shutil
 import socket
+import gzip
 from datetime import datetime
 import traceback
 
@@ -16,11 +17,66 @@ ERROR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'errors')
 if not os.path.exists(ERROR_DIR):
     os.makedirs(ERROR_DIR)
 
+# One log file per session, rolled over once it reaches this size
+ERROR_LOG_MAX_BYTES = 1024 * 1024
+_error_log_file = None
+
+# Retention for this panel's own error_log_*.txt files, matching the full panel's
+# ErrorStore defaults: files idle this long are gzipped, and the oldest ones are deleted
+# while the errors directory is over its size budget. Structured errors_*.jsonl segments
+# are left to the full panel's maintenance.
+ERROR_LOG_MAX_AGE = 24 * 3600
+ERROR_DIR_MAX_BYTES = 100 * 1024 * 1024
+
 # Utility Functions
+def _current_error_log():
+    """Return this session's error log, starting a new file when the current one is full"""
+    global _error_log_file
+    if (_error_log_file is None or
+            (os.path.exists(_error_log_file) and os.path.getsize(_error_log_file) >= ERROR_LOG_MAX_BYTES)):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        _error_log_file = os.path.join(ERROR_DIR, f"error_log_{timestamp}.txt")
+        threading.Thread(target=_maintain_error_logs, args=(_error_log_file,), daemon=True).start()
+    return _error_log_file
+
+def _maintain_error_logs(current):
+    """Gzip idle error logs, then delete the oldest ones until the directory fits its budget"""
+    try:
+        now = time.time()
+        for name in os.listdir(ERROR_DIR):
+            path = os.path.join(ERROR_DIR, name)
+            # Another session may still append to a log; only touch idle ones
+            if (name.startswith('error_log_') and name.endswith('.txt') and path != current and
+                    now - os.path.getmtime(path) >= ERROR_LOG_MAX_AGE):
+                try:
+                    with open(path, 'rb') as source, gzip.open(path + '.gz.tmp', 'wb') as target:
+                        shutil.copyfileobj(source, target)
+                    os.replace(path + '.gz.tmp', path + '.gz')
+                    os.remove(path)
+                except OSError:
+                    if os.path.exists(path + '.gz.tmp'):
+                        os.remove(path + '.gz.tmp')
+        
+        total = sum(os.path.getsize(os.path.join(ERROR_DIR, name)) for name in os.listdir(ERROR_DIR)
+                    if name.startswith(('errors_', 'error_log_')) and not name.endswith('.tmp'))
+        # Names embed their creation time, so they sort oldest first
+        for name in sorted(name for name in os.listdir(ERROR_DIR)
+                           if name.startswith('error_log_') and name.endswith(('.txt', '.txt.gz'))):
+            if total <= ERROR_DIR_MAX_BYTES:
+                break
+            path = os.path.join(ERROR_DIR, name)
+            if path == current:
+                continue
+            size = os.path.getsize(path)
+            os.remove(path)
+            total -= size
+    except OSError:
+        # Typically a file still open elsewhere on Windows; retried at the next rollover
+        pass
+
 def log_error(error_type, message, tb_info=None):
     """Log error to a file in the errors directory"""
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file = os.path.join(ERROR_DIR, f"error_log_{timestamp}.txt")
+    log_file = _current_error_log()
     
     with open(log_file, 'a', encoding='utf-8') as f:
         f.write(f"\n{'=' * 50}\n")
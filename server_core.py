@@ -0,0 +1,4219 @@
+import asyncio
+import atexit
+import errno
+import gzip
+import hashlib
+import io
+import ipaddress
+import itertools
+import math
+import subprocess
+import threading
+import os
+import signal
+import sys
+import time
+import shutil
+import socket
+import json
+import queue
+import random
+import re
+import selectors
+import shlex
+import struct
+import tarfile
+import tempfile
+import traceback
+import weakref
+import zlib
+from array import array
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Tuple, Callable, Iterable, Set
+from urllib.parse import parse_qs, urlsplit
+
+# Terminal colour codes emitted by webpack, babel and npm
+ANSI_ESCAPE_RE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+
+# Error Store
+class ErrorStore:
+    """Append-only JSON-lines error segments, each with a fixed-size binary offset index"""
+    # offset, length, unix timestamp, crc32 of the error type
+    INDEX_ENTRY = struct.Struct('<QIdI')
+    MANIFEST = 'segments.json'
+    RECORD_SEPARATOR = '=' * 50
+    # Shared by every store in this process so manifest rewrites do not interleave
+    _manifest_lock = threading.Lock()
+
+    def __init__(self, error_dir: str, max_segment_bytes: int = 5 * 1024 * 1024,
+                 max_segment_age: float = 24 * 3600, max_total_bytes: int = 100 * 1024 * 1024,
+                 compress: bool = True):
+        self.error_dir = error_dir
+        # Rotation policy: a segment is closed once it reaches max_segment_bytes or
+        # max_segment_age seconds; closed segments and idle legacy files are gzipped in
+        # the background and the oldest files are deleted beyond max_total_bytes.
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.max_total_bytes = max_total_bytes
+        self.compress = compress
+        self._lock = threading.Lock()
+        self._maintenance_lock = threading.Lock()
+        # Optional ErrorSearchIndex updated with every write
+        self.search_index = None
+        self._new_segment()
+
+    def _new_segment(self):
+        self.segment_path = os.path.join(
+            self.error_dir,
+            f"errors_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl"
+        )
+        self.segment_started = time.time()
+        self.segment_bytes = 0
+        self._registered = False
+
+    @staticmethod
+    def index_path(segment_path: str) -> str:
+        """Path of the sidecar index belonging to a segment"""
+        return os.path.splitext(segment_path)[0] + '.idx'
+
+    @staticmethod
+    def type_hash(error_type: str) -> int:
+        return zlib.crc32(error_type.encode('utf-8'))
+
+    @staticmethod
+    def make_record(error_type: str, error_message: str, traceback_info: str = None) -> Dict[str, Any]:
+        """Build a structured error record stamped with the current time"""
+        now = time.time()
+        return {
+            'ts': now,
+            'timestamp': datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+            'type': error_type,
+            'message': error_message,
+            'traceback': traceback_info,
+        }
+
+    @classmethod
+    def format_record(cls, record: Dict[str, Any]) -> str:
+        """Render a record in the plain-text layout of the original error_log_*.txt files"""
+        text = f"\n{cls.RECORD_SEPARATOR}\n"
+        text += f"TIMESTAMP: {record.get('timestamp', '')}\n"
+        text += f"TYPE: {record.get('type', '')}\n"
+        text += f"MESSAGE: {record.get('message', '')}\n"
+        if record.get('traceback'):
+            text += f"\nTRACEBACK:\n{record['traceback']}\n"
+        text += f"{cls.RECORD_SEPARATOR}\n\n"
+        return text
+
+    # Writing
+
+    def open_files(self):
+        """Open the current segment and its index for appending"""
+        self._register_segment()
+        return open(self.segment_path, 'ab'), open(self.index_path(self.segment_path), 'ab')
+
+    def write_records(self, records: List[Dict[str, Any]], data_file, index_file):
+        """Append records to open segment/index handles; the data is flushed before its index entries"""
+        offset = data_file.tell()
+        chunks = []
+        entries = []
+        locations = []
+        for record in records:
+            line = (json.dumps(record, ensure_ascii=False) + '\n').encode('utf-8')
+            chunks.append(line)
+            entries.append(self.INDEX_ENTRY.pack(offset, len(line), record['ts'], self.type_hash(record['type'])))
+            locations.append((offset, len(line), record))
+            offset += len(line)
+        data_file.write(b''.join(chunks))
+        data_file.flush()
+        index_file.write(b''.join(entries))
+        index_file.flush()
+        self.segment_bytes = offset
+        
+        if self.search_index is not None:
+            self.search_index.add_records(os.path.basename(self.segment_path), locations)
+
+    def append(self, records: List[Dict[str, Any]]):
+        """Append records, opening and closing the segment for this call"""
+        with self._lock:
+            if self.should_rotate():
+                self.rotate()
+            data_file, index_file = self.open_files()
+            with data_file, index_file:
+                self.write_records(records, data_file, index_file)
+
+    def should_rotate(self) -> bool:
+        """Whether the current segment has reached its size or age limit"""
+        if self.segment_bytes == 0:
+            return False
+        return (self.segment_bytes >= self.max_segment_bytes or
+                time.time() - self.segment_started >= self.max_segment_age)
+
+    def rotate(self):
+        """Close the current segment (its handles must already be closed) and start a new one"""
+        self._new_segment()
+        self.start_maintenance()
+
+    def _register_segment(self):
+        """Add the current segment to the manifest the first time it is written"""
+        if self._registered:
+            return
+        with self._manifest_lock:
+            segments = self._read_manifest()
+            name = os.path.basename(self.segment_path)
+            if name not in segments:
+                segments.append(name)
+                self._write_manifest(segments)
+        self._registered = True
+
+    def _read_manifest(self) -> List[str]:
+        try:
+            with open(os.path.join(self.error_dir, self.MANIFEST), 'r', encoding='utf-8') as f:
+                return json.load(f).get('segments', [])
+        except (OSError, ValueError):
+            return []
+
+    def _write_manifest(self, segments: List[str]):
+        manifest_path = os.path.join(self.error_dir, self.MANIFEST)
+        temp_path = manifest_path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'segments': segments}, f)
+        os.replace(temp_path, manifest_path)
+
+    # Maintenance
+
+    def start_maintenance(self):
+        """Compress closed files and apply the size budget on a background thread"""
+        threading.Thread(target=self.maintain, name="ErrorStoreMaintenance", daemon=True).start()
+
+    def maintain(self):
+        """Gzip closed segments and idle legacy logs, then delete the oldest files over budget"""
+        if not self._maintenance_lock.acquire(blocking=False):
+            return
+        try:
+            if self.compress:
+                for path in self._closed_files():
+                    self._compress_file(path)
+            self._enforce_total_size()
+        except OSError:
+            pass
+        finally:
+            self._maintenance_lock.release()
+
+    def _closed_files(self) -> List[str]:
+        """Uncompressed segments and legacy files that are no longer written to"""
+        closed = [path for path in self.segments()
+                  if path != self.segment_path and os.path.exists(path)]
+        now = time.time()
+        for path in self.legacy_files():
+            # Another panel may still append to a legacy file; only touch idle ones
+            if path.endswith('.txt') and now - os.path.getmtime(path) >= self.max_segment_age:
+                closed.append(path)
+        return closed
+
+    def _compress_file(self, path: str, chunk_size: int = 64 * 1024):
+        """Replace path with path.gz, streaming in fixed-size chunks"""
+        temp_path = path + '.gz.tmp'
+        try:
+            with open(path, 'rb') as source, gzip.open(temp_path, 'wb') as target:
+                shutil.copyfileobj(source, target, chunk_size)
+            os.replace(temp_path, path + '.gz')
+            os.remove(path)
+        except OSError:
+            # Typically a reader still has the file open on Windows; retry next time
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _enforce_total_size(self):
+        """Delete the oldest segments and legacy files until the directory fits max_total_bytes"""
+        # Group each segment with its index; names embed their creation time so they sort by age
+        groups: Dict[str, List[Any]] = {}
+        total = 0
+        for name in os.listdir(self.error_dir):
+            if not (name.startswith('errors_') or name.startswith('error_log_')) or name.endswith('.tmp'):
+                continue
+            path = os.path.join(self.error_dir, name)
+            size = os.path.getsize(path)
+            total += size
+            group = groups.setdefault(name.split('.')[0], [0, []])
+            group[0] += size
+            group[1].append(path)
+        if total <= self.max_total_bytes:
+            return
+        
+        current = os.path.basename(self.segment_path).split('.')[0]
+        removed_segments = set()
+        for base in sorted(groups, key=lambda base: re.sub(r'\D', '', base)):
+            if total <= self.max_total_bytes:
+                break
+            if base == current:
+                continue
+            size, paths = groups[base]
+            try:
+                for path in paths:
+                    os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if base.startswith('errors_'):
+                removed_segments.add(base + '.jsonl')
+        
+        if removed_segments:
+            with self._manifest_lock:
+                segments = [name for name in self._read_manifest() if name not in removed_segments]
+                self._write_manifest(segments)
+
+    # Reading
+
+    def segments(self) -> List[str]:
+        """Paths of all structured segments, oldest first; compressed ones keep their .jsonl path"""
+        paths = [os.path.join(self.error_dir, name) for name in self._read_manifest()]
+        return [path for path in paths if os.path.exists(path) or os.path.exists(path + '.gz')]
+
+    @staticmethod
+    def open_binary(path: str):
+        """Open a segment or log for reading, transparently using its .gz copy"""
+        if path.endswith('.gz'):
+            return gzip.open(path, 'rb')
+        try:
+            return open(path, 'rb')
+        except FileNotFoundError:
+            return gzip.open(path + '.gz', 'rb')
+
+    @classmethod
+    def open_text(cls, path: str):
+        """Text-mode variant of open_binary"""
+        return io.TextIOWrapper(cls.open_binary(path), encoding='utf-8', errors='replace')
+
+    def read_index(self, segment_path: str, last: int = None) -> List[Tuple[int, int, float, int]]:
+        """Read (offset, length, timestamp, type_hash) entries, optionally only the last ones"""
+        entry_size = self.INDEX_ENTRY.size
+        try:
+            with open(self.index_path(segment_path), 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                count = f.tell() // entry_size
+                start = 0 if last is None else max(0, count - last)
+                f.seek(start * entry_size)
+                data = f.read((count - start) * entry_size)
+        except OSError:
+            return []
+        return [entry for entry in self.INDEX_ENTRY.iter_unpack(data)]
+
+    def read_record(self, segment_path: str, offset: int, length: int) -> Optional[Dict[str, Any]]:
+        """Read a single record at a known offset"""
+        try:
+            with self.open_binary(segment_path) as f:
+                f.seek(offset)
+                return json.loads(f.read(length).decode('utf-8'))
+        except (OSError, ValueError, EOFError, zlib.error):
+            return None
+
+    def read_records(self, segment_path: str, locations: Iterable[Tuple[int, int]]) -> List[Tuple[int, Dict[str, Any]]]:
+        """Read the records at (offset, length) locations in one forward pass and return
+        (offset, record) pairs in file order; a gzipped segment is decompressed only once"""
+        result = []
+        try:
+            with self.open_binary(segment_path) as f:
+                for offset, length in sorted(locations):
+                    f.seek(offset)
+                    try:
+                        result.append((offset, json.loads(f.read(length).decode('utf-8'))))
+                    except ValueError:
+                        continue
+        except (OSError, EOFError, zlib.error):
+            pass
+        return result
+
+    def recent(self, count: int) -> List[Dict[str, Any]]:
+        """Return the newest count records, newest first, reading only their index entries"""
+        result = []
+        for segment_path in reversed(self.segments()):
+            needed = count - len(result)
+            if needed <= 0:
+                break
+            entries = self.read_index(segment_path, last=needed)
+            if not entries:
+                continue
+            # Read forward and reverse in memory: seeking backwards in a .gz restarts decompression
+            records = self.read_records(segment_path, [(offset, length) for offset, length, _, _ in entries])
+            for _, record in reversed(records):
+                record['path'] = segment_path
+                result.append(record)
+        return result
+
+    def iter_records(self, segment_path: str):
+        """Yield every record of a segment in write order"""
+        with self.open_text(segment_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                record['path'] = segment_path
+                yield record
+
+    def legacy_files(self) -> List[str]:
+        """Plain-text error_log_*.txt(.gz) files written before the structured store, oldest first"""
+        try:
+            names = os.listdir(self.error_dir)
+        except OSError:
+            return []
+        return sorted(os.path.join(self.error_dir, name) for name in names
+                      if name.startswith('error_log_') and name.endswith(('.txt', '.txt.gz')))
+
+    def iter_legacy_records(self, file_path: str):
+        """Parse the records of a legacy text log file"""
+        with self.open_text(file_path) as f:
+            content = f.read()
+        for block in content.split(f"\n{self.RECORD_SEPARATOR}\n"):
+            block = block.strip()
+            if not block.startswith('TIMESTAMP:'):
+                continue
+            record: Dict[str, Any] = {'path': file_path, 'traceback': None}
+            head, _, tb = block.partition('\nTRACEBACK:\n')
+            if tb:
+                record['traceback'] = tb.strip()
+            for line in head.splitlines():
+                key, _, value = line.partition(': ')
+                if key == 'TIMESTAMP':
+                    record['timestamp'] = value
+                elif key == 'TYPE':
+                    record['type'] = value
+                elif key == 'MESSAGE':
+                    record['message'] = value
+            try:
+                record['ts'] = datetime.strptime(record.get('timestamp', ''), "%Y-%m-%d %H:%M:%S").timestamp()
+            except ValueError:
+                record['ts'] = os.path.getmtime(file_path)
+            yield record
+
+# Error Search Index
+class ErrorSearchIndex:
+    """Inverted index from tokens to error records, persisted as an append-only postings file"""
+    FILE_NAME = 'search_index.jsonl'
+    TOKEN_RE = re.compile(r'[a-z0-9_]{2,64}')
+
+    def __init__(self, store: ErrorStore):
+        self.store = store
+        self.index_file = os.path.join(store.error_dir, self.FILE_NAME)
+        self.loaded = False
+        self._lock = threading.Lock()
+        # Legacy text logs can still grow (server_control_simple.py appends to one file per
+        # session): records indexed and the size last seen per legacy source
+        self._legacy_lock = threading.Lock()
+        self._legacy_indexed: Dict[str, int] = {}
+        self._legacy_sizes: Dict[str, int] = {}
+        # Documents are numbered in insertion order; their locations live in parallel arrays
+        self._sources: List[str] = []
+        self._source_ids: Dict[str, int] = {}
+        self._doc_source = array('I')
+        self._doc_offset = array('q')
+        self._doc_length = array('I')
+        self._postings: Dict[str, array] = {}
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        """Lower-case word tokens of a text, ignoring ANSI colour codes"""
+        return cls.TOKEN_RE.findall(ANSI_ESCAPE_RE.sub('', text).lower())
+
+    @classmethod
+    def record_tokens(cls, record: Dict[str, Any]) -> List[str]:
+        text = ' '.join(str(record.get(key) or '') for key in ('type', 'message', 'traceback'))
+        return sorted(set(cls.tokenize(text)))
+
+    @staticmethod
+    def source_key(path: str) -> str:
+        """Stable name of a segment or legacy file, whether or not it has been gzipped"""
+        name = os.path.basename(path)
+        return name[:-3] if name.endswith('.gz') else name
+
+    # Updating
+
+    def add_records(self, source: str, entries: List[Tuple[int, int, Dict[str, Any]]]):
+        """Index (offset, length, record) entries of a source; legacy records use offset=ordinal, length=0"""
+        lines = []
+        with self._lock:
+            for offset, length, record in entries:
+                tokens = self.record_tokens(record)
+                lines.append(json.dumps({'s': source, 'o': offset, 'l': length, 'k': tokens}) + '\n')
+                if self.loaded:
+                    self._add_doc(source, offset, length, tokens)
+            with open(self.index_file, 'a', encoding='utf-8') as f:
+                f.write(''.join(lines))
+
+    def _add_doc(self, source: str, offset: int, length: int, tokens: List[str]):
+        source_id = self._source_ids.get(source)
+        if source_id is None:
+            source_id = self._source_ids[source] = len(self._sources)
+            self._sources.append(source)
+        doc_id = len(self._doc_source)
+        self._doc_source.append(source_id)
+        self._doc_offset.append(offset)
+        self._doc_length.append(length)
+        for token in tokens:
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = array('I')
+            postings.append(doc_id)
+
+    def load(self):
+        """Load the postings file, then index any segment or legacy log it does not cover yet"""
+        with self._lock:
+            if self.loaded:
+                return
+            exists: Dict[str, bool] = {}
+            kept = []
+            dropped = 0
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            doc = json.loads(line)
+                        except ValueError:
+                            dropped += 1
+                            continue
+                        source = doc['s']
+                        if source not in exists:
+                            path = os.path.join(self.store.error_dir, source)
+                            exists[source] = os.path.exists(path) or os.path.exists(path + '.gz')
+                        if not exists[source]:
+                            dropped += 1
+                            continue
+                        kept.append(line)
+                        self._add_doc(source, doc['o'], doc['l'], doc['k'])
+                        if not doc['l']:
+                            self._legacy_indexed[source] = max(self._legacy_indexed.get(source, 0), doc['o'] + 1)
+            except OSError:
+                pass
+            
+            # Compact away postings of files deleted by retention
+            if dropped:
+                temp_path = self.index_file + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(''.join(kept))
+                os.replace(temp_path, self.index_file)
+            self.loaded = True
+            indexed = set(self._source_ids)
+        
+        # Backfill sources written before the index existed (or by an older panel)
+        for segment_path in self.store.segments():
+            source = self.source_key(segment_path)
+            if source in indexed or segment_path == self.store.segment_path:
+                continue
+            lengths = {offset: length for offset, length, _, _ in self.store.read_index(segment_path)}
+            records = self.store.read_records(segment_path, lengths.items())
+            self.add_records(source, [(offset, lengths[offset], record) for offset, record in records])
+        self.update_legacy()
+
+    def update_legacy(self):
+        """Index legacy records appended since the last pass; unchanged files are skipped by size"""
+        with self._legacy_lock:
+            for file_path in self.store.legacy_files():
+                source = self.source_key(file_path)
+                try:
+                    size = os.path.getsize(file_path)
+                except OSError:
+                    continue
+                if self._legacy_sizes.get(source) == size:
+                    continue
+                start = self._legacy_indexed.get(source, 0)
+                try:
+                    records = list(self.store.iter_legacy_records(file_path))
+                except (OSError, EOFError, zlib.error):
+                    continue
+                if len(records) > start:
+                    self.add_records(source, [(ordinal, 0, record)
+                                              for ordinal, record in enumerate(records[start:], start)])
+                    self._legacy_indexed[source] = len(records)
+                self._legacy_sizes[source] = size
+
+    # Querying
+
+    def search(self, query: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return up to limit records containing every term of query, newest first"""
+        self.load()
+        self.update_legacy()
+        terms = query.lower().split()
+        tokens = self.tokenize(query)
+        if not terms:
+            return []
+        
+        with self._lock:
+            if tokens:
+                postings = [self._postings.get(token) for token in set(tokens)]
+                if any(p is None for p in postings):
+                    return []
+                postings.sort(key=len)
+                candidates = set(postings[0])
+                for other in postings[1:]:
+                    candidates.intersection_update(other)
+                    if not candidates:
+                        return []
+                doc_ids = sorted(candidates, reverse=True)
+            else:
+                # Punctuation-only query: nothing to look up, check records newest first
+                doc_ids = range(len(self._doc_source) - 1, -1, -1)
+            # Candidates grouped by source, so each segment is read in one pass rather than
+            # seeked into once per record, which decompresses a gzipped one from its start
+            groups: Dict[str, List[Tuple[int, int, int]]] = {}
+            for doc_id in doc_ids:
+                source = self._sources[self._doc_source[doc_id]]
+                groups.setdefault(source, []).append((doc_id, self._doc_offset[doc_id], self._doc_length[doc_id]))
+        
+        # Confirm each candidate against the record text (tokens ignore punctuation such as "Admin.js").
+        # Sources are visited by their newest candidate, so once limit matches are found only
+        # a source holding a newer candidate than the oldest match can still change the result.
+        matches: List[Tuple[int, Dict[str, Any]]] = []
+        for source, docs in groups.items():
+            if len(matches) >= limit and docs[0][0] < matches[limit - 1][0]:
+                break
+            for doc_id, record in self._read_group(source, docs):
+                text = ANSI_ESCAPE_RE.sub('', self.store.format_record(record)).lower()
+                if all(term in text for term in terms):
+                    matches.append((doc_id, record))
+            matches.sort(key=lambda match: match[0], reverse=True)
+        return [record for _, record in matches[:limit]]
+
+    def _read_group(self, source: str, docs: List[Tuple[int, int, int]]) -> List[Tuple[int, Dict[str, Any]]]:
+        """(doc_id, record) for the given documents of one source, skipping unreadable ones"""
+        path = os.path.join(self.store.error_dir, source)
+        if not os.path.exists(path) and not os.path.exists(path + '.gz'):
+            return []  # removed by retention
+        result = []
+        structured = [(doc_id, offset, length) for doc_id, offset, length in docs if length]
+        if structured:
+            doc_at = {offset: doc_id for doc_id, offset, _ in structured}
+            for offset, record in self.store.read_records(path, [(offset, length) for _, offset, length in structured]):
+                record['path'] = path
+                result.append((doc_at[offset], record))
+        if len(structured) < len(docs):
+            records = list(self.store.iter_legacy_records(path))
+            result.extend((doc_id, records[offset]) for doc_id, offset, length in docs
+                          if not length and offset < len(records))
+        return result
+
+# Error Fingerprints
+class ErrorFingerprints:
+    """Occurrence counters for distinct errors, keyed by a hash of their normalized text"""
+    FILE_NAME = 'fingerprints.json'
+    NORMALIZERS = (
+        (ANSI_ESCAPE_RE, ''),
+        # Timestamps such as 2025-05-10 22:28:14, 2025-05-10T22:28:14.123Z and 22:28:14
+        (re.compile(r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d+)?Z?'), '<time>'),
+        (re.compile(r'\b\d{1,2}:\d{2}:\d{2}(?:\.\d+)?\b'), '<time>'),
+        # Absolute Windows and POSIX paths keep only their file name
+        (re.compile(r'\b[A-Za-z]:\\(?:[^\\\s:*?"<>|]+\\)*'), '<path>/'),
+        (re.compile(r'(?<![\w.])/(?:[\w.@+-]+/)+'), '<path>/'),
+        # Line and column numbers: file.js:12:5, (948:9), Line 948
+        (re.compile(r'\(\d+:\d+\)'), '(<n>)'),
+        (re.compile(r'(?<=[\w)\]]):\d+(?::\d+)?'), ':<n>'),
+        (re.compile(r'\b([Ll]ine)\s+\d+'), r'\1 <n>'),
+    )
+
+    def __init__(self, error_dir: str, dedup_window: Optional[float] = 3600.0, max_entries: int = 5000):
+        self.path = os.path.join(error_dir, self.FILE_NAME)
+        # A repeat is only counted, unless the last full record of that error is
+        # older than dedup_window seconds (None: never write a repeat again)
+        self.dedup_window = dedup_window
+        self.max_entries = max_entries
+        self.suppressed = 0
+        # Least recently seen first, so eviction pops from the front
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._dirty = False
+        self._last_save = 0.0
+        self._lock = threading.Lock()
+        self._load()
+
+    @classmethod
+    def normalize(cls, text: str) -> str:
+        """Strip the volatile parts of an error text"""
+        for pattern, replacement in cls.NORMALIZERS:
+            text = pattern.sub(replacement, text)
+        return ' '.join(text.split())
+
+    @classmethod
+    def fingerprint(cls, error_type: str, message: str, traceback_info: str = None) -> str:
+        text = '\n'.join(cls.normalize(part or '') for part in (error_type, message, traceback_info))
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+    def observe(self, record: Dict[str, Any]) -> bool:
+        """Count a record and tag it with its fingerprint; returns whether it should be written in full"""
+        fingerprint = self.fingerprint(record['type'], record['message'], record.get('traceback'))
+        record['fingerprint'] = fingerprint
+        with self._lock:
+            self._dirty = True
+            entry = self._entries.get(fingerprint)
+            if entry is None:
+                if len(self._entries) >= self.max_entries:
+                    self._entries.popitem(last=False)
+                self._entries[fingerprint] = {
+                    'type': record['type'],
+                    'message': record['message'],
+                    'traceback': (record.get('traceback') or '')[:2000] or None,
+                    'count': 1,
+                    'first_seen': record['ts'],
+                    'last_seen': record['ts'],
+                    'last_written': record['ts'],
+                }
+                return True
+            
+            entry['count'] += 1
+            entry['last_seen'] = record['ts']
+            self._entries.move_to_end(fingerprint)
+            if self.dedup_window is not None and record['ts'] - entry['last_written'] >= self.dedup_window:
+                entry['last_written'] = record['ts']
+                record['count'] = entry['count']
+                return True
+            self.suppressed += 1
+            return False
+
+    def summary(self, max_count: int = 10) -> List[Dict[str, Any]]:
+        """Distinct errors with their counts, most recently seen first"""
+        with self._lock:
+            entries = list(itertools.islice(reversed(self._entries.items()), max_count))
+        return [dict(entry, fingerprint=fingerprint) for fingerprint, entry in entries]
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            self._entries = OrderedDict(sorted(entries.items(), key=lambda item: item[1]['last_seen']))
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            self._entries = OrderedDict()
+
+    def save(self, min_interval: float = 0.0):
+        """Write the counters if they changed, at most once per min_interval seconds"""
+        with self._lock:
+            now = time.monotonic()
+            if not self._dirty or now - self._last_save < min_interval:
+                return
+            data = json.dumps(self._entries)
+            self._dirty = False
+            self._last_save = now
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError:
+            self._dirty = True
+
+# Error Logger
+class ErrorLogger:
+    # Every logger is closed at interpreter exit; held weakly so short-lived ones can be collected
+    _instances: "weakref.WeakSet[ErrorLogger]" = weakref.WeakSet()
+    
+    def __init__(self, base_dir: str = None, async_writes: bool = False, queue_size: int = 10000,
+                 max_batch: int = 500, group_commit_interval: float = 0.05,
+                 fsync_interval: Optional[float] = 1.0, enqueue_timeout: float = 0.5,
+                 max_segment_bytes: int = 5 * 1024 * 1024, max_segment_age: float = 24 * 3600,
+                 max_total_bytes: int = 100 * 1024 * 1024, dedup_window: Optional[float] = 3600.0):
+        # Set up error directory
+        self.base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
+        self.error_dir = os.path.join(self.base_dir, 'errors')
+        
+        # Create errors directory if it doesn't exist
+        if not os.path.exists(self.error_dir):
+            os.makedirs(self.error_dir)
+            
+        # Structured store; the segment file is created on the first write
+        self.store = ErrorStore(self.error_dir, max_segment_bytes, max_segment_age, max_total_bytes)
+        self.search_index = ErrorSearchIndex(self.store)
+        self.store.search_index = self.search_index
+        self.fingerprints = ErrorFingerprints(self.error_dir, dedup_window)
+        
+        # Asynchronous writer: callers only enqueue records and a single writer
+        # thread appends them in batches through one persistent file handle.
+        # group_commit_interval is how long the writer waits for more records after
+        # the first one; fsync_interval is the longest time written data may sit
+        # unsynced (None disables fsync, 0 syncs every batch). The writer also
+        # persists the fingerprint counters at least once a second.
+        self.async_writes = async_writes
+        # Synchronous loggers persist the counters at most this often, and on close
+        self.fingerprint_save_interval = 1.0
+        self.max_batch = max_batch
+        self.group_commit_interval = group_commit_interval
+        self.fsync_interval = fsync_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.dropped_records = 0
+        self.written_batches = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+        ErrorLogger._instances.add(self)
+        if async_writes:
+            self._writer = threading.Thread(target=self._writer_loop, name="ErrorLogWriter", daemon=True)
+            self._writer.start()
+            
+            # Long-running panels own the directory housekeeping
+            self.store.start_maintenance()
+    
+    @property
+    def current_log_file(self) -> str:
+        """Path of the segment currently being written"""
+        return self.store.segment_path
+    
+    def log_error(self, error_type: str, error_message: str, traceback_info: str = None) -> str:
+        """Log error to the current log file and return the file path"""
+        record = self.store.make_record(error_type, error_message, traceback_info)
+        
+        # After close() the logger only writes synchronously once the writer thread has
+        # exited; if close() timed out, the writer may still be appending to the segment
+        writer_busy = self._writer is not None and (not self._closed or self._writer.is_alive())
+        
+        # Repeats of a known error only bump its counter
+        if not self.fingerprints.observe(record):
+            if not writer_busy:
+                self.fingerprints.save(self.fingerprint_save_interval)
+            return self.current_log_file
+        
+        if writer_busy:
+            if self._closed:
+                self.dropped_records += 1
+                return self.current_log_file
+            try:
+                self._queue.put(record, timeout=self.enqueue_timeout)
+            except queue.Full:
+                self.dropped_records += 1
+            return self.current_log_file
+        
+        self.store.append([record])
+        self.fingerprints.save(self.fingerprint_save_interval)
+        return self.current_log_file
+    
+    def _writer_loop(self):
+        """Write queued records in batches until a stop marker arrives"""
+        last_sync = time.monotonic()
+        dirty = False
+        data_file = index_file = None
+        try:
+            while True:
+                timeout = self.fsync_interval if self.fsync_interval else 1.0
+                try:
+                    batch = [self._queue.get(timeout=timeout)]
+                except queue.Empty:
+                    batch = []
+                
+                # Group commit: collect whatever else arrives shortly after the first record
+                deadline = time.monotonic() + self.group_commit_interval
+                while batch and len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        try:
+                            batch.append(self._queue.get(timeout=remaining))
+                        except queue.Empty:
+                            break
+                
+                records = [item for item in batch if isinstance(item, dict)]
+                markers = [item for item in batch if not isinstance(item, dict)]
+                try:
+                    if records:
+                        if data_file is None:
+                            data_file, index_file = self.store.open_files()
+                        self.store.write_records(records, data_file, index_file)
+                        self.written_batches += 1
+                        dirty = True
+                        
+                        if self.store.should_rotate():
+                            if self.fsync_interval is not None:
+                                os.fsync(data_file.fileno())
+                                os.fsync(index_file.fileno())
+                            data_file.close()
+                            index_file.close()
+                            data_file = index_file = None
+                            dirty = False
+                            self.store.rotate()
+                    
+                    # Sync when the interval has elapsed or a flush was requested
+                    now = time.monotonic()
+                    if dirty and self.fsync_interval is not None and (markers or now - last_sync >= self.fsync_interval):
+                        os.fsync(data_file.fileno())
+                        os.fsync(index_file.fileno())
+                        last_sync = now
+                        dirty = False
+                except OSError:
+                    self.dropped_records += len(records)
+                
+                self.fingerprints.save(min_interval=0.0 if markers else 1.0)
+                
+                stop = False
+                for marker in markers:
+                    if marker is None:
+                        stop = True
+                    else:
+                        marker.set()
+                if stop:
+                    return
+        finally:
+            if data_file is not None:
+                data_file.close()
+                index_file.close()
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued record has been written and synced"""
+        if self._writer is None or not self._writer.is_alive():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+    
+    def close(self, timeout: float = 5.0):
+        """Flush pending records and stop the writer thread, or save the counters of a synchronous logger"""
+        if self._writer is None:
+            self.fingerprints.save()
+            return
+        if self._closed:
+            # Counters of records logged synchronously after the writer exited
+            if not self._writer.is_alive():
+                self.fingerprints.save()
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._writer.join(timeout)
+    
+    def get_recent_errors(self, max_count: int = 5) -> List[Dict[str, Any]]:
+        """Returns a list of the most recent errors, newest first"""
+        records = self.store.recent(max_count)
+        
+        # Fall back to the legacy text files when the structured store is short
+        if len(records) < max_count:
+            for file_path in reversed(self.store.legacy_files()):
+                legacy = list(self.store.iter_legacy_records(file_path))
+                records.extend(reversed(legacy[-(max_count - len(records)):]))
+                if len(records) >= max_count:
+                    break
+        
+        result = []
+        for record in records[:max_count]:
+            content = self.store.format_record(record)
+            record['content'] = content[:500] + '...' if len(content) > 500 else content
+            result.append(record)
+                
+        return result
+    
+    def get_error_summary(self, max_count: int = 10) -> List[Dict[str, Any]]:
+        """Returns distinct errors with occurrence counts, most recently seen first"""
+        summary = self.fingerprints.summary(max_count)
+        
+        # Older records predate the counters; group the recent ones by fingerprint instead
+        if len(summary) < max_count:
+            known = {entry['fingerprint'] for entry in summary}
+            grouped: Dict[str, Dict[str, Any]] = {}
+            for record in self.get_recent_errors(max_count * 5):
+                fingerprint = record.get('fingerprint') or ErrorFingerprints.fingerprint(
+                    record.get('type', ''), record.get('message', ''), record.get('traceback'))
+                if fingerprint in known:
+                    continue
+                entry = grouped.get(fingerprint)
+                if entry is None:
+                    grouped[fingerprint] = dict(record, fingerprint=fingerprint, count=1,
+                                                first_seen=record['ts'], last_seen=record['ts'])
+                else:
+                    entry['count'] += 1
+                    entry['first_seen'] = min(entry['first_seen'], record['ts'])
+            summary.extend(list(grouped.values())[:max_count - len(summary)])
+        
+        for entry in summary:
+            entry['content'] = self.store.format_record(dict(
+                entry, timestamp=datetime.fromtimestamp(entry['last_seen']).strftime("%Y-%m-%d %H:%M:%S")))
+        return summary
+
+def _close_error_loggers():
+    for logger in list(ErrorLogger._instances):
+        logger.close()
+
+atexit.register(_close_error_loggers)
+
+# Error Export
+class ErrorExporter:
+    """Streams error records into a .txt, .gz or .tar.gz export on a background thread"""
+    FORMATS = ('txt', 'gz', 'tar.gz')
+
+    def __init__(self, store: ErrorStore, chunk_size: int = 64 * 1024):
+        self.store = store
+        self.chunk_size = chunk_size
+        self.total_bytes = 0
+        self.done_bytes = 0
+        self.records_written = 0
+        self.output_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the source bytes processed so far"""
+        if not self.total_bytes:
+            return 1.0 if self.finished.is_set() else 0.0
+        return min(1.0, self.done_bytes / self.total_bytes)
+
+    def cancel(self):
+        """Ask the running export to stop; the partial output is removed"""
+        self.cancelled.set()
+
+    def start(self, output_path: str, fmt: str = 'txt', start_ts: float = None, end_ts: float = None,
+              types: List[str] = None) -> threading.Thread:
+        """Run the export on a daemon thread and return it"""
+        thread = threading.Thread(target=self.run, args=(output_path, fmt, start_ts, end_ts, types),
+                                  name="ErrorExport", daemon=True)
+        thread.start()
+        return thread
+
+    def run(self, output_path: str, fmt: str = 'txt', start_ts: float = None, end_ts: float = None,
+            types: List[str] = None):
+        """Export every record with start_ts <= ts <= end_ts whose type is in types (None means all)"""
+        self.output_path = output_path
+        filters = (start_ts, end_ts, set(types) if types else None)
+        try:
+            if fmt not in self.FORMATS:
+                raise ValueError(f"Unsupported export format: {fmt}")
+            sources = self._sources()
+            self.total_bytes = sum(size for _, _, size in sources)
+            if fmt == 'tar.gz':
+                self._export_tar(output_path, sources, filters)
+            else:
+                opener = gzip.open if fmt == 'gz' else open
+                with opener(output_path, 'wt', encoding='utf-8') as out:
+                    out.write(f"Re-Chat.to Error Logs Export - {datetime.now().strftime('%Y%m%d_%H%M%S')}\n")
+                    out.write("=" * 80 + "\n\n")
+                    for source in sources:
+                        if self.cancelled.is_set():
+                            break
+                        self._write_source(source, out, filters, framed=True)
+            if self.cancelled.is_set() and os.path.exists(output_path):
+                os.remove(output_path)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            self.finished.set()
+
+    def _sources(self) -> List[Tuple[str, str, int]]:
+        """(kind, path, byte size) of every segment and legacy file, newest first"""
+        sources = []
+        for segment_path in reversed(self.store.segments()):
+            entries = self.store.read_index(segment_path)
+            sources.append(('segment', segment_path, sum(entry[1] for entry in entries)))
+        for file_path in reversed(self.store.legacy_files()):
+            sources.append(('legacy', file_path, os.path.getsize(file_path)))
+        return sources
+
+    def _export_tar(self, output_path: str, sources: List[Tuple[str, str, int]], filters):
+        """Write one tar member per source, spooling each member so its size is known"""
+        with tarfile.open(output_path, 'w:gz') as archive:
+            for source in sources:
+                if self.cancelled.is_set():
+                    break
+                with tempfile.TemporaryFile() as spool:
+                    text = io.TextIOWrapper(spool, encoding='utf-8')
+                    written = self._write_source(source, text, filters, framed=False)
+                    text.flush()
+                    if not written:
+                        text.detach()
+                        continue
+                    name = os.path.basename(source[1])
+                    for suffix in ('.gz', '.jsonl', '.txt'):
+                        if name.endswith(suffix):
+                            name = name[:-len(suffix)]
+                    info = tarfile.TarInfo(name + '.txt')
+                    info.size = spool.tell()
+                    info.mtime = int(time.time())
+                    spool.seek(0)
+                    archive.addfile(info, spool)
+                    text.detach()
+
+    def _write_source(self, source: Tuple[str, str, int], out, filters, framed: bool) -> bool:
+        """Write the matching records of one source; returns whether anything was written"""
+        kind, path, size = source
+        start_ts, end_ts, types = filters
+        header_written = False
+
+        def write_header():
+            if framed:
+                out.write(f"File: {os.path.basename(path)}\n")
+                out.write("-" * 80 + "\n")
+
+        if kind == 'legacy' and start_ts is None and end_ts is None and types is None:
+            # Nothing to filter: copy the file through in fixed-size chunks
+            write_header()
+            with self.store.open_text(path) as log_file:
+                while not self.cancelled.is_set():
+                    chunk = log_file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+            header_written = True
+            self.done_bytes += size
+        else:
+            for record, record_bytes in self._iter_source(kind, path, filters):
+                if self.cancelled.is_set():
+                    break
+                self.done_bytes += record_bytes
+                if record is None:
+                    continue
+                if not header_written:
+                    write_header()
+                    header_written = True
+                out.write(self.store.format_record(record))
+                self.records_written += 1
+            if kind == 'legacy':
+                self.done_bytes += size
+
+        if header_written and framed:
+            out.write("\n" + "-" * 80 + "\n\n")
+        return header_written
+
+    def _iter_source(self, kind: str, path: str, filters):
+        """Yield (record or None if filtered out, source bytes consumed)"""
+        start_ts, end_ts, types = filters
+        type_hashes = {ErrorStore.type_hash(t) for t in types} if types else None
+
+        def matches(ts: float, record_type: str = None) -> bool:
+            if start_ts is not None and ts < start_ts:
+                return False
+            if end_ts is not None and ts > end_ts:
+                return False
+            return types is None or record_type is None or record_type in types
+
+        if kind == 'legacy':
+            for record in self.store.iter_legacy_records(path):
+                yield (record if matches(record['ts'], record.get('type')) else None), 0
+            return
+
+        # Structured segments: filter on the index and only decode the records that match
+        with self.store.open_binary(path) as f:
+            for offset, length, ts, type_hash in self.store.read_index(path):
+                if not matches(ts) or (type_hashes is not None and type_hash not in type_hashes):
+                    yield None, length
+                    continue
+                f.seek(offset)
+                try:
+                    record = json.loads(f.read(length).decode('utf-8'))
+                except ValueError:
+                    yield None, length
+                    continue
+                yield (record if matches(ts, record.get('type')) else None), length
+
+# Network Utilities
+class NetworkUtils:
+    # Kernel socket tables; column 4 is the connection state, 0A is TCP_LISTEN
+    PROC_NET_TABLES = ('/proc/net/tcp', '/proc/net/tcp6')
+    TCP_LISTEN = '0A'
+    PROBE_TIMEOUT = 0.25
+    CONNECT_PENDING = (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY,
+                       getattr(errno, 'WSAEWOULDBLOCK', errno.EWOULDBLOCK))
+    
+    @staticmethod
+    def listening_ports() -> Optional[Set[int]]:
+        """Snapshot the TCP ports in LISTEN state from /proc, or None where /proc is unavailable"""
+        ports = set()
+        found = False
+        for table in NetworkUtils.PROC_NET_TABLES:
+            try:
+                with open(table, 'r') as f:
+                    found = True
+                    next(f, None)  # Header line
+                    for line in f:
+                        fields = line.split()
+                        if len(fields) > 3 and fields[3] == NetworkUtils.TCP_LISTEN:
+                            ports.add(int(fields[1].rsplit(':', 1)[1], 16))
+            except (OSError, ValueError, IndexError):
+                continue
+        return ports if found else None
+    
+    @staticmethod
+    def probe_ports(ports: Iterable[int], timeout: float = PROBE_TIMEOUT) -> Set[int]:
+        """Connect to all ports at once with non-blocking sockets; returns the ones accepting connections"""
+        in_use = set()
+        sel = selectors.DefaultSelector()
+        try:
+            for port in ports:
+                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                s.setblocking(False)
+                result = s.connect_ex(('127.0.0.1', port))
+                if result == 0:
+                    in_use.add(port)
+                    s.close()
+                elif result in NetworkUtils.CONNECT_PENDING:
+                    sel.register(s, selectors.EVENT_WRITE, port)
+                else:
+                    s.close()
+            
+            deadline = time.monotonic() + timeout
+            while sel.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                for key, _ in sel.select(remaining):
+                    if key.fileobj.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0:
+                        in_use.add(key.data)
+                    sel.unregister(key.fileobj)
+                    key.fileobj.close()
+        finally:
+            for key in list(sel.get_map().values()):
+                key.fileobj.close()
+            sel.close()
+        return in_use
+    
+    @staticmethod
+    def ports_in_use(ports: Iterable[int]) -> Set[int]:
+        """Return which of the given ports are taken, from one socket-table snapshot when possible"""
+        ports = list(ports)
+        listening = NetworkUtils.listening_ports()
+        if listening is not None:
+            return listening.intersection(ports)
+        return NetworkUtils.probe_ports(ports)
+    
+    @staticmethod
+    def is_port_in_use(port: int) -> bool:
+        """Check if a port is in use"""
+        return port in NetworkUtils.ports_in_use([port])
+    
+    @staticmethod
+    def find_available_port(start_port: int, max_attempts: int = 10) -> Optional[int]:
+        """Find an available port starting from the given port"""
+        candidates = range(start_port, start_port + max_attempts)
+        in_use = NetworkUtils.ports_in_use(candidates)
+        for port in candidates:
+            if port not in in_use:
+                return port
+        
+        return None  # No available port found
+
+class PortRegistry:
+    """Records which managed service owns which port and holds a bound socket on it until launch.
+    
+    The socket is bound to host (loopback by default) without listening, so nothing can
+    connect to it; the bind alone stops other processes binding the port, including ones
+    using SO_REUSEADDR, which Linux only lets share a port when every socket sets it.
+    It is closed by handoff() immediately before the service is spawned, before any
+    readiness probe runs.
+    """
+    
+    def __init__(self, host: str = '127.0.0.1'):
+        self.host = host
+        self._lock = threading.Lock()
+        self._owners: Dict[int, str] = {}
+        self._ports: Dict[str, int] = {}
+        self._sockets: Dict[int, socket.socket] = {}
+    
+    def _bind(self, port: int) -> Optional[socket.socket]:
+        # A plain bind fails while connections of a previous run are in TIME_WAIT; the port
+        # has already been checked for listeners, so like Node retry with SO_REUSEADDR then
+        exclusive = hasattr(socket, 'SO_EXCLUSIVEADDRUSE')
+        for reuse in ((False,) if exclusive else (False, True)):
+            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            try:
+                if exclusive:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+                elif reuse:
+                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind((self.host, port))
+                return sock
+            except OSError:
+                sock.close()
+        return None
+    
+    def reserve(self, service: str, preferred: int, max_attempts: int = 10) -> Optional[int]:
+        """Reserve the first free port from preferred onwards for a service; returns None if none is free"""
+        with self._lock:
+            current = self._ports.get(service)
+            if current == preferred and current in self._sockets:
+                return current
+            self._release(service)
+            
+            candidates = [port for port in range(preferred, preferred + max_attempts)
+                          if port not in self._owners]
+            in_use = NetworkUtils.ports_in_use(candidates)
+            for port in candidates:
+                if port in in_use:
+                    continue
+                sock = self._bind(port)
+                if sock is None:
+                    continue
+                self._owners[port] = service
+                self._ports[service] = port
+                self._sockets[port] = sock
+                return port
+            return None
+    
+    def handoff(self, service: str) -> Optional[int]:
+        """Close the held socket so the service can bind its port; ownership is kept"""
+        with self._lock:
+            port = self._ports.get(service)
+            sock = self._sockets.pop(port, None)
+            if sock is not None:
+                sock.close()
+            return port
+    
+    def release(self, service: str):
+        """Forget a service's port and close its socket if still held"""
+        with self._lock:
+            self._release(service)
+    
+    def _release(self, service: str):
+        port = self._ports.pop(service, None)
+        if port is None:
+            return
+        self._owners.pop(port, None)
+        sock = self._sockets.pop(port, None)
+        if sock is not None:
+            sock.close()
+    
+    def owner(self, port: int) -> Optional[str]:
+        """Return the service that owns a port, if any"""
+        with self._lock:
+            return self._owners.get(port)
+    
+    def assignments(self) -> Dict[str, int]:
+        """Return a copy of the service to port mapping"""
+        with self._lock:
+            return dict(self._ports)
+
+# Output Supervisor
+class IngestCounter:
+    """Counts lines read from one process and derives a lines-per-second rate"""
+    def __init__(self, window: float = 1.0):
+        self.window = window
+        self.total_lines = 0
+        self._window_start = time.monotonic()
+        self._window_lines = 0
+        self._rate = 0.0
+
+    def record(self, count: int = 1):
+        """Record that count lines were ingested"""
+        self.total_lines += count
+        self._window_lines += count
+        self._roll()
+
+    def rate(self) -> float:
+        """Return the lines-per-second rate of the last completed window"""
+        self._roll()
+        return self._rate
+
+    def _roll(self):
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed >= self.window:
+            # Idle windows decay the rate to zero instead of keeping the last burst
+            self._rate = self._window_lines / elapsed
+            self._window_start = now
+            self._window_lines = 0
+
+
+class _PipeProtocol(asyncio.Protocol):
+    """Splits the raw bytes of one child pipe into lines for the supervisor"""
+    def __init__(self, supervisor: 'OutputSupervisor', name: str, is_error: bool,
+                 on_line: Callable[[str, str, bool], None], on_close: Optional[Callable[[str, bool], None]]):
+        self.supervisor = supervisor
+        self.name = name
+        self.is_error = is_error
+        self.on_line = on_line
+        self.on_close = on_close
+        self.buffer = bytearray()
+
+    def data_received(self, data: bytes):
+        self.buffer.extend(data)
+        end = self.buffer.rfind(b'\n')
+        if end == -1:
+            # Guard against a child that never prints a newline
+            if len(self.buffer) >= self.supervisor.max_line_bytes:
+                self._emit([bytes(self.buffer)])
+                self.buffer.clear()
+            return
+        chunk = bytes(self.buffer[:end])
+        del self.buffer[:end + 1]
+        self._emit(chunk.split(b'\n'))
+
+    def connection_lost(self, exc: Optional[Exception]):
+        if self.buffer:
+            self._emit([bytes(self.buffer)])
+            self.buffer.clear()
+        self.supervisor._pipe_closed(self.name, self.is_error, self.on_close)
+
+    def _emit(self, raw_lines: List[bytes]):
+        self.supervisor._count(self.name, len(raw_lines))
+        for raw in raw_lines:
+            line = raw.decode('utf-8', errors='replace').rstrip('\r')
+            try:
+                self.on_line(self.name, line, self.is_error)
+            except Exception:
+                self.supervisor.error_logger.log_error(
+                    "Output Handler Error", f"Failed to handle output of '{self.name}'", traceback.format_exc())
+
+
+class OutputSupervisor:
+    """Reads the output pipes of every managed process from a single event loop thread"""
+    def __init__(self, error_logger: ErrorLogger, max_line_bytes: int = 64 * 1024):
+        self.error_logger = error_logger
+        self.max_line_bytes = max_line_bytes
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.counters: Dict[str, IngestCounter] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Windows pipes from Popen are not overlapped, so the proactor loop cannot
+        # watch them; fall back to one blocking reader thread per pipe there.
+        self.use_reader_threads = sys.platform == 'win32'
+
+    def start(self):
+        """Start the event loop thread if it is not running yet"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._thread = threading.Thread(target=self._run_loop, args=(ready,),
+                                            name="OutputSupervisor", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+    def _run_loop(self, ready: threading.Event):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+    def watch(self, name: str, pipe, is_error: bool,
+              on_line: Callable[[str, str, bool], None],
+              on_close: Optional[Callable[[str, bool], None]] = None):
+        """Deliver every line read from a binary pipe to on_line(name, line, is_error)"""
+        with self._lock:
+            self.counters.setdefault(name, IngestCounter())
+
+        if self.use_reader_threads:
+            threading.Thread(target=self._read_blocking, args=(name, pipe, is_error, on_line, on_close),
+                             daemon=True).start()
+            return
+
+        self.start()
+        protocol = _PipeProtocol(self, name, is_error, on_line, on_close)
+        future = asyncio.run_coroutine_threadsafe(
+            self.loop.connect_read_pipe(lambda: protocol, pipe), self.loop)
+        future.result(timeout=5)
+
+    def _read_blocking(self, name: str, pipe, is_error: bool,
+                       on_line: Callable[[str, str, bool], None],
+                       on_close: Optional[Callable[[str, bool], None]]):
+        """Fallback reader used where pipes cannot join the event loop"""
+        protocol = _PipeProtocol(self, name, is_error, on_line, on_close)
+        for raw in iter(pipe.readline, b''):
+            protocol._emit([raw.rstrip(b'\n')])
+        protocol.connection_lost(None)
+
+    def _count(self, name: str, lines: int):
+        with self._lock:
+            counter = self.counters.get(name)
+            if counter is None:
+                counter = self.counters[name] = IngestCounter()
+            counter.record(lines)
+
+    def _pipe_closed(self, name: str, is_error: bool, on_close: Optional[Callable[[str, bool], None]]):
+        if on_close is None:
+            return
+        try:
+            on_close(name, is_error)
+        except Exception:
+            self.error_logger.log_error(
+                "Output Handler Error", f"Failed to close output of '{name}'", traceback.format_exc())
+
+    def get_ingest_rates(self) -> Dict[str, float]:
+        """Return the lines per second currently ingested for each process"""
+        with self._lock:
+            return {name: counter.rate() for name, counter in self.counters.items()}
+
+    def get_total_lines(self) -> Dict[str, int]:
+        """Return the total number of lines ingested for each process"""
+        with self._lock:
+            return {name: counter.total_lines for name, counter in self.counters.items()}
+
+    def reset_counter(self, name: str):
+        """Start a fresh counter for a process that is being restarted"""
+        with self._lock:
+            self.counters[name] = IngestCounter()
+
+    def watch_exit(self, name: str, process: subprocess.Popen,
+                   on_exit: Callable[[str, subprocess.Popen, Optional[int]], None]):
+        """Call on_exit(name, process, returncode) as soon as the process terminates"""
+        pidfd = None
+        if hasattr(os, 'pidfd_open') and not self.use_reader_threads:
+            try:
+                pidfd = os.pidfd_open(process.pid)
+            except OSError:
+                pidfd = None
+        
+        if pidfd is None:
+            # No pidfd (Windows, macOS, kernels before 5.3): block in a waiter thread
+            def wait():
+                try:
+                    returncode = process.wait()
+                except Exception:
+                    returncode = process.poll()
+                self._process_exited(name, process, returncode, on_exit)
+            threading.Thread(target=wait, name=f"ExitWaiter-{name}", daemon=True).start()
+            return
+        
+        def readable():
+            self.loop.remove_reader(pidfd)
+            os.close(pidfd)
+            self._process_exited(name, process, process.poll(), on_exit)
+        
+        self.start()
+        self.loop.call_soon_threadsafe(self.loop.add_reader, pidfd, readable)
+    
+    def _process_exited(self, name: str, process: subprocess.Popen, returncode: Optional[int],
+                        on_exit: Callable[[str, subprocess.Popen, Optional[int]], None]):
+        try:
+            on_exit(name, process, returncode)
+        except Exception:
+            self.error_logger.log_error(
+                "Output Handler Error", f"Failed to handle exit of '{name}'", traceback.format_exc())
+    
+    def call_later(self, delay: float, callback: Callable[[], None]):
+        """Run callback on the event loop thread after delay seconds"""
+        self.start()
+        self.loop.call_soon_threadsafe(self.loop.call_later, delay, callback)
+
+    def shutdown(self):
+        """Stop the event loop thread"""
+        with self._lock:
+            loop, thread = self.loop, self._thread
+            self._thread = None
+        if loop is not None and thread is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=2)
+
+# Process Log Store
+class LogBuffer:
+    """Fixed-capacity ring buffer holding the most recent output lines of one process"""
+    def __init__(self, name: str, max_lines: int = 10000, max_bytes: int = 2 * 1024 * 1024):
+        self.name = name
+        self.max_lines = max(1, max_lines)
+        self.max_bytes = max_bytes
+        # Every line shares one interned prefix; it is only re-attached on read
+        self.prefix = sys.intern(f"[{name}] ")
+        self._lines: List[Optional[str]] = [None] * self.max_lines
+        self._flags = array('b', bytes(self.max_lines))
+        # UTF-8 size of each line, so max_bytes bounds bytes rather than characters
+        self._sizes = array('I', bytes(4 * self.max_lines))
+        self._head = 0  # index of the oldest entry
+        self._size = 0
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.appended = 0
+        self.evicted = 0
+
+    def append(self, line: str, flag: int = 0):
+        """Store a line with a small severity flag (1 marks stderr), evicting the oldest lines when a budget is exceeded"""
+        size = len(line) if line.isascii() else len(line.encode('utf-8', 'surrogatepass'))
+        with self._lock:
+            if self._size == self.max_lines:
+                self._evict_oldest()
+            while self._size and self.total_bytes + size > self.max_bytes:
+                self._evict_oldest()
+
+            index = (self._head + self._size) % self.max_lines
+            self._lines[index] = line
+            self._flags[index] = int(flag)
+            self._sizes[index] = size
+            self._size += 1
+            self.total_bytes += size
+            self.appended += 1
+
+    def _evict_oldest(self):
+        self._lines[self._head] = None
+        self.total_bytes -= self._sizes[self._head]
+        self._head = (self._head + 1) % self.max_lines
+        self._size -= 1
+        self.evicted += 1
+
+    def latest(self, count: int = 100) -> List[Tuple[str, bool]]:
+        """Return up to count of the newest lines as (line_with_prefix, is_error)"""
+        with self._lock:
+            count = max(0, min(count, self._size))
+            start = self._head + self._size - count
+            result = []
+            for offset in range(start, start + count):
+                index = offset % self.max_lines
+                result.append((self.prefix + self._lines[index], bool(self._flags[index])))
+            return result
+
+    @property
+    def first_index(self) -> int:
+        """Absolute index of the oldest line still held (lines are numbered from 0 as appended)"""
+        return self.appended - self._size
+
+    def get_range(self, start: int, end: int) -> List[Tuple[str, int]]:
+        """Return (line, flag) for absolute indices start..end-1 that are still held"""
+        with self._lock:
+            first = self.appended - self._size
+            start = max(start, first)
+            end = min(end, self.appended)
+            result = []
+            for absolute in range(start, end):
+                index = (self._head + absolute - first) % self.max_lines
+                result.append((self._lines[index], self._flags[index]))
+            return result
+
+    def stats(self) -> Dict[str, int]:
+        """Return occupancy and eviction counters"""
+        with self._lock:
+            return {
+                'lines': self._size,
+                'bytes': self.total_bytes,
+                'appended': self.appended,
+                'evicted': self.evicted,
+                'max_lines': self.max_lines,
+                'max_bytes': self.max_bytes,
+            }
+
+    def __len__(self) -> int:
+        return self._size
+
+# Error Aggregation
+class ErrorAggregator:
+    """Groups the lines of one stack trace or compiler diagnostic into a single error record"""
+    # Indented lines, "at ..." frames and "> 12 | code" excerpts
+    FRAME_RE = re.compile(r'^(?:\s|at\s|>|\|)')
+    # Lines that carry an error on before any frame: "Module build failed (from ...):",
+    # a nested "SyntaxError: ..." or "Caused by: ..."
+    CONTINUATION_RE = re.compile(r'^(?:\w*(?:Error|Exception)\b|Caused by\b|Module (?:build|parse) failed\b)')
+    # The end of an error object Node prints after its stack, e.g. "} {" or "}"
+    CLOSING_RE = re.compile(r'^[}\]][)}\],;\s{]*$')
+
+    def __init__(self, emit: Callable[[str, List[str]], None],
+                 schedule: Callable[[float, Callable[[], None]], None],
+                 gap: float = 0.5, max_lines: int = 200):
+        self.emit = emit
+        self.schedule = schedule
+        self.gap = gap
+        self.max_lines = max_lines
+        self.records_emitted = 0
+        self.lines_grouped = 0
+        # name -> {'lines': [...], 'last': monotonic time, 'frames': bool, 'blank': bool}
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _continues(self, pending: Dict[str, Any], plain: str, stripped: str) -> bool:
+        if self.FRAME_RE.match(plain):
+            return True
+        if self.CLOSING_RE.match(stripped):
+            return pending['frames']
+        # After a blank line only a code frame or stack carries the record on
+        return not pending['frames'] and not pending['blank'] and bool(self.CONTINUATION_RE.match(stripped))
+
+    def feed(self, name: str, line: str):
+        """Add one stderr line; a record opens on a line mentioning "error" and takes the
+        frames, code excerpts and nested errors that follow. A blank line ends it unless a
+        frame comes next, as in Babel's "SyntaxError: ..., blank line, > 12 | code" output;
+        any other line, or a pause longer than gap, ends it too."""
+        finished = []
+        schedule_check = False
+        with self._lock:
+            now = time.monotonic()
+            pending = self._pending.get(name)
+            if pending is not None and now - pending['last'] > self.gap:
+                finished.append(self._pending.pop(name))
+                pending = None
+            
+            plain = ANSI_ESCAPE_RE.sub('', line).rstrip()
+            stripped = plain.strip()
+            if pending is not None:
+                if not stripped:
+                    if pending['blank']:
+                        finished.append(self._pending.pop(name))
+                    else:
+                        pending['blank'] = True
+                        pending['last'] = now
+                elif self._continues(pending, plain, stripped):
+                    if pending['blank']:
+                        pending['lines'].append('')
+                        pending['blank'] = False
+                    pending['lines'].append(line.rstrip())
+                    pending['frames'] = pending['frames'] or bool(self.FRAME_RE.match(plain))
+                    pending['last'] = now
+                    if len(pending['lines']) >= self.max_lines:
+                        finished.append(self._pending.pop(name))
+                    stripped = ''
+                else:
+                    finished.append(self._pending.pop(name))
+            
+            if stripped and 'error' in stripped.lower():
+                pending = {'lines': [line.rstrip()], 'last': now, 'frames': False, 'blank': False}
+                self._pending[name] = pending
+                schedule_check = True
+        
+        if schedule_check:
+            self.schedule(self.gap, lambda: self._check(name))
+        self._emit(name, finished)
+
+    def _check(self, name: str):
+        """Close the pending record once it has been quiet for longer than gap"""
+        finished = []
+        delay = None
+        with self._lock:
+            pending = self._pending.get(name)
+            if pending is None:
+                return
+            idle = time.monotonic() - pending['last']
+            if idle >= self.gap:
+                finished.append(self._pending.pop(name))
+            else:
+                delay = self.gap - idle
+        
+        if delay is not None:
+            self.schedule(delay, lambda: self._check(name))
+        self._emit(name, finished)
+
+    def flush(self, name: str):
+        """Close any pending record for a process, e.g. when its pipe closes"""
+        with self._lock:
+            pending = self._pending.pop(name, None)
+        self._emit(name, [pending] if pending else [])
+
+    def _emit(self, name: str, records: List[Dict[str, Any]]):
+        for record in records:
+            self.records_emitted += 1
+            self.lines_grouped += len(record['lines'])
+            self.emit(name, record['lines'])
+
+# Readiness Probes
+class ReadinessProbe:
+    """Decides when a freshly spawned service is ready: TCP connect, HTTP GET or a log-line match"""
+    KINDS = ('tcp', 'http', 'log')
+    # Sent with HTTP probes so the balancer can tell them from client traffic
+    USER_AGENT = 're-chat-readiness-probe'
+    
+    def __init__(self, kind: str, port: Optional[int] = None, path: str = '/', pattern: str = None,
+                 host: str = '127.0.0.1', interval: float = 0.25, timeout: float = 180.0,
+                 attempt_timeout: float = 2.0):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown probe kind: {kind}")
+        if kind in ('tcp', 'http') and port is None:
+            raise ValueError(f"A {kind} probe needs a port")
+        if kind == 'log' and not pattern:
+            raise ValueError("A log probe needs a pattern")
+        self.kind = kind
+        self.host = host
+        self.port = port
+        self.path = path
+        self.pattern = re.compile(pattern) if pattern else None
+        self.interval = interval
+        self.timeout = timeout
+        self.attempt_timeout = attempt_timeout
+    
+    @classmethod
+    def tcp(cls, port: int, **kwargs) -> 'ReadinessProbe':
+        return cls('tcp', port=port, **kwargs)
+    
+    @classmethod
+    def http(cls, port: int, path: str = '/', **kwargs) -> 'ReadinessProbe':
+        return cls('http', port=port, path=path, **kwargs)
+    
+    @classmethod
+    def log(cls, pattern: str, **kwargs) -> 'ReadinessProbe':
+        return cls('log', pattern=pattern, **kwargs)
+    
+    def describe(self) -> str:
+        if self.kind == 'tcp':
+            return f"TCP {self.host}:{self.port}"
+        if self.kind == 'http':
+            return f"HTTP GET http://{self.host}:{self.port}{self.path}"
+        return f"log line /{self.pattern.pattern}/"
+    
+    async def attempt(self) -> bool:
+        """One TCP or HTTP check; HTTP passes on any status below 500"""
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.attempt_timeout)
+            if self.kind == 'tcp':
+                return True
+            writer.write(f"GET {self.path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n"
+                         f"User-Agent: {self.USER_AGENT}\r\nConnection: close\r\n\r\n".encode('ascii'))
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), self.attempt_timeout)
+            parts = status_line.split()
+            return len(parts) >= 2 and parts[1].isdigit() and int(parts[1]) < 500
+        except (OSError, asyncio.TimeoutError, ValueError):
+            return False
+        finally:
+            if writer is not None:
+                writer.close()
+
+class ServiceReadiness:
+    """Readiness state of the current run of one service and its spawn-to-ready history"""
+    def __init__(self, history_size: int = 50):
+        self.state = 'stopped'  # stopped, starting, ready, not-ready
+        self.spawned_at: Optional[float] = None
+        self.ready_at: Optional[float] = None
+        self.process: Optional[subprocess.Popen] = None
+        self.history: List[float] = []
+        self.history_size = history_size
+    
+    def time_to_ready(self) -> Optional[float]:
+        if self.spawned_at is None or self.ready_at is None:
+            return None
+        return self.ready_at - self.spawned_at
+    
+    def record_ready(self, at: float) -> float:
+        self.state = 'ready'
+        self.ready_at = at
+        latency = at - self.spawned_at
+        self.history.append(latency)
+        del self.history[:-self.history_size]
+        return latency
+    
+    def stats(self) -> Dict[str, Any]:
+        history = self.history
+        return {
+            'state': self.state,
+            'time_to_ready': self.time_to_ready(),
+            'last': history[-1] if history else None,
+            'mean': sum(history) / len(history) if history else None,
+            'samples': len(history),
+        }
+
+# Restart Supervision
+class RestartPolicy:
+    """When and how quickly a service that exited on its own is started again"""
+    MODES = ('always', 'on-failure', 'never')
+    
+    def __init__(self, mode: str = 'never', base_delay: float = 1.0, max_delay: float = 60.0,
+                 jitter: float = 0.2, max_failures: int = 5, failure_window: float = 120.0,
+                 stable_after: float = 60.0):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown restart mode: {mode}")
+        self.mode = mode
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        # max_failures failures within failure_window seconds trip the crash-loop breaker
+        self.max_failures = max_failures
+        self.failure_window = failure_window
+        # A run lasting this long resets the backoff
+        self.stable_after = stable_after
+    
+    def wants_restart(self, returncode: Optional[int]) -> bool:
+        if self.mode == 'always':
+            return True
+        return self.mode == 'on-failure' and returncode != 0
+    
+    def delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter for the given consecutive attempt (1-based)"""
+        delay = min(self.max_delay, self.base_delay * (2 ** max(0, attempt - 1)))
+        return max(0.0, delay * (1 + random.uniform(-self.jitter, self.jitter)))
+
+class ServiceRestarts:
+    """Restart and failure history of one service"""
+    def __init__(self):
+        self.restart_count = 0
+        self.failure_count = 0
+        self.consecutive = 0
+        self.total_uptime = 0.0
+        self.failure_times: List[float] = []
+        self.started_at: Optional[float] = None
+        self.crash_loop = False
+        self.pending: Optional[threading.Timer] = None
+        self.next_restart_at: Optional[float] = None
+    
+    def record_start(self):
+        self.started_at = time.monotonic()
+    
+    def record_exit(self, failed: bool, policy: RestartPolicy) -> float:
+        """Account for a run that just ended and return how long it lasted"""
+        now = time.monotonic()
+        uptime = now - self.started_at if self.started_at is not None else 0.0
+        self.started_at = None
+        self.total_uptime += uptime
+        if uptime >= policy.stable_after:
+            self.consecutive = 0
+        if failed:
+            self.failure_count += 1
+            self.failure_times.append(now)
+            self.failure_times = [t for t in self.failure_times if now - t <= policy.failure_window]
+        return uptime
+    
+    def mtbf(self) -> Optional[float]:
+        """Mean time between failures: total run time divided by the number of failures"""
+        if not self.failure_count:
+            return None
+        uptime = self.total_uptime
+        if self.started_at is not None:
+            uptime += time.monotonic() - self.started_at
+        return uptime / self.failure_count
+    
+    def cancel_pending(self) -> bool:
+        timer, self.pending, self.next_restart_at = self.pending, None, None
+        if timer is None:
+            return False
+        timer.cancel()
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'restarts': self.restart_count,
+            'failures': self.failure_count,
+            'mtbf': self.mtbf(),
+            'crash_loop': self.crash_loop,
+            'restart_pending': self.pending is not None,
+            'next_restart_in': max(0.0, self.next_restart_at - time.monotonic()) if self.next_restart_at else None,
+        }
+
+# Process Manager
+class ProcessManager:
+    def __init__(self, error_logger: ErrorLogger, log_max_lines: int = 10000,
+                 log_max_bytes: int = 2 * 1024 * 1024, stop_grace: float = 5.0,
+                 port_release_timeout: float = 5.0):
+        self.processes: Dict[str, subprocess.Popen] = {}
+        self.process_logs: Dict[str, LogBuffer] = {}
+        self.log_max_lines = log_max_lines
+        self.log_max_bytes = log_max_bytes
+        # Seconds between the polite stop signal and SIGKILL, and how long to wait for the port afterwards
+        self.stop_grace = stop_grace
+        self.port_release_timeout = port_release_timeout
+        self.error_logger = error_logger
+        self.supervisor = OutputSupervisor(error_logger)
+        self.error_aggregator = ErrorAggregator(self._log_error_record, self.supervisor.call_later)
+        self.ports = PortRegistry()
+        # The process each service was last asked to stop, to tell requested exits from crashes
+        self.stop_requested: Dict[str, subprocess.Popen] = {}
+        # How each service was launched, so the restart supervisor can launch it again
+        self.launch_specs: Dict[str, Dict[str, Any]] = {}
+        self.restart_policies: Dict[str, RestartPolicy] = {}
+        self.restarts: Dict[str, ServiceRestarts] = {}
+        self._restart_lock = threading.Lock()
+        # Called as output_callback(text, tag) for every line; must be thread-safe
+        self.output_callback: Optional[Callable[[str, Optional[str]], None]] = None
+        # Called as exit_callback(name, returncode, expected) when a process ends; must be thread-safe
+        self.exit_callback: Optional[Callable[[str, Optional[int], bool], None]] = None
+        # Called as restart_callback(name) when the restart supervisor acts on a service; must be thread-safe
+        self.restart_callback: Optional[Callable[[str], None]] = None
+        self.readiness_probes: Dict[str, ReadinessProbe] = {}
+        self.readiness: Dict[str, ServiceReadiness] = {}
+        self._readiness_lock = threading.Lock()
+        # Called as ready_callback(name, ready, seconds) when a probe passes or gives up; must be thread-safe
+        self.ready_callback: Optional[Callable[[str, bool, float], None]] = None
+        # Extra observers called as listener(name, line, is_error) for every output line; the
+        # supervisor thread iterates the list unlocked, so it is replaced rather than mutated
+        self.line_listeners: List[Callable[[str, str, bool], None]] = []
+        self._listeners_lock = threading.Lock()
+        # Notified whenever a process exits or a readiness probe settles
+        self._state_changed = threading.Condition()
+
+    def start_process(self, name: str, cmd: List[str], cwd: str = None, env: Dict[str, str] = None,
+                      port: Optional[int] = None, restart: bool = False) -> Tuple[bool, str]:
+        """Start a new process and return (success, message); port is reserved for it until launch"""
+        if name in self.processes and self.processes[name].poll() is None:
+            return False, f"Process '{name}' is already running"
+        
+        # A manual start supersedes any scheduled restart and resets the crash-loop breaker
+        if not restart:
+            with self._restart_lock:
+                state = self.restarts.get(name)
+                if state is not None:
+                    state.cancel_pending()
+                    state.crash_loop = False
+                    state.consecutive = 0
+                    state.failure_times = []
+        
+        if port is not None:
+            owner = self.ports.owner(port)
+            if owner is not None and owner != name:
+                return False, f"Port {port} is already assigned to '{owner}'"
+            if self.ports.reserve(name, port, max_attempts=1) is None:
+                return False, f"Port {port} is already in use"
+            
+        try:
+            # Create environment with system env variables
+            process_env = os.environ.copy()
+            if env:
+                process_env.update(env)
+                
+            self.launch_specs[name] = {'cmd': cmd, 'cwd': cwd, 'env': env, 'port': port}
+            
+            # Release the held socket at the last moment so the child can bind the port
+            if port is not None:
+                self.ports.handoff(name)
+            
+            # Start the process
+            spawned_at = time.monotonic()
+            self.processes[name] = subprocess.Popen(
+                shell_command(cmd),
+                cwd=cwd,
+                env=process_env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                shell=True,
+                # Own process group/session, so stopping reaches npm's node children too
+                start_new_session=sys.platform != 'win32',
+                creationflags=subprocess.CREATE_NEW_PROCESS_GROUP if sys.platform == 'win32' else 0
+            )
+            
+            # Initialize log for this process
+            self.process_logs[name] = LogBuffer(name, self.log_max_lines, self.log_max_bytes)
+            self._begin_readiness(name, self.processes[name], spawned_at)
+            
+            # Hand both pipes to the shared output supervisor
+            self.supervisor.reset_counter(name)
+            self.supervisor.watch(name, self.processes[name].stdout, False, self._read_output)
+            self.supervisor.watch(name, self.processes[name].stderr, True, self._read_output,
+                                  lambda name, is_error: self.error_aggregator.flush(name))
+            self.supervisor.watch_exit(name, self.processes[name], self._process_exited)
+            with self._restart_lock:
+                self.restarts.setdefault(name, ServiceRestarts()).record_start()
+            
+            return True, f"Process '{name}' started successfully"
+        except Exception as e:
+            if port is not None:
+                self.ports.release(name)
+            error_msg = str(e)
+            tb_info = traceback.format_exc()
+            self.error_logger.log_error("Process Start Error", error_msg, tb_info)
+            return False, f"Failed to start process '{name}': {error_msg}"
+    
+    def stop_process(self, name: str, grace: Optional[float] = None) -> Tuple[bool, str]:
+        """Stop a process together with all its descendants and return (success, message)"""
+        with self._restart_lock:
+            cancelled = name in self.restarts and self.restarts[name].cancel_pending()
+        process = self.processes.get(name)
+        if not self.needs_stop(name):
+            if cancelled:
+                return True, f"Pending restart of '{name}' cancelled"
+            return False, f"Process '{name}' is not running"
+        
+        grace = self.stop_grace if grace is None else grace
+        port = self.ports.assignments().get(name)
+        try:
+            self.stop_requested[name] = process
+            
+            # Ask the whole tree to exit, then kill whatever is left after the grace period
+            self._signal_tree(process, signal.CTRL_BREAK_EVENT if sys.platform == 'win32' else signal.SIGTERM)
+            if self._wait_tree(process, grace):
+                message = f"Process '{name}' stopped successfully"
+            else:
+                self._kill_tree(process)
+                self._wait_tree(process, 2.0)
+                message = f"Process '{name}' forcefully killed"
+            
+            self.ports.release(name)
+            if port is not None and not self._wait_port_released(port):
+                message += f", but port {port} is still in use"
+                self.error_logger.log_error("Process Stop Error", f"Port {port} still in use after stopping '{name}'", None)
+            return True, message
+        except Exception as e:
+            error_msg = str(e)
+            tb_info = traceback.format_exc()
+            self.error_logger.log_error("Process Stop Error", error_msg, tb_info)
+            return False, f"Failed to stop process '{name}': {error_msg}"
+    
+    @staticmethod
+    def _signal_tree(process: subprocess.Popen, sig: int):
+        """Send a signal to the process group started for a service"""
+        try:
+            if sys.platform == 'win32':
+                os.kill(process.pid, sig)
+            else:
+                os.killpg(process.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass
+    
+    @staticmethod
+    def _kill_tree(process: subprocess.Popen):
+        if sys.platform == 'win32':
+            # taskkill /T follows the parent chain, which CTRL_BREAK cannot force
+            subprocess.run(['taskkill', '/T', '/F', '/PID', str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            process.kill()
+        else:
+            ProcessManager._signal_tree(process, signal.SIGKILL)
+    
+    @staticmethod
+    def _group_alive(process: subprocess.Popen) -> bool:
+        """Whether any process of the service's group is still running"""
+        if sys.platform == 'win32':
+            return process.poll() is None
+        if os.path.isdir('/proc/self'):
+            # Zombies left to an init that has not reaped them yet hold no ports or memory
+            for entry in os.listdir('/proc'):
+                if entry.isdigit():
+                    fields = ResourceSampler.read_stat(int(entry))
+                    if fields is not None and fields[2] == str(process.pid) and fields[0] != 'Z':
+                        return True
+            return False
+        try:
+            os.killpg(process.pid, 0)
+            return True
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+    
+    def _wait_tree(self, process: subprocess.Popen, timeout: float) -> bool:
+        """Wait for the group leader's exit event, then for the rest of its group; returns whether all exited"""
+        deadline = time.monotonic() + timeout
+        if not self.wait_until(lambda: process.poll() is not None, max(0.0, timeout)):
+            return False
+        while self._group_alive(process):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+    
+    def _wait_port_released(self, port: int) -> bool:
+        deadline = time.monotonic() + self.port_release_timeout
+        while NetworkUtils.is_port_in_use(port):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.1)
+        return True
+    
+    def is_process_running(self, name: str) -> bool:
+        """Check if a process is currently running"""
+        return name in self.processes and self.processes[name].poll() is None
+    
+    def needs_stop(self, name: str) -> bool:
+        """Whether the service's leader or anything left in its process group is still running"""
+        process = self.processes.get(name)
+        return process is not None and (process.poll() is None or self._group_alive(process))
+    
+    def _process_exited(self, name: str, process: subprocess.Popen, returncode: Optional[int]):
+        """Forward an exit notification unless the process has already been replaced"""
+        self._notify_state()
+        if self.processes.get(name) is not process:
+            return
+        expected = self.stop_requested.get(name) is process
+        policy = self.restart_policies.get(name) or RestartPolicy()
+        with self._readiness_lock:
+            readiness = self.readiness.get(name)
+            if readiness is not None and readiness.process is process:
+                readiness.state = 'stopped'
+        with self._restart_lock:
+            state = self.restarts.setdefault(name, ServiceRestarts())
+            state.record_exit(returncode != 0 and not expected, policy)
+        if self.exit_callback is not None:
+            self.exit_callback(name, returncode, expected)
+        if not expected:
+            self._schedule_restart(name, process, returncode, policy)
+    
+    def set_restart_policy(self, name: str, policy: RestartPolicy):
+        """Set the restart policy of a service; takes effect on its next exit"""
+        self.restart_policies[name] = policy
+        with self._restart_lock:
+            state = self.restarts.setdefault(name, ServiceRestarts())
+            if policy.mode == 'never':
+                state.cancel_pending()
+    
+    def _schedule_restart(self, name: str, process: subprocess.Popen, returncode: Optional[int],
+                          policy: RestartPolicy):
+        if not policy.wants_restart(returncode) or name not in self.launch_specs:
+            return
+        
+        with self._restart_lock:
+            state = self.restarts[name]
+            if len(state.failure_times) >= policy.max_failures:
+                # Crash-loop breaker: stay down until someone starts the service by hand
+                state.crash_loop = True
+                message = (f"[{name}] crashed {len(state.failure_times)} times within "
+                           f"{policy.failure_window:.0f}s, not restarting\n")
+                tag = "error"
+            else:
+                state.consecutive += 1
+                delay = policy.delay(state.consecutive)
+                state.cancel_pending()
+                state.pending = threading.Timer(delay, self._restart, args=(name, process))
+                state.pending.daemon = True
+                state.next_restart_at = time.monotonic() + delay
+                state.pending.start()
+                message = f"[{name}] restarting in {delay:.1f}s (attempt {state.consecutive})\n"
+                tag = "warning"
+        self._notify(message, tag, name)
+    
+    def _restart(self, name: str, process: subprocess.Popen):
+        """Timer thread: relaunch a service unless it was started or stopped by hand meanwhile"""
+        with self._restart_lock:
+            state = self.restarts[name]
+            if state.pending is None or self.processes.get(name) is not process:
+                return
+            state.pending = None
+            state.next_restart_at = None
+        
+        # The shell may have died while node children still hold the port
+        if self._group_alive(process):
+            self._kill_tree(process)
+            self._wait_tree(process, 2.0)
+        
+        spec = self.launch_specs[name]
+        success, message = self.start_process(name, spec['cmd'], cwd=spec['cwd'], env=spec['env'],
+                                              port=spec['port'], restart=True)
+        if success:
+            with self._restart_lock:
+                state.restart_count += 1
+            self._notify(f"[{name}] restarted (restart #{state.restart_count})\n", "success", name)
+        else:
+            self._notify(f"[{name}] restart failed: {message}\n", "error", name)
+            policy = self.restart_policies.get(name) or RestartPolicy()
+            with self._restart_lock:
+                state.record_exit(True, policy)
+            self._schedule_restart(name, process, None, policy)
+    
+    def _notify(self, text: str, tag: Optional[str], name: str):
+        try:
+            if self.output_callback is not None:
+                self.output_callback(text, tag)
+            if self.restart_callback is not None:
+                self.restart_callback(name)
+        except Exception:
+            pass
+    
+    def get_restart_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get restart counts, MTBF and crash-loop state for every service"""
+        with self._restart_lock:
+            return {name: state.stats() for name, state in self.restarts.items()}
+    
+    def set_readiness_probe(self, name: str, probe: Optional[ReadinessProbe]):
+        """Set how a service is judged ready; takes effect on its next start"""
+        if probe is None:
+            self.readiness_probes.pop(name, None)
+        else:
+            self.readiness_probes[name] = probe
+    
+    def _begin_readiness(self, name: str, process: subprocess.Popen, spawned_at: float):
+        probe = self.readiness_probes.get(name)
+        with self._readiness_lock:
+            state = self.readiness.setdefault(name, ServiceReadiness())
+            state.process = process
+            state.spawned_at = spawned_at
+            state.ready_at = None
+            state.state = 'starting'
+        
+        if probe is None:
+            # Without a probe the service counts as ready once spawned
+            self._mark_ready(name, process, spawned_at)
+            return
+        
+        self.supervisor.start()
+        asyncio.run_coroutine_threadsafe(self._probe(name, process, probe), self.supervisor.loop)
+    
+    async def _probe(self, name: str, process: subprocess.Popen, probe: ReadinessProbe):
+        """Run a TCP/HTTP probe until it passes, or wait out a log probe, on the supervisor loop"""
+        deadline = time.monotonic() + probe.timeout
+        while time.monotonic() < deadline and process.poll() is None:
+            with self._readiness_lock:
+                state = self.readiness.get(name)
+                if state is None or state.process is not process or state.state != 'starting':
+                    return
+            if probe.kind != 'log' and await probe.attempt():
+                self._mark_ready(name, process, time.monotonic())
+                return
+            await asyncio.sleep(probe.interval)
+        
+        with self._readiness_lock:
+            state = self.readiness.get(name)
+            if state is None or state.process is not process or state.state != 'starting':
+                return
+            state.state = 'not-ready'
+            waited = time.monotonic() - state.spawned_at
+        self._notify_state()
+        if process.poll() is None:
+            self._notify(f"[{name}] not ready after {waited:.1f}s ({probe.describe()})\n", "warning", name)
+        if self.ready_callback is not None:
+            self.ready_callback(name, False, waited)
+    
+    def _mark_ready(self, name: str, process: subprocess.Popen, at: float):
+        with self._readiness_lock:
+            state = self.readiness.get(name)
+            if state is None or state.process is not process or state.state != 'starting':
+                return
+            latency = state.record_ready(at)
+        self._notify_state()
+        if self.ready_callback is not None:
+            self.ready_callback(name, True, latency)
+    
+    def add_line_listener(self, listener: Callable[[str, str, bool], None]):
+        with self._listeners_lock:
+            self.line_listeners = self.line_listeners + [listener]
+    
+    def remove_line_listener(self, listener: Callable[[str, str, bool], None]):
+        with self._listeners_lock:
+            self.line_listeners = [other for other in self.line_listeners if other != listener]
+    
+    def _notify_state(self):
+        with self._state_changed:
+            self._state_changed.notify_all()
+    
+    def wait_until(self, predicate: Callable[[], bool], timeout: Optional[float] = None) -> bool:
+        """Block until predicate() holds, re-checking it on every exit or readiness change"""
+        with self._state_changed:
+            return self._state_changed.wait_for(predicate, timeout)
+    
+    def is_process_ready(self, name: str) -> bool:
+        """Check if a process is running and its readiness probe has passed"""
+        with self._readiness_lock:
+            state = self.readiness.get(name)
+            ready = state is not None and state.state == 'ready'
+        return ready and self.is_process_running(name)
+    
+    def get_readiness_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get readiness state and spawn-to-ready latencies for every service"""
+        with self._readiness_lock:
+            return {name: state.stats() for name, state in self.readiness.items()}
+    
+    def _read_output(self, name: str, line: str, is_error: bool):
+        """Store one line of process output delivered by the supervisor"""
+        line = line.rstrip()
+        log = self.process_logs[name]
+        log.append(line, is_error)
+        
+        # Log-line readiness probe
+        probe = self.readiness_probes.get(name)
+        if probe is not None and probe.kind == 'log':
+            state = self.readiness.get(name)
+            if state is not None and state.state == 'starting' and probe.pattern.search(ANSI_ESCAPE_RE.sub('', line)):
+                self._mark_ready(name, state.process, time.monotonic())
+        
+        for listener in self.line_listeners:
+            try:
+                listener(name, line, is_error)
+            except Exception:
+                pass
+        
+        line_with_prefix = log.prefix + line
+        
+        # Group error output into multi-line records before logging it
+        if is_error:
+            self.error_aggregator.feed(name, line)
+            
+        # Track console output for real-time monitoring
+        try:
+            if self.output_callback is not None:
+                tag = "error" if is_error and ("error" in line.lower() or "exception" in line.lower()) else None
+                self.output_callback(line_with_prefix + "\n", tag)
+        except Exception:
+            pass
+    
+    def _log_error_record(self, name: str, lines: List[str]):
+        """Log one aggregated error record: first line as message, the rest as detail"""
+        detail = "\n".join(lines[1:]) if len(lines) > 1 else None
+        self.error_logger.log_error(f"{name} Error", lines[0].strip(), detail)
+    
+    def get_ingest_rates(self) -> Dict[str, float]:
+        """Get the lines per second currently read from each process"""
+        return self.supervisor.get_ingest_rates()
+    
+    def get_latest_logs(self, name: str, count: int = 100) -> List[Tuple[str, bool]]:
+        """Get the latest logs for a process"""
+        if name not in self.process_logs:
+            return []
+            
+        return self.process_logs[name].latest(count)
+    
+    def get_log_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get line, byte and eviction counters for every process log"""
+        return {name: log.stats() for name, log in self.process_logs.items()}
+    
+    def stop_all_processes(self) -> Dict[str, str]:
+        """Stop all running processes in parallel and return results"""
+        results = {}
+        
+        def stop(name: str):
+            success, message = self.stop_process(name)
+            results[name] = message
+        
+        threads = [threading.Thread(target=stop, args=(name,), name=f"Stop-{name}", daemon=True)
+                   for name in list(self.processes.keys()) if self.needs_stop(name)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+# Resource Sampling
+class ResourceSeries:
+    """Fixed-size time series of resource samples for one service, one typed array per metric"""
+    METRICS = ('time', 'cpu', 'rss', 'threads', 'fds', 'read_bytes', 'write_bytes', 'processes')
+    
+    def __init__(self, capacity: int = 300):
+        self.capacity = max(1, capacity)
+        self.count = 0
+        self._next = 0
+        self._data = {metric: array('d', bytes(8 * self.capacity)) for metric in self.METRICS}
+    
+    def append(self, sample: Dict[str, float]):
+        for metric in self.METRICS:
+            self._data[metric][self._next] = sample.get(metric, 0.0)
+        self._next = (self._next + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+    
+    def latest(self) -> Optional[Dict[str, float]]:
+        if not self.count:
+            return None
+        index = (self._next - 1) % self.capacity
+        return {metric: values[index] for metric, values in self._data.items()}
+    
+    def values(self, metric: str) -> List[float]:
+        """Samples of one metric, oldest first"""
+        values = self._data[metric]
+        start = (self._next - self.count) % self.capacity
+        return [values[(start + i) % self.capacity] for i in range(self.count)]
+
+class ResourceSampler:
+    """Samples CPU, memory, threads, file descriptors and I/O of each managed process tree from /proc.
+    
+    Services run through a shell and npm, so the real node process sits a few levels
+    below the Popen child; every sample sums the child and all of its descendants.
+    """
+    
+    def __init__(self, process_manager: 'ProcessManager', interval: float = 2.0, capacity: int = 300):
+        self.process_manager = process_manager
+        self.interval = interval
+        self.capacity = capacity
+        self.available = os.path.isdir('/proc/self')
+        self.series: Dict[str, ResourceSeries] = {}
+        # Called as sample_callback() after every round of samples; must be thread-safe
+        self.sample_callback: Optional[Callable[[], None]] = None
+        self._clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+        self._page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+        self._cpu_ticks: Dict[int, int] = {}
+        self._last_sample: Optional[float] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        if not self.available or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ResourceSampler", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self._stop.set()
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception:
+                self.process_manager.error_logger.log_error(
+                    "Resource Sampler Error", "Failed to sample process resources", traceback.format_exc())
+    
+    @staticmethod
+    def read_stat(pid: int) -> Optional[List[str]]:
+        """Fields of /proc/<pid>/stat after the command name, which may itself contain spaces"""
+        try:
+            with open(f'/proc/{pid}/stat', 'r') as f:
+                data = f.read()
+        except OSError:
+            return None
+        return data[data.rfind(')') + 2:].split()
+    
+    def _children_map(self) -> Dict[int, List[int]]:
+        children: Dict[int, List[int]] = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            fields = self.read_stat(int(entry))
+            if fields is not None:
+                children.setdefault(int(fields[1]), []).append(int(entry))
+        return children
+    
+    @staticmethod
+    def _tree(pid: int, children: Dict[int, List[int]]) -> List[int]:
+        pids, stack = [], [pid]
+        while stack:
+            current = stack.pop()
+            pids.append(current)
+            stack.extend(children.get(current, ()))
+        return pids
+    
+    def _sample_pid(self, pid: int) -> Optional[Dict[str, float]]:
+        fields = self.read_stat(pid)
+        if fields is None:
+            return None
+        # Offsets after the command name: utime 11, stime 12, num_threads 17, rss 21 (pages)
+        sample = {
+            'ticks': int(fields[11]) + int(fields[12]),
+            'threads': int(fields[17]),
+            'rss': int(fields[21]) * self._page_size,
+            'fds': 0,
+            'read_bytes': 0,
+            'write_bytes': 0,
+        }
+        try:
+            sample['fds'] = len(os.listdir(f'/proc/{pid}/fd'))
+        except OSError:
+            pass
+        try:
+            with open(f'/proc/{pid}/io', 'r') as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    if key in ('read_bytes', 'write_bytes'):
+                        sample[key] = int(value)
+        except (OSError, ValueError):
+            pass
+        return sample
+    
+    def sample(self):
+        """Take one sample of every running service"""
+        now = time.monotonic()
+        pids = {name: process.pid for name, process in list(self.process_manager.processes.items())
+                if process.poll() is None}
+        children = self._children_map() if pids else {}
+        elapsed = now - self._last_sample if self._last_sample is not None else None
+        cpu_ticks: Dict[int, int] = {}
+        
+        with self._lock:
+            for name, root_pid in pids.items():
+                totals = {'time': time.time(), 'cpu': 0.0, 'rss': 0, 'threads': 0, 'fds': 0,
+                          'read_bytes': 0, 'write_bytes': 0, 'processes': 0}
+                used_ticks = 0
+                for pid in self._tree(root_pid, children):
+                    sample = self._sample_pid(pid)
+                    if sample is None:
+                        continue
+                    cpu_ticks[pid] = sample['ticks']
+                    # Processes that appeared since the last round count from their start
+                    used_ticks += sample['ticks'] - self._cpu_ticks.get(pid, 0)
+                    for metric in ('rss', 'threads', 'fds', 'read_bytes', 'write_bytes'):
+                        totals[metric] += sample[metric]
+                    totals['processes'] += 1
+                if elapsed:
+                    totals['cpu'] = max(0.0, used_ticks / self._clock_ticks / elapsed * 100.0)
+                series = self.series.get(name)
+                if series is None:
+                    series = self.series[name] = ResourceSeries(self.capacity)
+                series.append(totals)
+            self._cpu_ticks = cpu_ticks
+            self._last_sample = now
+        
+        if self.sample_callback is not None:
+            self.sample_callback()
+    
+    def latest(self, name: str) -> Optional[Dict[str, float]]:
+        """Most recent sample of a service, or None if it has not been sampled"""
+        with self._lock:
+            series = self.series.get(name)
+            return series.latest() if series is not None else None
+    
+    def latest_total(self, names: Iterable[str]) -> Optional[Dict[str, float]]:
+        """Latest samples of several services added up, e.g. a balancer and its workers"""
+        samples = [sample for sample in (self.latest(name) for name in names) if sample]
+        if not samples:
+            return None
+        total = {metric: sum(sample[metric] for sample in samples) for metric in ResourceSeries.METRICS}
+        total['time'] = max(sample['time'] for sample in samples)
+        return total
+    
+    def history(self, name: str, metric: str) -> List[float]:
+        with self._lock:
+            series = self.series.get(name)
+            return series.values(metric) if series is not None else []
+    
+    @staticmethod
+    def format_sample(sample: Optional[Dict[str, float]]) -> str:
+        if not sample:
+            return ""
+        mb = 1024 * 1024
+        return (f"CPU {sample['cpu']:.0f}% | RSS {sample['rss'] / mb:.0f} MB | "
+                f"{int(sample['threads'])} thr | {int(sample['fds'])} fds | "
+                f"IO {sample['read_bytes'] / mb:.0f}/{sample['write_bytes'] / mb:.0f} MB | "
+                f"{int(sample['processes'])} proc")
+
+# Startup Benchmark
+class StartupBenchmark:
+    """Starts and stops services repeatedly and records how long each startup phase takes.
+    
+    A phase is the first output line matching its pattern, measured from spawn; the
+    'ready' phase comes from the readiness probe. Percentiles of every phase are
+    appended to a JSON-lines history file together with a hash of package.json, so
+    a startup regression can be tied to a dependency change.
+    """
+    
+    # Phase markers printed by npm, server/server.js, server/db.js and react-scripts
+    PHASES = {
+        'backend': [
+            ('npm', r'^> node server/server\.js'),
+            ('listening', r'Server running on port'),
+            ('db_connected', r'Database connection established'),
+        ],
+        'frontend': [
+            ('npm', r'^> react-scripts start'),
+            ('dev_server', r'Starting the development server'),
+            ('compiled', r'[Cc]ompiled successfully|[Cc]ompiled with \d+ warnings?'),
+        ],
+    }
+    
+    def __init__(self, process_manager: 'ProcessManager', base_dir: str = None, runs: int = 5,
+                 ready_timeout: float = 300.0, stop_timeout: float = 30.0):
+        self.process_manager = process_manager
+        self.base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
+        self.history_path = os.path.join(self.base_dir, 'benchmarks', 'startup_history.jsonl')
+        self.runs = max(1, runs)
+        self.ready_timeout = ready_timeout
+        self.stop_timeout = stop_timeout
+        self.cancelled = False
+        self._marks: Dict[str, float] = {}
+        self._patterns: List[Tuple[str, Any]] = []
+        self._service: Optional[str] = None
+        self._lock = threading.Lock()
+    
+    def cancel(self):
+        """Stop after the current run; a run waiting for readiness gives up right away"""
+        self.cancelled = True
+        self.process_manager._notify_state()
+    
+    @staticmethod
+    def percentile(values: List[float], pct: float) -> float:
+        """Nearest-rank percentile"""
+        ordered = sorted(values)
+        return ordered[max(0, math.ceil(pct / 100.0 * len(ordered)) - 1)]
+    
+    def _on_line(self, name: str, line: str, is_error: bool):
+        if name != self._service:
+            return
+        now = time.monotonic()
+        line = ANSI_ESCAPE_RE.sub('', line).strip()
+        with self._lock:
+            for phase, pattern in self._patterns:
+                if phase not in self._marks and pattern.search(line):
+                    self._marks[phase] = now
+    
+    def _run_once(self, name: str, spec: Dict[str, Any]) -> Tuple[Optional[Dict[str, float]], str]:
+        """One start/ready/stop cycle; returns phase offsets in seconds from spawn"""
+        pm = self.process_manager
+        with self._lock:
+            self._marks = {}
+        
+        pm.set_readiness_probe(name, spec.get('probe'))
+        success, message = pm.start_process(name, spec['cmd'], cwd=spec.get('cwd'),
+                                            env=spec.get('env'), port=spec.get('port'))
+        if not success:
+            return None, message
+        
+        try:
+            settled = pm.wait_until(lambda: (self.cancelled or pm.is_process_ready(name)
+                                             or not pm.is_process_running(name)), self.ready_timeout)
+            if self.cancelled:
+                return None, "cancelled"
+            if not settled:
+                return None, f"not ready after {self.ready_timeout:.0f}s"
+            if not pm.is_process_ready(name):
+                return None, "exited before it was ready"
+            
+            readiness = pm.readiness[name]
+            with self._lock:
+                phases = {phase: at - readiness.spawned_at for phase, at in self._marks.items()}
+            phases['ready'] = readiness.time_to_ready()
+            return phases, "ok"
+        finally:
+            pm.stop_process(name)
+            pm.wait_until(lambda: not pm.is_process_running(name), self.stop_timeout)
+    
+    def run(self, services: Dict[str, Dict[str, Any]],
+            progress: Callable[[str], None] = None) -> Dict[str, Any]:
+        """Benchmark each service in turn.
+        
+        services maps a service name to its launch spec: cmd, cwd, env, port and probe
+        as passed to ProcessManager, plus optional phases as (name, regex) pairs.
+        """
+        pm = self.process_manager
+        report = progress or (lambda text: None)
+        result = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'runs': self.runs,
+            'package_hash': self.package_hash(),
+            'services': {},
+        }
+        
+        pm.add_line_listener(self._on_line)
+        try:
+            for name, spec in services.items():
+                if pm.is_process_running(name):
+                    report(f"Skipping {name}: it is already running\n")
+                    continue
+                
+                # Crashes are data points here, not something to recover from
+                policy = pm.restart_policies.get(name)
+                pm.set_restart_policy(name, RestartPolicy('never'))
+                probe = pm.readiness_probes.get(name)
+                self._service = name
+                self._patterns = [(phase, re.compile(pattern))
+                                  for phase, pattern in spec.get('phases', self.PHASES.get(name, []))]
+                samples: Dict[str, List[float]] = {}
+                failures = 0
+                try:
+                    for i in range(self.runs):
+                        if self.cancelled:
+                            break
+                        phases, message = self._run_once(name, spec)
+                        if phases is None:
+                            failures += 1
+                            report(f"{name} run {i + 1}/{self.runs}: failed ({message})\n")
+                            continue
+                        for phase, seconds in phases.items():
+                            samples.setdefault(phase, []).append(seconds)
+                        report(f"{name} run {i + 1}/{self.runs}: ready in {phases['ready']:.2f}s\n")
+                finally:
+                    self._service = None
+                    pm.set_readiness_probe(name, probe)
+                    if policy is not None:
+                        pm.set_restart_policy(name, policy)
+                    else:
+                        pm.restart_policies.pop(name, None)
+                
+                result['services'][name] = {
+                    'failures': failures,
+                    'phases': {phase: {
+                        'p50': round(self.percentile(values, 50), 3),
+                        'p95': round(self.percentile(values, 95), 3),
+                        'min': round(min(values), 3),
+                        'max': round(max(values), 3),
+                        'samples': len(values),
+                    } for phase, values in samples.items()},
+                }
+        finally:
+            pm.remove_line_listener(self._on_line)
+        
+        if not self.cancelled:
+            self.save(result)
+        return result
+    
+    def package_hash(self) -> Optional[str]:
+        """Hash of the dependency sections of package.json"""
+        try:
+            with open(os.path.join(self.base_dir, 'package.json'), 'r', encoding='utf-8') as f:
+                package = json.load(f)
+        except (OSError, ValueError):
+            return None
+        deps = {key: package.get(key) for key in ('dependencies', 'devDependencies')}
+        return hashlib.sha1(json.dumps(deps, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    
+    def save(self, result: Dict[str, Any]):
+        os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+        with open(self.history_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(result, separators=(',', ':')) + '\n')
+    
+    def history(self) -> List[Dict[str, Any]]:
+        """All saved results, oldest first"""
+        entries = []
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        continue
+        except OSError:
+            pass
+        return entries
+    
+    @staticmethod
+    def compare(result: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2) -> List[str]:
+        """Describe phases whose p50 grew by more than threshold compared to the baseline result"""
+        regressions = []
+        for name, service in result.get('services', {}).items():
+            base_phases = baseline.get('services', {}).get(name, {}).get('phases', {})
+            for phase, stats in service.get('phases', {}).items():
+                before = base_phases.get(phase, {}).get('p50')
+                if before and stats['p50'] > before * (1 + threshold):
+                    regressions.append(f"{name}.{phase}: p50 {before:.2f}s -> {stats['p50']:.2f}s")
+        return regressions
+    
+    @staticmethod
+    def format_result(result: Dict[str, Any]) -> str:
+        lines = [f"Startup benchmark {result['timestamp']} ({result['runs']} runs, "
+                 f"package.json {result.get('package_hash') or 'n/a'})"]
+        for name, service in result['services'].items():
+            lines.append(f"  {name} (failures: {service['failures']})")
+            for phase, stats in sorted(service['phases'].items(), key=lambda item: item[1]['p50']):
+                lines.append(f"    {phase:<14} p50 {stats['p50']:7.2f}s   p95 {stats['p95']:7.2f}s")
+        return "\n".join(lines) + "\n"
+
+# Service Orchestration
+class ServiceOrchestrator:
+    """Starts services concurrently while honouring their declared dependencies.
+    
+    A service starts once everything it depends_on has finished: a long-running
+    service when its readiness probe passes, a oneshot job (like db_init) when it
+    exits with code 0. A dependency that fails skips everything downstream of it;
+    dependencies on services that are not part of the run count as satisfied. A launch
+    spec may override the declared dependencies with its own 'depends_on' list.
+    """
+    
+    # Declared startup order of the managed stack
+    DEPENDENCIES = {
+        'db_init': [],
+        'backend': ['db_init'],
+        'frontend': ['backend'],
+    }
+    ONESHOT = {'db_init'}
+    
+    def __init__(self, process_manager: 'ProcessManager', ready_timeout: float = 300.0):
+        self.process_manager = process_manager
+        self.ready_timeout = ready_timeout
+    
+    @classmethod
+    def order(cls, names: Iterable[str]) -> List[str]:
+        """Topological order of the given services; raises ValueError on a dependency cycle"""
+        names = list(names)
+        ordered: List[str] = []
+        visiting: Set[str] = set()
+        
+        def visit(name: str):
+            if name in ordered:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle involving '{name}'")
+            visiting.add(name)
+            for dependency in cls.DEPENDENCIES.get(name, []):
+                if dependency in names:
+                    visit(dependency)
+            visiting.discard(name)
+            ordered.append(name)
+        
+        for name in names:
+            visit(name)
+        return ordered
+    
+    def start_all(self, services: Dict[str, Dict[str, Any]],
+                  progress: Callable[[str], None] = None) -> Dict[str, Tuple[bool, str]]:
+        """Start services (name -> launch spec as for StartupBenchmark) and wait until each settles"""
+        report = progress or (lambda text: None)
+        order = self.order(services)
+        results: Dict[str, Tuple[bool, str]] = {}
+        settled = threading.Condition()
+        
+        def run(name: str):
+            declared = services[name].get('depends_on', self.DEPENDENCIES.get(name, []))
+            dependencies = [d for d in declared if d in services]
+            with settled:
+                settled.wait_for(lambda: all(d in results for d in dependencies))
+                failed = [d for d in dependencies if not results[d][0]]
+            
+            if failed:
+                outcome = (False, f"skipped, {', '.join(failed)} did not come up")
+            else:
+                outcome = self._start_one(name, services[name])
+            report(f"{name}: {outcome[1]}\n")
+            with settled:
+                results[name] = outcome
+                settled.notify_all()
+        
+        threads = [threading.Thread(target=run, args=(name,), name=f"Start-{name}", daemon=True)
+                   for name in order]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return {name: results[name] for name in order}
+    
+    def _start_one(self, name: str, spec: Dict[str, Any]) -> Tuple[bool, str]:
+        pm = self.process_manager
+        started_at = time.monotonic()
+        
+        if pm.is_process_running(name):
+            if name in self.ONESHOT:
+                process = pm.processes[name]
+            elif pm.wait_until(lambda: pm.is_process_ready(name) or not pm.is_process_running(name),
+                               self.ready_timeout) and pm.is_process_ready(name):
+                return True, "already running"
+            else:
+                return False, "already running but not ready"
+        else:
+            pm.set_readiness_probe(name, spec.get('probe'))
+            success, message = pm.start_process(name, spec['cmd'], cwd=spec.get('cwd'),
+                                                env=spec.get('env'), port=spec.get('port'))
+            if not success:
+                return False, message
+            process = pm.processes[name]
+        
+        if name in self.ONESHOT:
+            if not pm.wait_until(lambda: process.poll() is not None, self.ready_timeout):
+                return False, f"still running after {self.ready_timeout:.0f}s"
+            if process.returncode != 0:
+                return False, f"exited with code {process.returncode}"
+            return True, f"completed in {time.monotonic() - started_at:.1f}s"
+        
+        def settled() -> bool:
+            readiness = pm.readiness.get(name)
+            return (process.poll() is not None or readiness is None
+                    or readiness.process is not process or readiness.state != 'starting')
+        
+        pm.wait_until(settled, self.ready_timeout)
+        if pm.is_process_ready(name):
+            return True, f"ready in {time.monotonic() - started_at:.1f}s"
+        if process.poll() is not None:
+            return False, f"exited with code {process.returncode} before it was ready"
+        return False, "started but not ready"
+
+# Load Balancer
+HOP_BY_HOP_HEADERS = frozenset(('connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization',
+                                'proxy-connection', 'te', 'trailer', 'transfer-encoding', 'upgrade'))
+
+class HTTPMessage:
+    """Start line, headers and fully read body of one HTTP/1.1 request or response"""
+    
+    def __init__(self, start_line: str, headers: List[Tuple[str, str]], body: bytes = b''):
+        self.start_line = start_line
+        self.headers = headers
+        self.body = body
+        parts = start_line.split(' ', 2)
+        self.version = parts[0] if parts[0].startswith('HTTP/') else parts[-1]
+        # Requests: method and target; responses: status code
+        self.method = parts[0] if not parts[0].startswith('HTTP/') else None
+        self.target = parts[1] if self.method else None
+        self.status = int(parts[1]) if self.method is None and len(parts) > 1 and parts[1].isdigit() else None
+    
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        name = name.lower()
+        for key, value in self.headers:
+            if key.lower() == name:
+                return value
+        return default
+    
+    @property
+    def path(self) -> str:
+        return urlsplit(self.target or '').path
+    
+    @property
+    def keep_alive(self) -> bool:
+        connection = (self.header('connection') or '').lower()
+        if self.version == 'HTTP/1.0':
+            return 'keep-alive' in connection
+        return 'close' not in connection
+    
+    @classmethod
+    async def read_head(cls, reader: asyncio.StreamReader, response: bool = False) -> Optional['HTTPMessage']:
+        """Read the start line and headers; returns None on a clean end of stream before the first byte"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if not e.partial.strip():
+                return None
+            raise
+        except asyncio.LimitOverrunError:
+            raise ValueError("header section too large")
+        lines = head.decode('latin-1').split('\r\n')
+        headers = []
+        for line in lines[1:]:
+            if line:
+                key, sep, value = line.partition(':')
+                if not sep:
+                    raise ValueError(f"malformed header line: {line[:80]!r}")
+                headers.append((key.strip(), value.strip()))
+        message = cls(lines[0], headers)
+        if (message.method is None) != response:
+            raise ValueError(f"malformed start line: {lines[0][:80]!r}")
+        return message
+    
+    async def read_body(self, reader: asyncio.StreamReader, max_body: int, request_method: Optional[str] = None):
+        """Read the body framed by the headers; request_method is given for responses"""
+        if request_method is not None and (request_method == 'HEAD' or self.status in (204, 304)
+                                           or (self.status or 0) < 200):
+            return
+        if 'chunked' in (self.header('transfer-encoding') or '').lower():
+            self.body = await self._read_chunked(reader, max_body)
+        elif self.header('content-length') is not None:
+            length = int(self.header('content-length'))
+            if length > max_body:
+                raise ValueError("body too large")
+            self.body = await reader.readexactly(length)
+        elif request_method is not None:
+            # A response without length or chunking runs until the upstream closes
+            chunks = []
+            total = 0
+            while True:
+                chunk = await reader.read(64 * 1024)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > max_body:
+                    raise ValueError("body too large")
+                chunks.append(chunk)
+            self.body = b''.join(chunks)
+            self.headers.append(('Connection', 'close'))
+    
+    @classmethod
+    async def read_response(cls, reader: asyncio.StreamReader, max_body: int,
+                            request_method: str) -> Optional['HTTPMessage']:
+        """Read the final response to a request, skipping interim 1xx responses"""
+        while True:
+            message = await cls.read_head(reader, response=True)
+            if message is None:
+                return None
+            await message.read_body(reader, max_body, request_method)
+            if (message.status or 0) >= 200:
+                return message
+    
+    @staticmethod
+    async def _read_chunked(reader: asyncio.StreamReader, max_body: int) -> bytes:
+        chunks = []
+        total = 0
+        while True:
+            size_line = await reader.readuntil(b'\r\n')
+            size = int(size_line.split(b';', 1)[0].strip() or b'0', 16)
+            if size == 0:
+                # Skip trailers up to the final empty line
+                while (await reader.readuntil(b'\r\n')) != b'\r\n':
+                    pass
+                return b''.join(chunks)
+            total += size
+            if total > max_body:
+                raise ValueError("body too large")
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+    
+    def encode(self, extra_headers: Iterable[Tuple[str, str]] = (), keep_alive: bool = True) -> bytes:
+        """Serialise with hop-by-hop headers replaced and the body framed by Content-Length"""
+        # Responses to HEAD, and 204/304, describe a body they do not carry: keep their length
+        framed = bool(self.body) or self.method is not None
+        lines = [self.start_line]
+        for key, value in self.headers:
+            lowered = key.lower()
+            if lowered in HOP_BY_HOP_HEADERS or lowered == 'expect' or (lowered == 'content-length' and framed):
+                continue
+            lines.append(f"{key}: {value}")
+        if self.body or self.method in ('POST', 'PUT', 'PATCH'):
+            lines.append(f"Content-Length: {len(self.body)}")
+        elif not framed and self.header('content-length') is None and self.status not in (204, 304):
+            lines.append("Content-Length: 0")
+        lines.extend(f"{key}: {value}" for key, value in extra_headers)
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + self.body
+    
+    def with_headers(self, headers: Iterable[Tuple[str, str]]) -> 'HTTPMessage':
+        """A copy with extra headers; the body is shared"""
+        return HTTPMessage(self.start_line, self.headers + list(headers), self.body)
+    
+    @classmethod
+    def json_response(cls, status: int, payload: Any, reason: str = '') -> 'HTTPMessage':
+        body = json.dumps(payload, default=str).encode('utf-8')
+        return cls(f"HTTP/1.1 {status} {reason}".rstrip(), [('Content-Type', 'application/json')], body)
+
+class UpstreamError(Exception):
+    """A request could not be completed by a worker; retryable when it may safely go elsewhere"""
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+class UpstreamWorker:
+    """One backend worker behind the balancer: its idle keep-alive connections, load and health"""
+    
+    def __init__(self, name: str, host: str, port: int, pool_size: int = 16, idle_timeout: float = 4.0):
+        self.name = name
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        # Below Node's default 5 s keepAliveTimeout, so pooled sockets are rarely closed under us
+        self.idle_timeout = idle_timeout
+        self.active = 0
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.healthy = True
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self._idle: deque = deque()
+    
+    def available(self, now: float) -> bool:
+        return self.healthy and now >= self.ejected_until
+    
+    async def acquire(self, connect_timeout: float) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        """A pooled connection if a live one is idle, else a new one; returns (reader, writer, reused)"""
+        now = time.monotonic()
+        while self._idle:
+            reader, writer, idle_since = self._idle.pop()
+            if now - idle_since < self.idle_timeout and not reader.at_eof() and not writer.is_closing():
+                self.connections_reused += 1
+                return reader, writer, True
+            writer.close()
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), connect_timeout)
+        self.connections_opened += 1
+        return reader, writer, False
+    
+    def release(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, reusable: bool):
+        if reusable and len(self._idle) < self.pool_size and self.available(time.monotonic()):
+            self._idle.append((reader, writer, time.monotonic()))
+        else:
+            writer.close()
+    
+    def close_idle(self):
+        while self._idle:
+            self._idle.pop()[1].close()
+    
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            'port': self.port,
+            'healthy': self.healthy,
+            'ejected_for': round(self.ejected_until - now, 1) if self.ejected_until > now else 0.0,
+            'active': self.active,
+            'requests': self.requests,
+            'failures': self.failures,
+            'ejections': self.ejections,
+            'idle_connections': len(self._idle),
+            'connections_opened': self.connections_opened,
+            'connections_reused': self.connections_reused,
+        }
+
+class ResponseCache:
+    """Size-bounded LRU of successful GET responses with per-route TTLs and write invalidation.
+    
+    Only paths matching a TTL route are cached, keyed by target and Authorization header.
+    A write (any other method) that matches an invalidation rule drops the cached keys it
+    affects once its response is back; a DELETE also drops everything under its parent
+    path. Responses fetched while an invalidation happened are not stored, so a read that
+    raced a write cannot put the old data back.
+    """
+    # (path pattern, seconds); the first match wins
+    DEFAULT_TTLS = (
+        (r'^/api/stats/users-by-country$', 30.0),
+        (r'^/api/users$', 10.0),
+        (r'^/api/users/[^/]+(/details)?$', 10.0),
+        (r'^/api/invite-codes$', 10.0),
+    )
+    # (method, path pattern, key patterns to drop); {1}... refer to the path pattern's groups
+    DEFAULT_INVALIDATIONS = (
+        ('PUT', r'^/api/users/([^/]+)/', (r'^/api/users$', r'^/api/users/{1}(/|$)', r'^/api/stats/')),
+        ('POST', r'^/api/users/([^/]+)/', (r'^/api/users$', r'^/api/users/{1}(/|$)')),
+        ('DELETE', r'^/api/users/', (r'^/api/users', r'^/api/stats/')),
+        ('POST', r'^/api/invite-codes$', (r'^/api/invite-codes',)),
+        ('DELETE', r'^/api/invite-codes/', (r'^/api/invite-codes',)),
+        # Registration adds a user and uses up an invite code; login and logout touch last_online
+        ('POST', r'^/api/auth/register$', (r'^/api/users', r'^/api/stats/', r'^/api/invite-codes')),
+        ('POST', r'^/api/auth/(login|logout)$', (r'^/api/users',)),
+    )
+    
+    def __init__(self, ttls: Iterable[Tuple[str, float]] = DEFAULT_TTLS,
+                 invalidations: Iterable[Tuple[str, str, Iterable[str]]] = DEFAULT_INVALIDATIONS,
+                 max_bytes: int = 32 * 1024 * 1024, max_entries: int = 1000):
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in ttls]
+        self.invalidations = [(method, re.compile(pattern), tuple(keys)) for method, pattern, keys in invalidations]
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        # key -> (path, response, expires_at, size); oldest use first
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[str, HTTPMessage, float, int]]' = OrderedDict()
+        self.bytes = 0
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidated = 0
+        self.bytes_saved = 0
+    
+    def ttl(self, path: str) -> Optional[float]:
+        for pattern, ttl in self.ttls:
+            if pattern.search(path):
+                return ttl
+        return None
+    
+    @staticmethod
+    def key(request: HTTPMessage) -> Tuple[str, str]:
+        return request.target, request.header('authorization') or ''
+    
+    def cacheable(self, request: HTTPMessage) -> bool:
+        return request.method == 'GET' and self.ttl(request.path) is not None
+    
+    def get(self, request: HTTPMessage) -> Optional[HTTPMessage]:
+        """A fresh cached response for the request, counting the lookup as a hit or miss"""
+        key = self.key(request)
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] <= time.monotonic():
+            self._drop(key)
+            entry = None
+        # `Cache-Control: no-cache` asks for a fresh copy, which then replaces the cached one
+        if entry is None or 'no-cache' in (request.header('cache-control') or ''):
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        self.bytes_saved += len(entry[1].body)
+        return entry[1]
+    
+    def put(self, request: HTTPMessage, response: HTTPMessage, generation: int):
+        """Store a response fetched while the cache was at `generation`"""
+        ttl = self.ttl(request.path)
+        cache_control = (response.header('cache-control') or '').lower()
+        if (ttl is None or response.status != 200 or generation != self.generation
+                or 'no-store' in cache_control or 'private' in cache_control):
+            return
+        size = len(response.body) + sum(len(k) + len(v) for k, v in response.headers) + len(request.target)
+        if size > self.max_bytes:
+            return
+        key = self.key(request)
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (request.path, response, time.monotonic() + ttl, size)
+        self.bytes += size
+        self.stores += 1
+        while self.bytes > self.max_bytes or len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+    
+    def _drop(self, key: Tuple[str, str]):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry[3]
+    
+    def invalidate(self, request: HTTPMessage):
+        """Drop the cached keys a write request affects"""
+        path = request.path
+        patterns = []
+        for method, pattern, keys in self.invalidations:
+            match = pattern.search(path) if method == request.method else None
+            if match is not None:
+                groups = [re.escape(group or '') for group in match.groups()]
+                patterns.extend(re.compile(re.sub(r'\{(\d+)\}', lambda ref: groups[int(ref.group(1)) - 1], key))
+                                for key in keys)
+        if request.method == 'DELETE':
+            patterns.append(re.compile('^' + re.escape(path.rsplit('/', 1)[0]) + '(/|$)'))
+        if not patterns:
+            return
+        
+        self.generation += 1
+        for key, entry in list(self._entries.items()):
+            if any(pattern.search(entry[0]) for pattern in patterns):
+                self._drop(key)
+                self.invalidated += 1
+    
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+        self.bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / lookups if lookups else None,
+            'bytes_saved': self.bytes_saved,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'invalidated': self.invalidated,
+        }
+
+class LoadBalancer:
+    """Asyncio HTTP/1.1 reverse proxy that spreads requests over several backend workers.
+    
+    Workers are picked round-robin or by fewest in-flight requests. Upstream connections
+    are kept alive and pooled per worker. A worker that fails max_failures requests in a
+    row (connect errors, resets, timeouts) is ejected for ejection_time, doubling on each
+    repeat up to max_ejection_time; a periodic health check takes it out of rotation while
+    it is down and puts it back once it answers. When every worker is out, all of them
+    are tried anyway rather than failing every request.
+    
+    Bodies are read in full before forwarding, which suits the JSON API but not streaming.
+    GET STATS_PATH from the local machine returns the balancer's counters. With a
+    ResponseCache, cacheable GETs are answered from it and writes invalidate it. With
+    coalesce on, identical GETs that arrive while one is already on its way upstream wait
+    for its response instead of sending their own.
+    """
+    STRATEGIES = ('round-robin', 'least-connections')
+    STATS_PATH = '/__balancer/stats'
+    IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+    
+    def __init__(self, upstreams: List[Tuple[str, int]], host: str = '0.0.0.0', port: int = 5000,
+                 strategy: str = 'round-robin', pool_size: int = 16, health_path: Optional[str] = None,
+                 health_interval: float = 2.0, max_failures: int = 3, ejection_time: float = 5.0,
+                 max_ejection_time: float = 60.0, connect_timeout: float = 2.0,
+                 response_timeout: float = 60.0, client_idle_timeout: float = 60.0,
+                 max_body: int = 16 * 1024 * 1024, cache: Optional[ResponseCache] = None,
+                 coalesce: bool = True):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown balancing strategy: {strategy}")
+        if not upstreams:
+            raise ValueError("The balancer needs at least one upstream")
+        self.workers = [UpstreamWorker(f"{h}:{p}", h, p, pool_size) for h, p in upstreams]
+        self.host = host
+        self.port = port
+        self.strategy = strategy
+        self.health_path = health_path
+        self.health_interval = health_interval
+        self.max_failures = max_failures
+        self.ejection_time = ejection_time
+        self.max_ejection_time = max_ejection_time
+        self.connect_timeout = connect_timeout
+        self.response_timeout = response_timeout
+        self.client_idle_timeout = client_idle_timeout
+        self.max_body = max_body
+        self.cache = cache
+        self.coalesce = coalesce
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.coalesced = 0
+        self.started_at = time.monotonic()
+        self._next = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._health_task: Optional[asyncio.Task] = None
+        self._clients: Set[asyncio.StreamWriter] = set()
+        # ResponseCache.key -> the upstream fetch identical GETs are waiting on
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+    
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._health_task = asyncio.ensure_future(self._health_loop())
+    
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+        if self._server is not None:
+            self._server.close()
+        # Keep-alive clients would otherwise hold the server open
+        for writer in list(self._clients):
+            writer.close()
+        for worker in self.workers:
+            worker.close_idle()
+        await asyncio.sleep(0)
+    
+    def pick(self, exclude: Iterable[UpstreamWorker] = ()) -> Optional[UpstreamWorker]:
+        """Choose the worker for the next request, skipping those already tried for it"""
+        now = time.monotonic()
+        candidates = [w for w in self.workers if w not in exclude]
+        available = [w for w in candidates if w.available(now)] or candidates
+        if not available:
+            return None
+        if self.strategy == 'least-connections':
+            # Ties go round-robin so idle workers share the load evenly
+            start = self._next % len(available)
+            rotated = available[start:] + available[:start]
+            self._next += 1
+            return min(rotated, key=lambda w: w.active)
+        worker = available[self._next % len(available)]
+        self._next += 1
+        return worker
+    
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        peer = writer.get_extra_info('peername')
+        client_ip = peer[0] if peer else ''
+        self._clients.add(writer)
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader, writer), self.client_idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except ValueError as e:
+                    writer.write(HTTPMessage.json_response(400, {'message': str(e)}, 'Bad Request')
+                                 .encode(keep_alive=False))
+                    break
+                if request is None:
+                    break
+                
+                keep_alive = request.keep_alive
+                if request.header('upgrade'):
+                    response = HTTPMessage.json_response(501, {'message': "Upgrades are not proxied"},
+                                                         'Not Implemented')
+                    keep_alive = False
+                elif request.path == self.STATS_PATH and client_ip in ('127.0.0.1', '::1'):
+                    response = HTTPMessage.json_response(200, self.stats(), 'OK')
+                else:
+                    response = await self.handle(request, client_ip)
+                writer.write(response.encode(keep_alive=keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled when the balancer shuts down with the client still connected
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+    
+    async def _read_request(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> Optional[HTTPMessage]:
+        request = await HTTPMessage.read_head(reader)
+        if request is None:
+            return None
+        if (request.header('expect') or '').lower() == '100-continue':
+            writer.write(b"HTTP/1.1 100 Continue\r\n\r\n")
+        await request.read_body(reader, self.max_body)
+        return request
+    
+    async def handle(self, request: HTTPMessage, client_ip: str) -> HTTPMessage:
+        """Produce the response to one client request, from the cache when it holds a fresh copy
+        or shared with an identical GET already in flight"""
+        if request.header('user-agent') == ReadinessProbe.USER_AGENT:
+            # Probes check that a worker answers; a cached copy or its hit would only skew the stats
+            return await self.forward(request, client_ip)
+        cache = self.cache
+        cacheable = cache is not None and cache.cacheable(request)
+        if cacheable:
+            cached = cache.get(request)
+            if cached is not None:
+                return cached.with_headers([('X-Cache', 'HIT')])
+        
+        if self.coalesce and request.method == 'GET':
+            response = await self._single_flight(request, client_ip)
+        else:
+            response = await self.forward(request, client_ip)
+            if request.method not in self.IDEMPOTENT_METHODS:
+                # Reads sent after this write must not be handed a response fetched before it
+                self._inflight.clear()
+                if cache is not None:
+                    cache.invalidate(request)
+        return response.with_headers([('X-Cache', 'MISS')]) if cacheable else response
+    
+    async def _single_flight(self, request: HTTPMessage, client_ip: str) -> HTTPMessage:
+        """Fetch a GET, joining an identical one that is already waiting on a worker"""
+        key = ResponseCache.key(request)
+        flight = self._inflight.get(key)
+        if flight is not None:
+            self.coalesced += 1
+        else:
+            # A task of its own, so the waiters still get the response if the first client hangs up
+            flight = asyncio.ensure_future(self._fetch(request, client_ip))
+            self._inflight[key] = flight
+            
+            def landed(done: asyncio.Future):
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+                if not done.cancelled():
+                    done.exception()
+            
+            flight.add_done_callback(landed)
+        return await asyncio.shield(flight)
+    
+    async def _fetch(self, request: HTTPMessage, client_ip: str) -> HTTPMessage:
+        """Forward a read and keep the response if the cache wants it"""
+        cache = self.cache
+        if cache is None or not cache.cacheable(request):
+            return await self.forward(request, client_ip)
+        generation = cache.generation
+        response = await self.forward(request, client_ip)
+        cache.put(request, response, generation)
+        return response
+    
+    async def forward(self, request: HTTPMessage, client_ip: str) -> HTTPMessage:
+        """Send a request to a worker, moving to another one if it may be retried"""
+        self.requests += 1
+        tried: List[UpstreamWorker] = []
+        last_error = "No backend worker available"
+        while len(tried) < len(self.workers):
+            worker = self.pick(tried)
+            if worker is None:
+                break
+            if tried:
+                self.retries += 1
+            tried.append(worker)
+            worker.active += 1
+            worker.requests += 1
+            try:
+                response = await self._exchange(worker, request, client_ip)
+            except UpstreamError as e:
+                last_error = f"{worker.name}: {e}"
+                self._record_failure(worker)
+                if e.retryable:
+                    continue
+                break
+            finally:
+                worker.active -= 1
+            worker.consecutive_failures = 0
+            return response
+        self.errors += 1
+        return HTTPMessage.json_response(502, {'message': f"Bad gateway ({last_error})"}, 'Bad Gateway')
+    
+    async def _exchange(self, worker: UpstreamWorker, request: HTTPMessage, client_ip: str) -> HTTPMessage:
+        forwarded_for = request.header('x-forwarded-for')
+        extra = [('X-Forwarded-For', f"{forwarded_for}, {client_ip}" if forwarded_for else client_ip)]
+        data = request.encode(extra, keep_alive=True)
+        while True:
+            try:
+                reader, writer, reused = await worker.acquire(self.connect_timeout)
+            except (OSError, asyncio.TimeoutError) as e:
+                # Nothing was sent, so any request may go to another worker
+                raise UpstreamError(f"connect failed: {e or 'timed out'}", retryable=True)
+            try:
+                writer.write(data)
+                await writer.drain()
+                response = await asyncio.wait_for(
+                    HTTPMessage.read_response(reader, self.max_body, request.method), self.response_timeout)
+                if response is None:
+                    raise ConnectionResetError("connection closed before a response")
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+                writer.close()
+                # A pooled connection the worker closed while idle; the request never reached it
+                if reused and isinstance(e, ConnectionError):
+                    continue
+                raise UpstreamError(str(e) or type(e).__name__,
+                                    retryable=request.method in self.IDEMPOTENT_METHODS)
+            worker.release(reader, writer, response.keep_alive)
+            return response
+    
+    def _record_failure(self, worker: UpstreamWorker):
+        worker.failures += 1
+        worker.consecutive_failures += 1
+        if worker.consecutive_failures >= self.max_failures and worker.available(time.monotonic()):
+            worker.ejections += 1
+            backoff = min(self.max_ejection_time, self.ejection_time * 2 ** min(worker.ejections - 1, 16))
+            worker.ejected_until = time.monotonic() + backoff
+            worker.consecutive_failures = 0
+            worker.close_idle()
+    
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            await asyncio.gather(*(self._check(worker) for worker in self.workers))
+    
+    async def _check(self, worker: UpstreamWorker):
+        if self.health_path:
+            probe = ReadinessProbe.http(worker.port, self.health_path, host=worker.host)
+        else:
+            probe = ReadinessProbe.tcp(worker.port, host=worker.host)
+        healthy = await probe.attempt()
+        if healthy and not worker.healthy:
+            # Back from an outage; forget the ejection so it rejoins right away
+            worker.ejected_until = 0.0
+            worker.consecutive_failures = 0
+        worker.healthy = healthy
+        if not healthy:
+            worker.close_idle()
+    
+    @staticmethod
+    def format_stats(stats: Optional[Dict[str, Any]]) -> str:
+        if not stats:
+            return ""
+        text = (f"{stats['workers_available']}/{len(stats['workers'])} workers up | "
+                f"{stats['requests']} req | {stats['errors']} errors | {stats['strategy']}")
+        if stats.get('coalesced'):
+            text += f" | {stats['coalesced']} coalesced"
+        cache = stats.get('cache')
+        if cache and cache['hit_ratio'] is not None:
+            text += f" | cache {cache['hit_ratio']:.0%} hits, {cache['bytes_saved'] / (1024 * 1024):.1f} MB saved"
+        return text
+    
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            'strategy': self.strategy,
+            'uptime': round(now - self.started_at, 1),
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._inflight),
+            'workers_available': sum(1 for worker in self.workers if worker.available(now)),
+            'workers': {worker.name: worker.stats() for worker in self.workers},
+            'cache': self.cache.stats() if self.cache is not None else None,
+        }
+
+# Utility Functions
+def shell_command(cmd):
+    """Command for Popen(shell=True); a POSIX shell only runs the first item of a list, so it is joined"""
+    if sys.platform != 'win32' and not isinstance(cmd, str):
+        return shlex.join(cmd)
+    return cmd
+
+def find_npm() -> Optional[str]:
+    """Find the npm executable path"""
+    npm_cmd = 'npm.cmd' if sys.platform == 'win32' else 'npm'
+    npm_path = shutil.which(npm_cmd)
+    
+    if npm_path is None:
+        # Try common locations
+        common_paths = [
+            r'C:\Program Files\nodejs\npm.cmd',
+            r'C:\Program Files (x86)\nodejs\npm.cmd',
+            os.path.expanduser('~') + r'\AppData\Roaming\npm\npm.cmd'
+        ]
+        
+        for path in common_paths:
+            if os.path.exists(path):
+                return path
+                
+        # If still not found, try plain 'npm' as a fallback
+        # This allows the shell to resolve it on some systems
+        return 'npm' if sys.platform == 'win32' else None
+                
+    return npm_path
+
+# Service Controller
+class ServiceController:
+    """Runs the managed stack without any UI: launch specs, ports, restart policies,
+    dependency-ordered start/stop and resource sampling.
+    
+    The Tk panel and the headless daemon both drive services through this class.
+    
+    With backend_workers above 1, or with response_cache on, the backend is proxied: that
+    many Node workers ('backend-1'...) run on reserved internal ports, and a LoadBalancer
+    process named 'backend' sits on the public port in front of them.
+    """
+    SERVICES = ('backend', 'frontend')
+    # Process name of the npm command typed into the panel
+    COMMAND = 'command'
+    # Cluster workers take the first free ports from backend_port + WORKER_PORT_OFFSET
+    WORKER_PORT_OFFSET = 100
+    
+    def __init__(self, base_dir: str = None, backend_port: int = 5000, frontend_port: int = 3000,
+                 async_writes: bool = True, backend_workers: int = 1, balancer_strategy: str = 'round-robin',
+                 response_cache: bool = False):
+        self.base_dir = base_dir or os.path.dirname(os.path.abspath(__file__))
+        self.error_logger = ErrorLogger(self.base_dir, async_writes=async_writes)
+        self.process_manager = ProcessManager(self.error_logger)
+        self.orchestrator = ServiceOrchestrator(self.process_manager)
+        self.resource_sampler = ResourceSampler(self.process_manager)
+        self.backend_port = backend_port
+        self.frontend_port = frontend_port
+        self.backend_workers = backend_workers
+        self.balancer_strategy = balancer_strategy
+        self.response_cache = response_cache
+        self._npm_path: Optional[str] = None
+        
+        # Bring the servers back after crashes; the database init is a one-shot job
+        for name in self.SERVICES:
+            self.process_manager.set_restart_policy(name, RestartPolicy('on-failure'))
+    
+    def npm_path(self) -> Optional[str]:
+        if self._npm_path is None:
+            self._npm_path = find_npm()
+        return self._npm_path
+    
+    def npm_command(self, args: str) -> List[str]:
+        """Argument list of `npm <args>` for a command line typed by the user"""
+        npm_path = self.npm_path()
+        if npm_path is None:
+            raise ValueError("npm executable not found. Please make sure Node.js is installed and in your PATH.")
+        return [npm_path] + shlex.split(args, posix=sys.platform != 'win32')
+    
+    def run_command(self, args: str) -> Tuple[bool, str]:
+        """Run `npm <args>` as a managed process, so it shows in the status, is stopped by
+        Stop All and is torn down with its process group"""
+        pm = self.process_manager
+        if pm.is_process_running(self.COMMAND):
+            return False, "A custom command is already running"
+        try:
+            cmd = self.npm_command(args)
+        except ValueError as e:
+            return False, str(e)
+        pm.set_readiness_probe(self.COMMAND, None)
+        pm.set_restart_policy(self.COMMAND, RestartPolicy('never'))
+        return pm.start_process(self.COMMAND, cmd, cwd=self.base_dir)
+    
+    def service_spec(self, name: str) -> Dict[str, Any]:
+        """Command, environment, port and readiness probe used to launch a service"""
+        npm_path = self.npm_path()
+        if name == 'backend':
+            return {
+                'cmd': [npm_path, 'run', 'server'],
+                'cwd': self.base_dir,
+                'env': {'PORT': str(self.backend_port)},
+                'port': self.backend_port,
+                # Ready once Express answers an API request that touches the database
+                'probe': ReadinessProbe.http(self.backend_port, '/api/users'),
+            }
+        if name == 'frontend':
+            return {
+                'cmd': [npm_path, 'start'],
+                'cwd': self.base_dir,
+                'env': {'PORT': str(self.frontend_port)},
+                'port': self.frontend_port,
+                # Ready once webpack reports the first successful compile
+                'probe': ReadinessProbe.log(r'[Cc]ompiled successfully|[Cc]ompiled with \d+ warnings?'),
+            }
+        if name == 'db_init':
+            spec = self.db_init_spec()
+            if spec is not None:
+                return spec
+        raise ValueError(f"Unknown service: {name}")
+    
+    @property
+    def proxy_mode(self) -> bool:
+        return self.backend_workers > 1 or self.response_cache
+    
+    def worker_names(self) -> List[str]:
+        """Cluster workers currently known to the process manager, running or not"""
+        return sorted((name for name in list(self.process_manager.processes) if name.startswith('backend-')),
+                      key=lambda name: int(name.rsplit('-', 1)[1]))
+    
+    def proxy_running(self) -> bool:
+        return any(self.process_manager.is_process_running(name) for name in self.worker_names())
+    
+    def cluster_specs(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Launch specs of the backend workers and the balancer in front of them; reserves the
+        workers' ports and gives them the backend's restart policy. Returns None if not
+        enough free ports were found."""
+        pm = self.process_manager
+        names = [f"backend-{i}" for i in range(1, self.backend_workers + 1)]
+        ports = {}
+        for name in names:
+            port = pm.ports.reserve(name, self.backend_port + self.WORKER_PORT_OFFSET,
+                                    max_attempts=10 + 2 * self.backend_workers)
+            if port is None:
+                for reserved in ports:
+                    pm.ports.release(reserved)
+                return None
+            ports[name] = port
+        
+        specs = {}
+        backend = self.service_spec('backend')
+        for name, port in ports.items():
+            pm.set_restart_policy(name, pm.restart_policies.get('backend') or RestartPolicy('on-failure'))
+            specs[name] = dict(backend, env={'PORT': str(port)}, port=port,
+                               probe=ReadinessProbe.http(port, '/api/users'), depends_on=['db_init'])
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'server_control.py')
+        cmd = [sys.executable, '-u', script, 'balance', '--listen-port', str(self.backend_port),
+               '--strategy', self.balancer_strategy]
+        for port in ports.values():
+            cmd += ['--upstream', f"127.0.0.1:{port}"]
+        if self.response_cache:
+            cmd.append('--cache')
+        # The balancer answers once any worker does, so it need not wait for all of them
+        specs['backend'] = dict(backend, cmd=cmd, env=None, depends_on=['db_init'])
+        return specs
+    
+    def balancer_stats(self, timeout: float = 0.5) -> Optional[Dict[str, Any]]:
+        """Counters of the running balancer, or None when the backend is not proxied or does not answer"""
+        if not self.proxy_running() or not self.process_manager.is_process_running('backend'):
+            return None
+        try:
+            sock = socket.create_connection(('127.0.0.1', self.backend_port), timeout=timeout)
+        except OSError:
+            return None
+        with sock:
+            try:
+                sock.sendall(f"GET {LoadBalancer.STATS_PATH} HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                               f"Connection: close\r\n\r\n".encode('ascii'))
+                data = b''
+                while True:
+                    chunk = sock.recv(65536)
+                    if not chunk:
+                        break
+                    data += chunk
+                head, _, body = data.partition(b'\r\n\r\n')
+                if not head.startswith(b'HTTP/1.1 200'):
+                    return None
+                return json.loads(body)
+            except (OSError, ValueError):
+                return None
+    
+    def db_init_spec(self) -> Optional[Dict[str, Any]]:
+        """Launch spec of the one-shot database initialisation, if the project has one"""
+        try:
+            with open(os.path.join(self.base_dir, 'package.json'), 'r') as f:
+                scripts = json.load(f).get('scripts', {})
+        except (OSError, ValueError):
+            scripts = {}
+        if 'init-db' in scripts:
+            cmd = [self.npm_path(), 'run', 'init-db']
+        elif os.path.exists(os.path.join(self.base_dir, 'server', 'init-db.js')):
+            cmd = ['node', os.path.join('server', 'init-db.js')]
+        else:
+            return None
+        return {'cmd': cmd, 'cwd': self.base_dir, 'env': None, 'port': None, 'probe': None}
+    
+    def benchmark_specs(self, names: Iterable[str] = ('backend', 'frontend')) -> Dict[str, Dict[str, Any]]:
+        """Launch specs for a StartupBenchmark of the given services; raises ValueError if one cannot run"""
+        if self.npm_path() is None:
+            raise ValueError("npm executable not found. Please make sure Node.js is installed.")
+        specs = {}
+        for name in names:
+            if name == 'frontend':
+                requested = self.frontend_port
+                if self.reserve_frontend_port() is None:
+                    raise ValueError(f"No free frontend port found from {requested}")
+            spec = self.service_spec(name)
+            # Keep react-scripts from opening a browser tab on every run
+            spec['env'] = dict(spec['env'] or {}, BROWSER='none')
+            specs[name] = spec
+        return specs
+    
+    def reserve_frontend_port(self) -> Optional[int]:
+        """Hold the frontend port until npm starts, moving on if it was taken meanwhile"""
+        port = self.process_manager.ports.reserve('frontend', self.frontend_port)
+        if port is not None:
+            self.frontend_port = port
+        return port
+    
+    def start_service(self, name: str) -> Tuple[bool, str]:
+        """Launch one service; readiness is reported later through the process manager"""
+        if self.process_manager.is_process_running(name):
+            return False, f"Process '{name}' is already running"
+        if self.npm_path() is None:
+            return False, "npm executable not found. Please make sure Node.js is installed."
+        if name == 'frontend':
+            requested = self.frontend_port
+            if self.reserve_frontend_port() is None:
+                return False, f"No free frontend port found from {requested}"
+        if name == 'backend' and self.proxy_mode:
+            return self._start_cluster()
+        
+        try:
+            spec = self.service_spec(name)
+        except ValueError as e:
+            return False, str(e)
+        self.process_manager.set_readiness_probe(name, spec['probe'])
+        return self.process_manager.start_process(name, spec['cmd'], cwd=spec['cwd'],
+                                                  env=spec['env'], port=spec['port'])
+    
+    def _start_cluster(self) -> Tuple[bool, str]:
+        pm = self.process_manager
+        specs = self.cluster_specs()
+        if specs is None:
+            return False, f"Not enough free ports for {self.backend_workers} backend workers"
+        for name, spec in specs.items():
+            pm.set_readiness_probe(name, spec['probe'])
+            success, message = pm.start_process(name, spec['cmd'], cwd=spec['cwd'], env=spec['env'], port=spec['port'])
+            if not success:
+                self.stop_service('backend')
+                return False, f"{name}: {message}"
+        workers = f"{self.backend_workers} backend worker{'s' if self.backend_workers != 1 else ''}"
+        return True, f"Started {workers} behind the balancer on port {self.backend_port}"
+    
+    def stop_service(self, name: str) -> Tuple[bool, str]:
+        if name != 'backend' or not self.worker_names():
+            return self.process_manager.stop_process(name)
+        
+        # The balancer and its workers stop together
+        names = ['backend'] + self.worker_names()
+        results: Dict[str, Tuple[bool, str]] = {}
+        
+        def stop(name: str):
+            results[name] = self.process_manager.stop_process(name)
+        
+        threads = [threading.Thread(target=stop, args=(name,), name=f"Stop-{name}", daemon=True)
+                   for name in names]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stopped = [n for n in names if results[n][0]]
+        failed = [results[n][1] for n in names if not results[n][0] and 'is not running' not in results[n][1]]
+        if failed:
+            return False, "; ".join(failed)
+        if not stopped:
+            return results['backend']
+        return True, f"Stopped {', '.join(stopped)}"
+    
+    def restart_service(self, name: str) -> Tuple[bool, str]:
+        """Stop a service if it is running and launch it again; not counted as a crash restart"""
+        if self.process_manager.is_process_running(name):
+            stopped, message = self.stop_service(name)
+            if not stopped:
+                return False, message
+        return self.start_service(name)
+    
+    def start_all(self, include_db_init: bool = False, progress: Callable[[str], None] = None
+                  ) -> Tuple[Dict[str, Tuple[bool, str]], float]:
+        """Start every service in dependency order and wait until each is ready; returns (results, seconds)"""
+        started_at = time.monotonic()
+        if self.npm_path() is None:
+            return {name: (False, "npm executable not found") for name in self.SERVICES}, 0.0
+        
+        requested = self.frontend_port
+        if not self.process_manager.is_process_running('frontend') and self.reserve_frontend_port() is None:
+            return {'frontend': (False, f"No free frontend port found from {requested}")}, 0.0
+        services = {name: self.service_spec(name) for name in self.SERVICES}
+        if self.proxy_mode and not self.process_manager.is_process_running('backend'):
+            cluster = self.cluster_specs()
+            if cluster is None:
+                return {'backend': (False, f"Not enough free ports for {self.backend_workers} backend workers")}, 0.0
+            services.update(cluster)
+        if include_db_init:
+            spec = self.db_init_spec()
+            if spec is not None:
+                services['db_init'] = spec
+            elif progress is not None:
+                progress("No database init script found, skipping it.\n")
+        
+        results = self.orchestrator.start_all(services, progress=progress)
+        return results, time.monotonic() - started_at
+    
+    def stop_all(self) -> Tuple[Dict[str, str], float]:
+        """Stop every service in parallel; returns (messages, seconds)"""
+        started_at = time.monotonic()
+        results = self.process_manager.stop_all_processes()
+        return results, time.monotonic() - started_at
+    
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """State, pid, port, readiness, restart and resource figures of every known service"""
+        pm = self.process_manager
+        readiness = pm.get_readiness_stats()
+        restarts = pm.get_restart_stats()
+        ports = pm.ports.assignments()
+        status = {}
+        for name in sorted(set(self.SERVICES) | set(pm.processes)):
+            running = pm.is_process_running(name)
+            state = (readiness.get(name) or {}).get('state', 'stopped') if running else 'stopped'
+            if not running and (restarts.get(name) or {}).get('restart_pending'):
+                state = 'restarting'
+            elif not running and (restarts.get(name) or {}).get('crash_loop'):
+                state = 'crash-loop'
+            status[name] = {
+                'state': state,
+                'running': running,
+                'pid': pm.processes[name].pid if running else None,
+                'port': ports.get(name, self.backend_port if name == 'backend' else
+                                  self.frontend_port if name == 'frontend' else None),
+                'readiness': readiness.get(name),
+                'restarts': restarts.get(name),
+                'resources': self.resource_sampler.latest(name) if running else None,
+            }
+        balancer = self.balancer_stats()
+        if balancer is not None:
+            status['backend']['balancer'] = balancer
+        return status
+    
+    def logs(self, name: str, count: int = 100) -> List[Tuple[str, bool]]:
+        return self.process_manager.get_latest_logs(name, count)
+    
+    def resources(self, name: str, history: int = 0) -> Dict[str, Any]:
+        """Latest resource sample of a service plus up to `history` older samples per metric"""
+        result: Dict[str, Any] = {'latest': self.resource_sampler.latest(name)}
+        if history > 0:
+            result['history'] = {metric: self.resource_sampler.history(name, metric)[-history:]
+                                 for metric in ResourceSeries.METRICS}
+        return result
+    
+    def close(self, stop_services: bool = True):
+        """Stop sampling, optionally stop all services, and flush the error log"""
+        self.resource_sampler.stop()
+        if stop_services:
+            self.process_manager.stop_all_processes()
+        self.error_logger.close()
+
+# Control API
+class LogStream:
+    """Bounded buffer of output lines for one streaming client.
+    
+    Filled from the supervisor thread and drained on the control server's loop. When a
+    client reads slower than the services write, the oldest lines are dropped and counted
+    instead of the buffer growing, so one stalled dashboard cannot hold the daemon's memory.
+    """
+    
+    def __init__(self, loop: asyncio.AbstractEventLoop, services: Optional[Set[str]] = None,
+                 capacity: int = 1000):
+        self.loop = loop
+        self.services = services
+        self.lines: deque = deque(maxlen=max(1, capacity))
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._wakeup = asyncio.Event()
+        self._wakeup_pending = False
+        self.closed = False
+    
+    def close(self):
+        """End the stream; must be called on the loop"""
+        self.closed = True
+        self._wakeup.set()
+    
+    def push(self, name: str, line: str, is_error: bool):
+        """Line listener; safe to call from any thread"""
+        if self.services is not None and name not in self.services:
+            return
+        with self._lock:
+            if len(self.lines) == self.lines.maxlen:
+                self.dropped += 1
+            self.lines.append((name, line, is_error))
+            # One wakeup per batch rather than one loop callback per line
+            if self._wakeup_pending:
+                return
+            self._wakeup_pending = True
+        try:
+            self.loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # The loop has closed; the client is gone
+    
+    async def drain(self, timeout: float) -> Tuple[List[Tuple[str, str, bool]], int]:
+        """Wait up to `timeout` for lines; returns (lines, lines dropped since the last drain)"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self._lock:
+            self._wakeup.clear()
+            self._wakeup_pending = False
+            lines = list(self.lines)
+            self.lines.clear()
+            dropped, self.dropped = self.dropped, 0
+        return lines, dropped
+
+class ControlServer:
+    """Small HTTP/JSON control endpoint for a ServiceController, on 127.0.0.1 or a Unix socket.
+    
+    GET  /status                       state, pid, port, readiness and restarts of every service
+    GET  /resources[/<name>]?history=N latest resource sample, optionally with N older ones
+    GET  /logs/<name>?n=N              the last N output lines of a service
+    GET  /stream?service=...&tail=N    output of one or more services as Server-Sent Events
+    POST /start[/<name>]               start one service, or all of them in dependency order
+    POST /stop[/<name>]                stop one service, or all of them
+    POST /restart/<name>               stop and start one service
+    POST /shutdown                     stop everything and end the daemon
+    
+    Controller calls block (start waits for readiness), so they run on the loop's default
+    executor and one slow start never stalls the other clients. The API has no
+    authentication, so a TCP address other than loopback needs allow_remote.
+    """
+    MAX_HEADER_BYTES = 16 * 1024
+    MAX_BODY_BYTES = 64 * 1024
+    MAX_STREAMS = 32
+    STREAM_BUFFER_LINES = 1000
+    KEEPALIVE_INTERVAL = 15.0
+    # A streaming client that accepts nothing for this long is disconnected
+    STREAM_WRITE_TIMEOUT = 30.0
+    REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               500: 'Internal Server Error', 503: 'Service Unavailable'}
+    
+    def __init__(self, controller: 'ServiceController', host: str = '127.0.0.1', port: int = 0,
+                 unix_path: str = None, allow_remote: bool = False):
+        if not unix_path and not allow_remote and not self.is_loopback(host):
+            raise ValueError(f"Refusing to serve the unauthenticated control API on {host}")
+        self.controller = controller
+        self.host = host
+        self.port = port
+        self.unix_path = unix_path
+        # (method, first path segment) -> async handler(args, query, body) returning (status, payload)
+        self.routes: Dict[Tuple[str, str], Callable] = {
+            ('GET', 'status'): self._status,
+            ('GET', 'resources'): self._resources,
+            ('GET', 'logs'): self._logs,
+            ('POST', 'start'): self._start,
+            ('POST', 'stop'): self._stop,
+            ('POST', 'restart'): self._restart,
+            ('POST', 'shutdown'): self._shutdown,
+        }
+        # Handlers that keep the connection and write the response themselves
+        self.stream_routes: Dict[Tuple[str, str], Callable] = {
+            ('GET', 'stream'): self._stream,
+        }
+        self.streams: Dict[LogStream, asyncio.StreamWriter] = {}
+        self.shutdown_requested: Optional[asyncio.Event] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    @staticmethod
+    def is_loopback(host: str) -> bool:
+        if host == 'localhost':
+            return True
+        try:
+            return ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            return False
+    
+    def address(self) -> str:
+        return f"unix:{self.unix_path}" if self.unix_path else f"http://{self.host}:{self.port}"
+    
+    async def start(self):
+        self.shutdown_requested = asyncio.Event()
+        if self.unix_path:
+            # A socket file left by a daemon that did not shut down cleanly blocks the bind
+            if os.path.exists(self.unix_path):
+                os.remove(self.unix_path)
+            self._server = await asyncio.start_unix_server(self._handle, self.unix_path)
+            os.chmod(self.unix_path, 0o600)
+        else:
+            self._server = await asyncio.start_server(self._handle, self.host, self.port)
+            self.port = self._server.sockets[0].getsockname()[1]
+    
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            # Streaming clients never finish on their own
+            for stream, writer in list(self.streams.items()):
+                stream.close()
+                writer.transport.abort()
+            await self._server.wait_closed()
+            if self.unix_path:
+                try:
+                    os.remove(self.unix_path)
+                except OSError:
+                    pass
+    
+    def request_shutdown(self):
+        if self.shutdown_requested is not None:
+            self.shutdown_requested.set()
+    
+    async def _blocking(self, func: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    
+    async def _read_request(self, reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, List[str]], Any]:
+        head = await reader.readuntil(b'\r\n\r\n')
+        if len(head) > self.MAX_HEADER_BYTES:
+            raise ValueError("request header too large")
+        lines = head.decode('latin-1').split('\r\n')
+        parts = lines[0].split()
+        if len(parts) != 3:
+            raise ValueError("malformed request line")
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                headers[key.strip().lower()] = value.strip()
+        length = int(headers.get('content-length') or 0)
+        if length > self.MAX_BODY_BYTES:
+            raise ValueError("request body too large")
+        body = json.loads(await reader.readexactly(length)) if length else None
+        url = urlsplit(parts[1])
+        return parts[0].upper(), url.path, parse_qs(url.query), body
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            try:
+                method, path, query, body = await self._read_request(reader)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            except ValueError as e:
+                await self._send_json(writer, 400, {'error': str(e)})
+                return
+            
+            segments = [part for part in path.split('/') if part]
+            key = (method, segments[0] if segments else '')
+            stream_handler = self.stream_routes.get(key)
+            if stream_handler is not None:
+                try:
+                    await stream_handler(reader, writer, segments[1:], query)
+                except ValueError as e:
+                    await self._send_json(writer, 400, {'error': str(e)})
+                return
+            
+            handler = self.routes.get(key)
+            if handler is None:
+                known = any(route[1] == key[1] for route in list(self.routes) + list(self.stream_routes))
+                await self._send_json(writer, 405 if known else 404, {'error': f"No route for {method} {path}"})
+                return
+            try:
+                status, payload = await handler(segments[1:], query, body)
+            except ValueError as e:
+                status, payload = 400, {'error': str(e)}
+            except Exception as e:
+                self.controller.error_logger.log_error(
+                    "Control API Error", f"{method} {path} failed: {e}", traceback.format_exc())
+                status, payload = 500, {'error': str(e)}
+            await self._send_json(writer, status, payload)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    async def _send_json(self, writer: asyncio.StreamWriter, status: int, payload: Any):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        writer.write(f"HTTP/1.1 {status} {self.REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                     f"Connection: close\r\n\r\n".encode('ascii') + body)
+        await writer.drain()
+    
+    def _service_name(self, args: List[str]) -> Optional[str]:
+        if not args:
+            return None
+        if args[0] not in self.controller.SERVICES and args[0] != 'db_init':
+            raise ValueError(f"Unknown service: {args[0]}")
+        return args[0]
+    
+    @staticmethod
+    def _int_param(query: Dict[str, List[str]], name: str, default: int) -> int:
+        try:
+            return max(0, int(query.get(name, [default])[0]))
+        except ValueError:
+            raise ValueError(f"'{name}' must be an integer")
+    
+    async def _status(self, args, query, body):
+        # Asks the balancer for its counters in cluster mode
+        return 200, await self._blocking(self.controller.status)
+    
+    async def _resources(self, args, query, body):
+        name = self._service_name(args)
+        history = self._int_param(query, 'history', 0)
+        names = [name] if name else sorted(set(self.controller.SERVICES) | set(self.controller.process_manager.processes))
+        return 200, {n: self.controller.resources(n, history) for n in names}
+    
+    async def _logs(self, args, query, body):
+        name = self._service_name(args)
+        if name is None:
+            raise ValueError("Service name required")
+        count = self._int_param(query, 'n', 100)
+        return 200, [{'line': line, 'error': is_error} for line, is_error in self.controller.logs(name, count)]
+    
+    async def _start(self, args, query, body):
+        name = self._service_name(args)
+        if name is None:
+            include_db_init = query.get('db_init', ['0'])[0] in ('1', 'true')
+            results, elapsed = await self._blocking(self.controller.start_all, include_db_init)
+            return 200, {'results': {n: {'ok': ok, 'message': msg} for n, (ok, msg) in results.items()},
+                         'seconds': round(elapsed, 3)}
+        ok, message = await self._blocking(self.controller.start_service, name)
+        return 200, {'results': {name: {'ok': ok, 'message': message}}}
+    
+    async def _stop(self, args, query, body):
+        name = self._service_name(args)
+        if name is None:
+            results, elapsed = await self._blocking(self.controller.stop_all)
+            return 200, {'results': results, 'seconds': round(elapsed, 3)}
+        ok, message = await self._blocking(self.controller.stop_service, name)
+        return 200, {'results': {name: {'ok': ok, 'message': message}}}
+    
+    async def _restart(self, args, query, body):
+        name = self._service_name(args)
+        if name is None:
+            raise ValueError("Service name required")
+        ok, message = await self._blocking(self.controller.restart_service, name)
+        return 200, {'results': {name: {'ok': ok, 'message': message}}}
+    
+    async def _shutdown(self, args, query, body):
+        self.request_shutdown()
+        return 200, {'shutdown': True}
+    
+    async def _stream(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, args, query):
+        """Server-Sent Events: a `log` event per output line, `dropped` when the client fell behind"""
+        services = set(query['service']) if query.get('service') else None
+        for name in services or ():
+            self._service_name([name])
+        tail = self._int_param(query, 'tail', 0)
+        if len(self.streams) >= self.MAX_STREAMS:
+            await self._send_json(writer, 503, {'error': "Too many streaming clients"})
+            return
+        
+        stream = LogStream(asyncio.get_running_loop(), services, self.STREAM_BUFFER_LINES)
+        pm = self.controller.process_manager
+        self.streams[stream] = writer
+        # Clients send nothing after the request, so EOF here means they went away;
+        # aborting the transport also releases a write that is waiting on them
+        hangup = asyncio.ensure_future(reader.read(1))
+        hangup.add_done_callback(lambda _: (stream.close(), writer.transport.abort()))
+        pm.add_line_listener(stream.push)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                         b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+            backlog = []
+            if tail:
+                for name in sorted(services or set(pm.process_logs)):
+                    # Stored lines carry the console prefix; live events send the bare line
+                    prefix = pm.process_logs[name].prefix if name in pm.process_logs else ''
+                    backlog.extend((name, line[len(prefix):] if line.startswith(prefix) else line, is_error)
+                                   for line, is_error in self.controller.logs(name, tail))
+            writer.write(self._events(backlog, 0))
+            await asyncio.wait_for(writer.drain(), self.STREAM_WRITE_TIMEOUT)
+            
+            while not stream.closed:
+                lines, dropped = await stream.drain(self.KEEPALIVE_INTERVAL)
+                # A comment line keeps proxies from timing out and notices clients that went away
+                writer.write(self._events(lines, dropped) if lines or dropped else b": keepalive\n\n")
+                await asyncio.wait_for(writer.drain(), self.STREAM_WRITE_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            hangup.cancel()
+            pm.remove_line_listener(stream.push)
+            self.streams.pop(stream, None)
+    
+    @staticmethod
+    def _events(lines: List[Tuple[str, str, bool]], dropped: int) -> bytes:
+        events = []
+        if dropped:
+            events.append(f"event: dropped\ndata: {json.dumps({'count': dropped})}\n\n")
+        for name, line, is_error in lines:
+            data = json.dumps({'service': name, 'line': line, 'error': is_error})
+            events.append(f"event: log\ndata: {data}\n\n")
+        return ''.join(events).encode('utf-8')
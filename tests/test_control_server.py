@@ -0,0 +1,22 @@
+import unittest
+
+from server_core import ControlServer
+
+
+class ControlServerAddressTest(unittest.TestCase):
+    def test_loopback_addresses_are_allowed(self):
+        for host in ('127.0.0.1', '127.0.0.2', '::1', 'localhost'):
+            self.assertEqual(ControlServer(None, host).host, host)
+
+    def test_other_addresses_need_allow_remote(self):
+        for host in ('0.0.0.0', '::', '192.168.1.5', 'example.com'):
+            with self.assertRaises(ValueError):
+                ControlServer(None, host)
+            self.assertEqual(ControlServer(None, host, allow_remote=True).host, host)
+
+    def test_unix_socket_ignores_the_host(self):
+        self.assertEqual(ControlServer(None, '0.0.0.0', unix_path='/tmp/api.sock').unix_path, '/tmp/api.sock')
+
+
+if __name__ == '__main__':
+    unittest.main()
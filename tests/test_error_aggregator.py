@@ -0,0 +1,96 @@
+import unittest
+
+from server_core import ErrorAggregator
+
+# stderr of `npm start` (react-scripts 5) after breaking JSX in src/App.js
+CRA_COMPILE_ERROR = """\
+Failed to compile.
+
+SyntaxError: /home/dev/re-chat/src/App.js: Unexpected token (12:4)
+
+  10 |   return (
+  11 |     <div className="App">
+> 12 |     <<
+     |     ^
+  13 |   );
+  14 | }
+  15 |
+ERROR in ./src/App.js
+Module build failed (from ./node_modules/babel-loader/lib/index.js):
+SyntaxError: /home/dev/re-chat/src/App.js: Unexpected token (12:4)
+
+  10 |   return (
+  11 |     <div className="App">
+> 12 |     <<
+     |     ^
+  13 |   );
+    at constructor (/home/dev/re-chat/node_modules/@babel/parser/lib/index.js:356:19)
+    at FlowParserMixin.raise (/home/dev/re-chat/node_modules/@babel/parser/lib/index.js:3223:19)
+
+webpack compiled with 1 error
+"""
+
+# stderr of the backend when MySQL is down
+NODE_UNHANDLED_ERROR = """\
+Error: connect ECONNREFUSED 127.0.0.1:3306
+    at TCPConnectWrap.afterConnect [as oncomplete] (node:net:1555:16) {
+  errno: -111,
+  code: 'ECONNREFUSED',
+  syscall: 'connect'
+}
+Server running on port 5000
+"""
+
+
+class ErrorAggregatorTest(unittest.TestCase):
+    def setUp(self):
+        self.records = []
+        self.aggregator = ErrorAggregator(lambda name, lines: self.records.append(lines),
+                                          lambda delay, callback: None)
+
+    def feed(self, text):
+        for line in text.splitlines():
+            self.aggregator.feed('frontend', line + '\n')
+        self.aggregator.flush('frontend')
+
+    def test_code_frame_after_blank_line_stays_in_record(self):
+        self.feed(CRA_COMPILE_ERROR)
+        first = self.records[0]
+        self.assertTrue(first[0].startswith('SyntaxError: '))
+        self.assertEqual(first[1], '')
+        self.assertIn('> 12 |     <<', first)
+        self.assertEqual(first[-1], '  15 |')
+
+    def test_webpack_error_joins_loader_lines_and_stack(self):
+        self.feed(CRA_COMPILE_ERROR)
+        second = self.records[1]
+        self.assertEqual(second[:3], ['ERROR in ./src/App.js',
+                                      'Module build failed (from ./node_modules/babel-loader/lib/index.js):',
+                                      'SyntaxError: /home/dev/re-chat/src/App.js: Unexpected token (12:4)'])
+        self.assertIn('> 12 |     <<', second)
+        self.assertTrue(second[-1].strip().startswith('at FlowParserMixin.raise'))
+
+    def test_summary_after_blank_line_is_a_record_of_its_own(self):
+        self.feed(CRA_COMPILE_ERROR)
+        self.assertEqual(len(self.records), 3)
+        self.assertEqual(self.records[2], ['webpack compiled with 1 error'])
+
+    def test_unrelated_line_is_not_joined(self):
+        self.aggregator.feed('backend', 'Error: Cannot find module ./routes\n')
+        self.aggregator.feed('backend', 'Server running on port 5000\n')
+        self.aggregator.flush('backend')
+        self.assertEqual(self.records, [['Error: Cannot find module ./routes']])
+
+    def test_node_error_object_closes_with_its_brace(self):
+        self.feed(NODE_UNHANDLED_ERROR)
+        self.assertEqual(len(self.records), 1)
+        self.assertEqual(self.records[0][-1], '}')
+        self.assertNotIn('Server running on port 5000', self.records[0])
+
+    def test_two_blank_lines_end_the_record(self):
+        self.feed('TypeError: x is undefined\n\n\n    at main (index.js:1:1)\n')
+        self.assertEqual(self.records, [['TypeError: x is undefined']])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import gc
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+import weakref
+
+from server_core import ErrorExporter, ErrorLogger, ErrorSearchIndex, ErrorStore
+
+
+class ErrorStoreReadTest(unittest.TestCase):
+    def setUp(self):
+        base_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(base_dir.cleanup)
+        self.error_dir = base_dir.name
+        self.store = ErrorStore(self.error_dir, compress=False)
+
+    def append(self, count):
+        self.store.append([ErrorStore.make_record('Test Error', f"error {i}") for i in range(count)])
+        return self.store.segment_path
+
+    def gzip_segment(self, path):
+        with open(path, 'rb') as src, gzip.open(path + '.gz', 'wb') as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(path)
+        return path + '.gz'
+
+    def test_recent_is_newest_first_in_gzipped_segment(self):
+        self.gzip_segment(self.append(50))
+
+        recent = self.store.recent(10)
+
+        self.assertEqual([r['message'] for r in recent], [f"error {i}" for i in range(49, 39, -1)])
+
+    def test_truncated_gzip_segment_does_not_raise(self):
+        gz_path = self.gzip_segment(self.append(200))
+        with open(gz_path, 'rb+') as f:
+            f.truncate(os.path.getsize(gz_path) // 2)
+        offset, length, _, _ = self.store.read_index(self.store.segment_path)[-1]
+
+        self.assertIsNone(self.store.read_record(self.store.segment_path, offset, length))
+        self.assertLess(len(self.store.recent(200)), 200)
+
+
+class ErrorExporterTest(unittest.TestCase):
+    def setUp(self):
+        base_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(base_dir.cleanup)
+        self.error_dir = base_dir.name
+        self.store = ErrorStore(self.error_dir, compress=False)
+        self.store.append([ErrorStore.make_record('Test Error', "exported")])
+
+    def test_unsupported_format_finishes_with_error(self):
+        exporter = ErrorExporter(self.store)
+
+        exporter.start(os.path.join(self.error_dir, 'export.zip'), fmt='zip').join(5.0)
+
+        self.assertTrue(exporter.finished.is_set())
+        self.assertIn("Unsupported export format", exporter.error)
+
+    def test_txt_export(self):
+        exporter = ErrorExporter(self.store)
+        output_path = os.path.join(self.error_dir, 'export.txt')
+
+        exporter.run(output_path)
+
+        self.assertIsNone(exporter.error)
+        with open(output_path, encoding='utf-8') as f:
+            self.assertIn("MESSAGE: exported", f.read())
+
+
+class LegacySearchTest(unittest.TestCase):
+    def setUp(self):
+        base_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(base_dir.cleanup)
+        self.error_dir = base_dir.name
+        self.store = ErrorStore(self.error_dir, compress=False)
+        self.legacy_path = os.path.join(self.error_dir, 'error_log_20250510_222814.txt')
+
+    def write_legacy(self, *messages):
+        # The layout server_control_simple.py appends to its session file
+        with open(self.legacy_path, 'a', encoding='utf-8') as f:
+            for message in messages:
+                f.write(ErrorStore.format_record(ErrorStore.make_record('Legacy Error', message)))
+
+    def test_records_appended_after_indexing_are_found(self):
+        self.write_legacy("first failure")
+        index = ErrorSearchIndex(self.store)
+        self.assertEqual(len(index.search("failure")), 1)
+
+        self.write_legacy("second failure")
+
+        self.assertEqual(sorted(r['message'] for r in index.search("failure")),
+                         ["first failure", "second failure"])
+
+    def test_reload_indexes_only_the_tail(self):
+        self.write_legacy("first failure")
+        ErrorSearchIndex(self.store).load()
+        self.write_legacy("second failure")
+
+        index = ErrorSearchIndex(self.store)
+
+        self.assertEqual(len(index.search("failure")), 2)
+        self.assertEqual(len(index.search("second")), 1)
+
+
+class ErrorLoggerLifetimeTest(unittest.TestCase):
+    def test_unused_logger_can_be_collected(self):
+        with tempfile.TemporaryDirectory() as base_dir:
+            logger = ErrorLogger(base_dir)
+            logger.log_error("Test Error", "collected")
+            ref = weakref.ref(logger)
+            self.assertIn(logger, ErrorLogger._instances)
+
+            del logger
+            gc.collect()
+
+            self.assertIsNone(ref())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+import asyncio
+import json
+import time
+import unittest
+
+from server_core import HTTPMessage, LoadBalancer
+from tests.upstream import StubUpstream, free_port, send
+
+
+class ReadBodyTest(unittest.IsolatedAsyncioTestCase):
+    def response(self, data: bytes) -> asyncio.StreamReader:
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return reader
+
+    async def test_close_delimited_body_is_read_to_eof(self):
+        body = b'y' * (300 * 1024)
+        message = await HTTPMessage.read_response(self.response(b"HTTP/1.1 200 OK\r\n\r\n" + body), 1 << 20, 'GET')
+        self.assertEqual(message.body, body)
+        self.assertFalse(message.keep_alive)
+
+    async def test_close_delimited_body_over_the_cap_fails(self):
+        with self.assertRaises(ValueError):
+            await HTTPMessage.read_response(self.response(b"HTTP/1.1 200 OK\r\n\r\n" + b'y' * 5000), 4096, 'GET')
+
+    async def test_chunked_body_with_extensions_and_trailers(self):
+        data = b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n3;a=b\r\nabc\r\n2\r\nde\r\n0\r\nX-T: 1\r\n\r\n"
+        message = await HTTPMessage.read_response(self.response(data), 1024, 'GET')
+        self.assertEqual(message.body, b'abcde')
+
+    async def test_interim_responses_are_skipped(self):
+        data = b"HTTP/1.1 100 Continue\r\n\r\nHTTP/1.1 204 No Content\r\n\r\n"
+        message = await HTTPMessage.read_response(self.response(data), 1024, 'POST')
+        self.assertEqual(message.status, 204)
+
+    async def test_content_length_over_the_cap_fails(self):
+        with self.assertRaises(ValueError):
+            await HTTPMessage.read_response(self.response(b"HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n"), 5, 'GET')
+
+
+class LoadBalancerTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.upstreams = [await StubUpstream('a').start(), await StubUpstream('b').start()]
+        self.balancer = None
+
+    async def asyncTearDown(self):
+        if self.balancer is not None:
+            await self.balancer.close()
+        for upstream in self.upstreams:
+            await upstream.stop()
+
+    async def start_balancer(self, ports, **kwargs):
+        self.balancer = LoadBalancer([('127.0.0.1', port) for port in ports], host='127.0.0.1', port=0,
+                                     coalesce=False, **kwargs)
+        await self.balancer.start()
+        return self.balancer
+
+    async def get_json(self, target='/api/users', method='GET', body=b''):
+        response = await send(self.balancer.port, method, target, body=body)
+        self.assertEqual(response.status, 200, response.body)
+        return json.loads(response.body)
+
+    async def test_round_robin_over_pooled_connections(self):
+        await self.start_balancer([upstream.port for upstream in self.upstreams])
+        workers = [(await self.get_json())['worker'] for _ in range(6)]
+        self.assertEqual(workers, ['a', 'b'] * 3)
+        self.assertEqual([upstream.connections for upstream in self.upstreams], [1, 1])
+        self.assertEqual(sum(w.connections_reused for w in self.balancer.workers), 4)
+
+    async def test_content_length_request_body_is_forwarded(self):
+        await self.start_balancer([self.upstreams[0].port])
+        answer = await self.get_json('/api/users', 'POST', b'{"name": "x"}')
+        self.assertEqual(answer['body'], '{"name": "x"}')
+        self.assertEqual(answer['method'], 'POST')
+
+    async def test_chunked_response_is_reframed(self):
+        await self.start_balancer([self.upstreams[0].port])
+        response = await send(self.balancer.port, 'GET', '/chunked')
+        self.assertEqual(response.body, b'hello, world')
+        self.assertEqual(response.header('content-length'), '12')
+        self.assertIsNone(response.header('transfer-encoding'))
+
+    async def test_close_delimited_response_arrives_whole(self):
+        await self.start_balancer([self.upstreams[0].port])
+        response = await send(self.balancer.port, 'GET', '/close?size=1000000')
+        self.assertEqual(len(response.body), 1000000)
+        # The connection ended the body, so it is not pooled
+        self.assertEqual(self.balancer.workers[0].stats()['idle_connections'], 0)
+
+    async def test_dead_worker_is_skipped_and_ejected(self):
+        await self.start_balancer([self.upstreams[0].port, free_port()], max_failures=2, ejection_time=30,
+                                  health_interval=60)
+        workers = [(await self.get_json())['worker'] for _ in range(6)]
+        self.assertEqual(workers, ['a'] * 6)
+        dead = self.balancer.workers[1]
+        self.assertEqual(dead.ejections, 1)
+        self.assertGreater(dead.ejected_until, time.monotonic())
+        self.assertGreaterEqual(self.balancer.retries, 2)
+        self.assertEqual(self.balancer.errors, 0)
+
+    async def test_post_is_retried_when_nothing_was_sent(self):
+        await self.start_balancer([free_port(), self.upstreams[0].port])
+        for _ in range(3):
+            self.assertEqual((await self.get_json('/api/invite-codes', 'POST', b'{}'))['worker'], 'a')
+
+    async def test_all_workers_down_is_a_bad_gateway(self):
+        await self.start_balancer([free_port()])
+        response = await send(self.balancer.port, 'GET', '/api/users')
+        self.assertEqual(response.status, 502)
+        self.assertEqual(self.balancer.errors, 1)
+
+    async def wait_for(self, condition, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "condition not met in time")
+            await asyncio.sleep(0.02)
+
+    async def test_worker_that_comes_back_rejoins(self):
+        port = free_port()
+        await self.start_balancer([self.upstreams[0].port, port], max_failures=1, ejection_time=60,
+                                  health_interval=0.05)
+        for _ in range(3):
+            await self.get_json()
+        returning = self.balancer.workers[1]
+        self.assertEqual(returning.ejections, 1)
+        await self.wait_for(lambda: not returning.healthy)
+        
+        self.upstreams.append(await StubUpstream('c', port).start())
+        # The health check readmits it long before the 60 s ejection runs out
+        await self.wait_for(lambda: returning.available(time.monotonic()))
+        workers = {(await self.get_json())['worker'] for _ in range(4)}
+        self.assertEqual(workers, {'a', 'c'})
+
+    async def test_ejection_runs_out(self):
+        port = free_port()
+        await self.start_balancer([self.upstreams[0].port, port], max_failures=1, ejection_time=0.2,
+                                  health_interval=60)
+        await self.get_json()
+        await self.get_json()
+        self.assertEqual(self.balancer.workers[1].ejections, 1)
+        self.upstreams.append(await StubUpstream('c', port).start())
+        self.assertEqual({(await self.get_json())['worker'] for _ in range(4)}, {'a'})
+        await asyncio.sleep(0.25)
+        self.assertEqual({(await self.get_json())['worker'] for _ in range(4)}, {'a', 'c'})
+
+if __name__ == '__main__':
+    unittest.main()
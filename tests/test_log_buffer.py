@@ -0,0 +1,28 @@
+import unittest
+
+from server_core import LogBuffer
+
+
+class LogBufferTest(unittest.TestCase):
+    def test_byte_budget_counts_utf8_bytes(self):
+        buffer = LogBuffer('frontend', max_lines=100, max_bytes=30)
+        line = "✓ Compiled"  # 10 characters, 12 bytes
+
+        for _ in range(5):
+            buffer.append(line)
+
+        self.assertEqual(len(buffer), 2)
+        self.assertEqual(buffer.stats()['bytes'], 24)
+
+    def test_eviction_releases_the_bytes_of_the_evicted_line(self):
+        buffer = LogBuffer('backend', max_lines=2, max_bytes=1024)
+
+        for line in ("ascii", "ünïcödé", "ascii"):
+            buffer.append(line)
+
+        self.assertEqual(buffer.stats()['bytes'], len("ünïcödé".encode('utf-8')) + len("ascii"))
+        self.assertEqual([line for line, _ in buffer.latest()], ["[backend] ünïcödé", "[backend] ascii"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,35 @@
+import socket
+import unittest
+
+from server_core import PortRegistry
+from tests.upstream import free_port
+
+
+class PortRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = PortRegistry()
+        self.addCleanup(self.registry.release, 'frontend')
+        self.port = self.registry.reserve('frontend', free_port())
+        self.assertIsNotNone(self.port)
+
+    def test_reservation_accepts_no_connections(self):
+        with self.assertRaises(ConnectionRefusedError):
+            socket.create_connection(('127.0.0.1', self.port), timeout=1.0).close()
+
+    def test_reservation_blocks_other_binds_until_handoff(self):
+        for host in ('', '127.0.0.1'):
+            with socket.socket() as other:
+                other.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                with self.assertRaises(OSError):
+                    other.bind((host, self.port))
+
+        self.assertEqual(self.registry.handoff('frontend'), self.port)
+
+        with socket.socket() as service:
+            service.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            service.bind(('', self.port))
+            service.listen(1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+from server_core import ErrorLogger, ProcessManager, ServiceController
+
+
+@unittest.skipIf(sys.platform == 'win32', "process groups are POSIX-only")
+class StopProcessGroupTest(unittest.TestCase):
+    def setUp(self):
+        base_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(base_dir.cleanup)
+        self.error_logger = ErrorLogger(base_dir.name)
+        self.addCleanup(self.error_logger.close)
+        self.pm = ProcessManager(self.error_logger, stop_grace=1.0, port_release_timeout=0.5)
+        self.addCleanup(self.pm.stop_all_processes)
+
+    def start_orphaning_leader(self, name):
+        # Like npm: the shell leader exits while the child it spawned keeps the group alive
+        ok, message = self.pm.start_process(name, ['sh', '-c', 'sleep 30 & echo started'])
+        self.assertTrue(ok, message)
+        process = self.pm.processes[name]
+        self.assertTrue(self.pm.wait_until(lambda: process.poll() is not None, 5.0))
+        return process
+
+    def test_stop_all_stops_group_after_leader_exit(self):
+        process = self.start_orphaning_leader('frontend')
+        self.assertFalse(self.pm.is_process_running('frontend'))
+        self.assertTrue(self.pm.needs_stop('frontend'))
+
+        results = self.pm.stop_all_processes()
+
+        self.assertIn('frontend', results)
+        self.assertFalse(ProcessManager._group_alive(process))
+        self.assertFalse(self.pm.needs_stop('frontend'))
+
+    def test_stop_all_skips_finished_groups(self):
+        ok, message = self.pm.start_process('db_init', ['sh', '-c', 'exit 0'])
+        self.assertTrue(ok, message)
+        process = self.pm.processes['db_init']
+        deadline = time.monotonic() + 5.0
+        while ProcessManager._group_alive(process) and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self.pm.stop_all_processes(), {})
+
+
+@unittest.skipIf(sys.platform == 'win32', "uses POSIX commands in place of npm")
+class CustomCommandTest(unittest.TestCase):
+    def setUp(self):
+        base_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(base_dir.cleanup)
+        self.controller = ServiceController(base_dir.name, async_writes=False)
+        self.addCleanup(self.controller.close)
+        self.pm = self.controller.process_manager
+
+    def test_command_is_tracked_and_stopped_by_stop_all(self):
+        self.controller._npm_path = 'sleep'
+
+        ok, message = self.controller.run_command('30')
+
+        self.assertTrue(ok, message)
+        self.assertTrue(self.controller.status()[ServiceController.COMMAND]['running'])
+        self.assertFalse(self.controller.run_command('30')[0])
+        results, _ = self.controller.stop_all()
+        self.assertIn(ServiceController.COMMAND, results)
+        self.assertFalse(self.pm.needs_stop(ServiceController.COMMAND))
+
+    def test_command_output_is_logged_and_not_restarted(self):
+        self.controller._npm_path = 'echo'
+
+        ok, message = self.controller.run_command('"hello world"')
+
+        self.assertTrue(ok, message)
+        process = self.pm.processes[ServiceController.COMMAND]
+        self.assertTrue(self.pm.wait_until(lambda: process.poll() is not None, 5.0))
+        deadline = time.monotonic() + 5.0
+        while not self.controller.logs(ServiceController.COMMAND) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.controller.logs(ServiceController.COMMAND)[-1][0], "[command] hello world")
+        self.assertEqual(self.pm.restart_policies[ServiceController.COMMAND].mode, 'never')
+
+
+class LineListenerTest(unittest.TestCase):
+    def setUp(self):
+        base_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(base_dir.cleanup)
+        self.error_logger = ErrorLogger(base_dir.name)
+        self.pm = ProcessManager(self.error_logger)
+
+    def test_concurrent_updates_are_not_lost(self):
+        listeners = [lambda name, line, is_error: None for _ in range(8)]
+        kept = listeners[0]
+        self.pm.add_line_listener(kept)
+
+        def churn(listener):
+            for _ in range(200):
+                self.pm.add_line_listener(listener)
+                self.pm.remove_line_listener(listener)
+
+        threads = [threading.Thread(target=churn, args=(listener,)) for listener in listeners[1:]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.pm.line_listeners, [kept])
+
+    def test_update_does_not_change_list_being_iterated(self):
+        first = lambda name, line, is_error: None
+        self.pm.add_line_listener(first)
+        snapshot = self.pm.line_listeners
+
+        self.pm.add_line_listener(lambda name, line, is_error: None)
+        self.pm.remove_line_listener(first)
+
+        self.assertEqual(snapshot, [first])
+
+
+if __name__ == '__main__':
+    unittest.main()
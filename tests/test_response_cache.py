@@ -0,0 +1,188 @@
+import json
+import unittest
+from unittest import mock
+
+from server_core import HTTPMessage, LoadBalancer, ReadinessProbe, ResponseCache
+from tests.upstream import StubUpstream, send
+
+
+def request(method, target, authorization=None):
+    headers = [('Authorization', authorization)] if authorization else []
+    return HTTPMessage(f"{method} {target} HTTP/1.1", headers)
+
+
+def response(body=b'{}', status=200, headers=()):
+    return HTTPMessage(f"HTTP/1.1 {status} X", list(headers), body)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('server_core.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = ResponseCache()
+
+    def fill(self, *targets):
+        for target in targets:
+            self.cache.put(request('GET', target), response(target.encode()), self.cache.generation)
+
+    def cached(self, target, authorization=None):
+        return self.cache.get(request('GET', target, authorization)) is not None
+
+    def test_only_get_on_ttl_routes_is_cacheable(self):
+        self.assertTrue(self.cache.cacheable(request('GET', '/api/users?page=2')))
+        self.assertTrue(self.cache.cacheable(request('GET', '/api/users/7/details')))
+        self.assertFalse(self.cache.cacheable(request('GET', '/api/messages')))
+        self.assertFalse(self.cache.cacheable(request('HEAD', '/api/users')))
+        self.assertFalse(self.cache.cacheable(request('POST', '/api/users')))
+
+    def test_entries_expire_after_their_route_ttl(self):
+        self.fill('/api/users', '/api/stats/users-by-country')
+        self.now += 10.5
+        self.assertFalse(self.cached('/api/users'))
+        self.assertTrue(self.cached('/api/stats/users-by-country'))
+        self.now += 20
+        self.assertFalse(self.cached('/api/stats/users-by-country'))
+
+    def test_keys_include_the_authorization_header(self):
+        self.cache.put(request('GET', '/api/users', 'Bearer a'), response(), 0)
+        self.assertTrue(self.cached('/api/users', 'Bearer a'))
+        self.assertFalse(self.cached('/api/users', 'Bearer b'))
+        self.assertFalse(self.cached('/api/users'))
+
+    def test_only_plain_200_responses_are_stored(self):
+        for stored in (response(status=404), response(headers=[('Cache-Control', 'no-store')]),
+                       response(headers=[('Cache-Control', 'private, max-age=60')])):
+            self.cache.put(request('GET', '/api/users'), stored, 0)
+        self.assertEqual(self.cache.stats()['entries'], 0)
+
+    def test_no_cache_request_bypasses_the_entry(self):
+        self.fill('/api/users')
+        fresh = HTTPMessage("GET /api/users HTTP/1.1", [('Cache-Control', 'no-cache')])
+        self.assertIsNone(self.cache.get(fresh))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        self.cache = ResponseCache(max_entries=2)
+        self.fill('/api/users/1', '/api/users/2')
+        self.assertTrue(self.cached('/api/users/1'))
+        self.fill('/api/users/3')
+        self.assertEqual([self.cached(f'/api/users/{i}') for i in (1, 2, 3)], [True, False, True])
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_byte_bound_evicts_and_skips_oversized_responses(self):
+        self.cache = ResponseCache(max_bytes=5000)
+        for i in range(4):
+            self.cache.put(request('GET', f'/api/users/{i}'), response(b'x' * 2000), 0)
+        self.assertLessEqual(self.cache.bytes, 5000)
+        self.assertEqual(self.cache.stats()['entries'], 2)
+        self.cache.put(request('GET', '/api/users'), response(b'x' * 6000), 0)
+        self.assertFalse(self.cached('/api/users'))
+
+    def test_response_from_before_a_write_is_not_stored(self):
+        generation = self.cache.generation
+        self.cache.invalidate(request('POST', '/api/invite-codes'))
+        self.cache.put(request('GET', '/api/invite-codes'), response(), generation)
+        self.assertFalse(self.cached('/api/invite-codes'))
+
+    def test_stats_count_hits_misses_and_bytes_saved(self):
+        self.fill('/api/users')
+        self.cached('/api/users')
+        self.cached('/api/users')
+        self.cached('/api/invite-codes')
+        stats = self.cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['bytes_saved']), (2, 1, 2 * len(b'/api/users')))
+
+
+class InvalidationTableTest(unittest.TestCase):
+    KEYS = ('/api/users', '/api/users/1', '/api/users/1/details', '/api/users/12', '/api/users/2',
+            '/api/stats/users-by-country', '/api/invite-codes')
+
+    def remaining(self, method, target):
+        cache = ResponseCache()
+        for key in self.KEYS:
+            cache.put(request('GET', key), response(), cache.generation)
+        cache.invalidate(request(method, target))
+        return {key for key in self.KEYS if cache.get(request('GET', key)) is not None}
+
+    def test_role_change_drops_the_user_the_list_and_stats(self):
+        self.assertEqual(self.remaining('PUT', '/api/users/1/role'),
+                         {'/api/users/12', '/api/users/2', '/api/invite-codes'})
+
+    def test_plan_change_matches_the_user_id_exactly(self):
+        self.assertIn('/api/users/12', self.remaining('PUT', '/api/users/1/plan'))
+        self.assertNotIn('/api/users/1/details', self.remaining('PUT', '/api/users/1/plan'))
+
+    def test_post_on_a_user_keeps_the_stats(self):
+        self.assertEqual(self.remaining('POST', '/api/users/2/ban'),
+                         {'/api/users/1', '/api/users/1/details', '/api/users/12',
+                          '/api/stats/users-by-country', '/api/invite-codes'})
+
+    def test_deleting_a_user_drops_every_user_key_and_stats(self):
+        self.assertEqual(self.remaining('DELETE', '/api/users/2'), {'/api/invite-codes'})
+
+    def test_invite_code_writes_only_drop_invite_codes(self):
+        expected = set(self.KEYS) - {'/api/invite-codes'}
+        self.assertEqual(self.remaining('POST', '/api/invite-codes'), expected)
+        self.assertEqual(self.remaining('DELETE', '/api/invite-codes/ABC123'), expected)
+
+    def test_register_drops_users_stats_and_invite_codes(self):
+        self.assertEqual(self.remaining('POST', '/api/auth/register'), set())
+
+    def test_login_drops_users_only(self):
+        self.assertEqual(self.remaining('POST', '/api/auth/login'),
+                         {'/api/stats/users-by-country', '/api/invite-codes'})
+
+    def test_unlisted_write_leaves_the_cache_alone(self):
+        self.assertEqual(self.remaining('POST', '/api/messages'), set(self.KEYS))
+        cache = ResponseCache()
+        cache.invalidate(request('POST', '/api/messages'))
+        self.assertEqual(cache.generation, 0)
+
+    def test_delete_drops_keys_under_its_parent_path(self):
+        cache = ResponseCache(ttls=[(r'^/api/', 10.0)])
+        cache.put(request('GET', '/api/rooms/4/messages'), response(), 0)
+        cache.put(request('GET', '/api/rooms/5'), response(), 0)
+        cache.invalidate(request('DELETE', '/api/rooms/4/messages/9'))
+        self.assertIsNone(cache.get(request('GET', '/api/rooms/4/messages')))
+        self.assertIsNotNone(cache.get(request('GET', '/api/rooms/5')))
+
+
+class BalancerCacheTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.upstream = await StubUpstream('a').start()
+        self.balancer = LoadBalancer([('127.0.0.1', self.upstream.port)], host='127.0.0.1', port=0,
+                                     cache=ResponseCache())
+        await self.balancer.start()
+
+    async def asyncTearDown(self):
+        await self.balancer.close()
+        await self.upstream.stop()
+
+    async def get(self, target, headers=()):
+        answer = await send(self.balancer.port, 'GET', target, headers)
+        return answer.header('x-cache'), json.loads(answer.body)['n']
+
+    async def test_hit_then_write_invalidates(self):
+        self.assertEqual(await self.get('/api/users'), ('MISS', 1))
+        self.assertEqual(await self.get('/api/users'), ('HIT', 1))
+        await send(self.balancer.port, 'PUT', '/api/users/1/role', body=b'{"role": "admin"}')
+        self.assertEqual(await self.get('/api/users'), ('MISS', 3))
+        self.assertEqual(len(self.upstream.requests), 3)
+
+    async def test_uncached_route_has_no_cache_header(self):
+        self.assertEqual(await self.get('/api/messages'), (None, 1))
+        self.assertEqual(await self.get('/api/messages'), (None, 2))
+
+    async def test_readiness_probe_skips_the_cache(self):
+        probe = ReadinessProbe.http(self.balancer.port, '/api/users')
+        self.assertTrue(await probe.attempt())
+        self.assertTrue(await probe.attempt())
+        stats = self.balancer.stats()['cache']
+        self.assertEqual((stats['entries'], stats['hits'], stats['misses']), (0, 0, 0))
+        self.assertEqual(len(self.upstream.requests), 2)
+        self.assertEqual(await self.get('/api/users'), ('MISS', 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
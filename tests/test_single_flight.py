@@ -0,0 +1,141 @@
+import asyncio
+import json
+import unittest
+
+from server_core import HTTPMessage, LoadBalancer, ResponseCache
+from tests.upstream import StubUpstream, send
+
+
+def get(target, authorization=None):
+    headers = [('Authorization', authorization)] if authorization else []
+    return HTTPMessage(f"GET {target} HTTP/1.1", headers)
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    cache = None
+
+    async def asyncSetUp(self):
+        self.upstream = await StubUpstream('a').start()
+        self.balancer = LoadBalancer([('127.0.0.1', self.upstream.port)], host='127.0.0.1', port=0,
+                                     cache=self.cache() if self.cache else None)
+        await self.balancer.start()
+
+    async def asyncTearDown(self):
+        self.upstream.gate.set()
+        await self.balancer.close()
+        await self.upstream.stop()
+
+    async def upstream_calls(self, count):
+        """Wait until the stub has received count requests"""
+        for _ in range(200):
+            if len(self.upstream.requests) >= count:
+                return
+            await asyncio.sleep(0.005)
+        self.fail(f"upstream saw {len(self.upstream.requests)} requests, expected {count}")
+
+    def handle(self, message):
+        return asyncio.ensure_future(self.balancer.handle(message, '127.0.0.1'))
+
+    @staticmethod
+    def number(response):
+        return json.loads(response.body)['n']
+
+    async def test_concurrent_identical_gets_share_one_upstream_call(self):
+        self.upstream.gate.clear()
+        clients = [asyncio.ensure_future(send(self.balancer.port, 'GET', '/api/users')) for _ in range(10)]
+        await self.upstream_calls(1)
+        await asyncio.sleep(0.05)
+        self.upstream.gate.set()
+        responses = await asyncio.gather(*clients)
+        self.assertEqual({self.number(r) for r in responses}, {1})
+        self.assertEqual(len(self.upstream.requests), 1)
+        self.assertEqual(self.balancer.coalesced, 9)
+        self.assertEqual(self.balancer.stats()['in_flight'], 0)
+        self.assertIn('9 coalesced', LoadBalancer.format_stats(self.balancer.stats()))
+
+    async def test_follower_joins_only_an_identical_request(self):
+        self.upstream.gate.clear()
+        leader = self.handle(get('/api/users'))
+        await self.upstream_calls(1)
+        follower = self.handle(get('/api/users'))
+        other_user = self.handle(get('/api/users', 'Bearer b'))
+        other_target = self.handle(get('/api/users?page=2'))
+        await self.upstream_calls(3)
+        self.upstream.gate.set()
+        numbers = [self.number(r) for r in await asyncio.gather(leader, follower, other_user, other_target)]
+        self.assertEqual(numbers[0], numbers[1])
+        self.assertEqual(len(set(numbers)), 3)
+        self.assertEqual(self.balancer.coalesced, 1)
+
+    async def test_read_after_a_write_does_not_get_the_earlier_flight(self):
+        self.upstream.gate.clear()
+        before = self.handle(get('/api/users'))
+        await self.upstream_calls(1)
+        write = await self.balancer.handle(HTTPMessage("PUT /api/users/1/role HTTP/1.1", [], b'{}'), '127.0.0.1')
+        self.assertEqual(write.status, 200)
+        after = self.handle(get('/api/users'))
+        await self.upstream_calls(3)
+        self.upstream.gate.set()
+        before, after = await asyncio.gather(before, after)
+        self.assertEqual((self.number(before), self.number(after)), (1, 3))
+        self.assertEqual(self.balancer.coalesced, 0)
+
+    async def test_followers_are_answered_when_the_leader_is_cancelled(self):
+        self.upstream.gate.clear()
+        leader = self.handle(get('/api/users'))
+        await self.upstream_calls(1)
+        follower = self.handle(get('/api/users'))
+        await asyncio.sleep(0)
+        leader.cancel()
+        self.upstream.gate.set()
+        self.assertEqual(self.number(await follower), 1)
+        self.assertTrue(leader.cancelled())
+        self.assertEqual(len(self.upstream.requests), 1)
+
+    async def test_followers_share_the_leaders_failure_then_retry_fresh(self):
+        await self.upstream.stop()
+        responses = await asyncio.gather(*(self.handle(get('/api/users')) for _ in range(3)))
+        self.assertEqual([r.status for r in responses], [502] * 3)
+        self.assertEqual((self.balancer.requests, self.balancer.coalesced), (1, 2))
+        self.assertEqual(self.balancer.stats()['in_flight'], 0)
+        
+        self.upstream = await StubUpstream('a', self.upstream.port).start()
+        self.balancer.workers[0].ejected_until = 0.0
+        self.assertEqual((await self.handle(get('/api/users'))).status, 200)
+
+    async def test_an_exception_reaches_every_waiter_and_ends_the_flight(self):
+        async def broken(request, client_ip):
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+        self.balancer.forward = broken
+        results = await asyncio.gather(*(self.handle(get('/api/users')) for _ in range(3)), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(self.balancer.stats()['in_flight'], 0)
+
+    async def test_coalescing_can_be_turned_off(self):
+        self.balancer.coalesce = False
+        self.upstream.gate.clear()
+        clients = [self.handle(get('/api/users')) for _ in range(3)]
+        await self.upstream_calls(3)
+        self.upstream.gate.set()
+        self.assertEqual(len({self.number(r) for r in await asyncio.gather(*clients)}), 3)
+
+
+class CachedSingleFlightTest(SingleFlightTest):
+    """The same rules with the response cache in front; misses are coalesced too"""
+    cache = ResponseCache
+
+    async def test_coalesced_miss_is_stored_once(self):
+        self.upstream.gate.clear()
+        clients = [self.handle(get('/api/users')) for _ in range(5)]
+        await self.upstream_calls(1)
+        await asyncio.sleep(0)
+        self.upstream.gate.set()
+        responses = await asyncio.gather(*clients)
+        self.assertEqual({r.header('x-cache') for r in responses}, {'MISS'})
+        self.assertEqual(self.balancer.cache.stores, 1)
+        self.assertEqual((await self.handle(get('/api/users'))).header('x-cache'), 'HIT')
+
+
+if __name__ == '__main__':
+    unittest.main()
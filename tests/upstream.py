@@ -0,0 +1,101 @@
+import asyncio
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from server_core import HTTPMessage
+
+
+class StubUpstream:
+    """A small HTTP/1.1 backend worker for balancer tests.
+
+    GET/POST anything answers JSON with the worker's name, a per-worker request number,
+    the method, target and request body. /chunked answers with a chunked body and
+    /close?size=N with N bytes delimited by closing the connection. While `gate` is
+    cleared, answers to GETs wait for it to be set.
+    """
+
+    def __init__(self, name: str, port: int = 0):
+        self.name = name
+        self.port = port
+        self.requests = []
+        self.connections = 0
+        self.gate = asyncio.Event()
+        self.gate.set()
+        self._server = None
+        self._writers = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, '127.0.0.1', self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self._server.close()
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request = await HTTPMessage.read_head(reader)
+                if request is None:
+                    return
+                await request.read_body(reader, 16 * 1024 * 1024)
+                self.requests.append(request)
+                number = len(self.requests)
+                if request.method == 'GET':
+                    await self.gate.wait()
+                if not await self._respond(request, number, writer):
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            # Cancelled when the test's loop shuts down with the connection still pooled
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _respond(self, request, number, writer) -> bool:
+        """Write the answer; returns whether the connection stays open"""
+        query = parse_qs(urlsplit(request.target).query)
+        if request.path == '/chunked':
+            writer.write(b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\n\r\n"
+                         b"5\r\nhello\r\n7;ext=1\r\n, world\r\n0\r\nX-Trailer: 1\r\n\r\n")
+        elif request.path == '/close':
+            size = int(query.get('size', ['0'])[0])
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/octet-stream\r\n\r\n")
+            for start in range(0, size, 16 * 1024):
+                writer.write(b'x' * min(16 * 1024, size - start))
+                await writer.drain()
+                await asyncio.sleep(0)
+            await writer.drain()
+            return False
+        else:
+            body = json.dumps({'worker': self.name, 'n': number, 'method': request.method,
+                               'target': request.target, 'body': request.body.decode()}).encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: %d\r\n\r\n%s" % (len(body), body))
+        await writer.drain()
+        return True
+
+
+async def send(port: int, method: str, target: str, headers=(), body: bytes = b''):
+    """One request to the balancer on a fresh connection; returns the response message"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        request = HTTPMessage(f"{method} {target} HTTP/1.1", [('Host', 'test')] + list(headers), body)
+        writer.write(request.encode(keep_alive=False))
+        await writer.drain()
+        return await HTTPMessage.read_response(reader, 64 * 1024 * 1024, method)
+    finally:
+        writer.close()
+
+
+def free_port() -> int:
+    """A port nothing listens on right now"""
+    import socket
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]